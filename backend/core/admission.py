@@ -0,0 +1,162 @@
+"""
+Admission control and load shedding for the LLM-backed routes.
+
+Before a cache-miss build is queued, the route's controller estimates how
+long the request would wait: interactive jobs already queued ahead of it,
+times the recent per-job run time, spread over the scheduler workers, plus
+any wait on the shared LLM rate limit for the route's calls. Run times come
+from the llm.call[<node>] latencies recorded for the route's graph nodes.
+
+If the estimate exceeds the wait budget, or the route is already at its
+concurrency limit, the request is shed: the last artifact built for the
+project is served if there is one, otherwise a 429 with Retry-After.
+
+Admitted requests run with the route's deadline (core.deadline.for_route);
+if it runs out, the stale artifact is served or a 504 returned. The request
+keeps its concurrency slot until the scheduler job itself has finished, so a
+job still running after its handler gave up counts against the limit. While the
+Gemini circuit breaker is open, requests are not queued at all: the stale
+artifact is served or a 503 returned.
+"""
+
+import asyncio
+import json
+import math
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+
+from core import deadline, metrics
+from core.breaker import CircuitOpen
+from core.llm import gemini_breaker, rate_limiter
+from core.scheduler import Priority, scheduler
+
+load_dotenv()
+
+ADMISSION_WAIT_BUDGET_SECONDS = float(os.getenv("ADMISSION_WAIT_BUDGET_SECONDS", "30"))
+ADMISSION_DEFAULT_LIMIT = int(os.getenv("ADMISSION_DEFAULT_LIMIT", "4"))
+ADMISSION_LIMITS: Dict[str, int] = json.loads(os.getenv("ADMISSION_LIMITS", "{}"))
+
+# Assumed latency for a node that has no recorded samples yet
+DEFAULT_NODE_SECONDS = 8.0
+
+# Extra time the handler waits past the deadline for the job to notice it
+DEADLINE_GRACE_SECONDS = 2.0
+
+
+class AdmissionController:
+    def __init__(self, route: str, nodes: List[str], limit: int):
+        self.route = route
+        self.nodes = nodes
+        self.limit = limit
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def service_estimate(self) -> float:
+        """Expected run time of one job on this route, from node p50 latencies."""
+        return sum(
+            metrics.percentile("llm.call", node, 0.5) or DEFAULT_NODE_SECONDS
+            for node in self.nodes
+        )
+
+    def wait_estimate(self) -> float:
+        queued = scheduler.depth()["interactive"]
+        per_job = metrics.percentile("scheduler.run", "interactive", 0.5) or self.service_estimate()
+        queue_wait = queued * per_job / scheduler.workers
+        return queue_wait + rate_limiter.wait_estimate(len(self.nodes))
+
+    def try_acquire(self) -> Optional[int]:
+        """
+        Take a slot and return None, or return the suggested Retry-After in
+        seconds if the request should be shed.
+        """
+        wait = self.wait_estimate()
+        with self._lock:
+            if self.in_flight >= self.limit:
+                return max(1, math.ceil(self.service_estimate() / 2))
+            if wait > ADMISSION_WAIT_BUDGET_SECONDS:
+                return max(1, math.ceil(wait - ADMISSION_WAIT_BUDGET_SECONDS))
+            self.in_flight += 1
+
+        metrics.set_gauge("admission.in_flight", self.route, self.in_flight)
+        return None
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        metrics.set_gauge("admission.in_flight", self.route, self.in_flight)
+
+
+def _controller(route: str, nodes: List[str]) -> AdmissionController:
+    return AdmissionController(route, nodes, int(ADMISSION_LIMITS.get(route, ADMISSION_DEFAULT_LIMIT)))
+
+
+CONTROLLERS: Dict[str, AdmissionController] = {
+    "research_todo": _controller("research_todo", ["generate_topics", "refine_topics", "assign_topics"]),
+    "qna": _controller("qna", ["basic_ideation_questions", "architecture_questions", "final_ps_questions"]),
+    "prd": _controller("prd", ["generate_prd", "evaluate_prd", "improve_prd"]),
+    "implementation_todo": _controller(
+        "implementation_todo",
+        ["extract_requirements", "generate_tasks", "verify_tasks", "assign_tasks"]
+    ),
+}
+
+
+async def run(
+    route: str,
+    fn: Callable,
+    *args,
+    stale: Optional[Callable[[], object]] = None,
+    **kwargs,
+):
+    """
+    Run fn through the scheduler as an interactive job if the route admits
+    it, bounded by the route's deadline. When the request is shed or runs
+    out of time, return stale() if it has a value, else raise 429 / 504.
+    """
+    controller = CONTROLLERS[route]
+
+    if not gemini_breaker.available():
+        return _fallback(route, stale, CircuitOpen(gemini_breaker.name, gemini_breaker.retry_after()))
+
+    retry_after = controller.try_acquire()
+    if retry_after is not None:
+        return _fallback(route, stale, HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="AI service is busy, please retry shortly",
+            headers={"Retry-After": str(retry_after)}
+        ))
+
+    metrics.incr("admission.admitted", route)
+    timeout = deadline.for_route(route)
+    try:
+        job = scheduler.submit(fn, *args, priority=Priority.INTERACTIVE, timeout=timeout, **kwargs)
+    except BaseException:
+        controller.release()
+        raise
+    # Released when the job ends (or is cancelled unrun), not when the handler stops waiting
+    job.add_done_callback(lambda _: controller.release())
+
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(job), timeout + DEADLINE_GRACE_SECONDS)
+    except (deadline.DeadlineExceeded, asyncio.TimeoutError):
+        metrics.incr("admission.deadline_exceeded", route)
+        return _fallback(route, stale, HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="AI generation did not finish in time, please retry"
+        ))
+    except CircuitOpen as e:
+        return _fallback(route, stale, e)
+
+
+def _fallback(route: str, stale: Optional[Callable[[], object]], error: HTTPException):
+    fallback = stale() if stale is not None else None
+    if fallback is not None:
+        metrics.incr("admission.served_stale", route)
+        return fallback
+
+    metrics.incr("admission.rejected", route)
+    raise error
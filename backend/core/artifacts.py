@@ -0,0 +1,446 @@
+"""
+Builders for the LLM-generated project artifacts.
+
+Each build_* function runs the notebook pipeline for one project and writes
+the result to the same table the matching GET endpoint reads as its cache,
+so the endpoints and the background precompute queue share one code path.
+
+Results are written with write_or_defer: if Supabase's breaker is open the
+freshly generated artifact is still returned (and kept for stale serving),
+and the write is replayed once Supabase recovers.
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+from core import llm_queue, metrics, repository
+from core.database import supabase, write_or_defer
+from core.scheduler import Priority
+from routers.exploreApi import find_hackathon_deadline
+from notebooks.research_work import final_call
+from notebooks.ques_n_discussion import generate_combined_questions
+from notebooks.copy_of_prd import run_prd_agent
+from notebooks.prd_to_todo import final_call_todo
+
+
+def _always_current() -> bool:
+    return True
+
+
+# Last artifact built or read per (kind, project_id), served stale under
+# overload or while Supabase is unavailable
+LAST_BUILT_SIZE = 512
+_last_built: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+
+
+def remember(kind: str, project_id: UUID, value: Any) -> Any:
+    key = (kind, str(project_id))
+    _last_built[key] = value
+    _last_built.move_to_end(key)
+    while len(_last_built) > LAST_BUILT_SIZE:
+        _last_built.popitem(last=False)
+    return value
+
+
+def last_built(kind: str, project_id: UUID) -> Optional[Any]:
+    return _last_built.get((kind, str(project_id)))
+
+
+def stale_or_raise(kind: str, project_id: UUID, error: Exception) -> Any:
+    """The last artifact seen for the project, or re-raise error if there is none."""
+    stale = last_built(kind, project_id)
+    if stale is None:
+        raise error
+    metrics.incr("breaker.served_stale", kind)
+    return stale
+
+
+# project_id -> (team_id, hackathon deadline); neither changes once set
+_scheduling_cache: Dict[str, Tuple[Optional[str], Optional[datetime]]] = {}
+
+
+def scheduling_info(project_id: UUID) -> Tuple[Optional[str], Optional[datetime]]:
+    """
+    Team and hackathon deadline used by the scheduler to place this project's
+    LLM jobs. Missing data yields None rather than an error.
+    """
+    key = str(project_id)
+    if key in _scheduling_cache:
+        return _scheduling_cache[key]
+
+    project_response = supabase.table("project_db") \
+        .select("team_id") \
+        .eq("id", key) \
+        .maybe_single() \
+        .execute()
+    team_id = project_response.data.get("team_id") if project_response and project_response.data else None
+
+    hackathon_response = supabase.table("user_projects") \
+        .select("hackathon_name") \
+        .eq("project_id", key) \
+        .limit(1) \
+        .execute()
+    hackathon_name = hackathon_response.data[0].get("hackathon_name") if hackathon_response.data else None
+
+    return _remember_scheduling(key, team_id, hackathon_name)
+
+
+def scheduling_from_roster(project_id: UUID, roster: Optional[Dict]) -> Tuple[Optional[str], Optional[datetime]]:
+    """scheduling_info() from a repository.project_roster() result, with no further lookups."""
+    key = str(project_id)
+    if key in _scheduling_cache:
+        return _scheduling_cache[key]
+    if not roster:
+        return None, None
+
+    project = roster["project"]
+    return _remember_scheduling(key, project.get("team_id"), project.get("hackathon_name"))
+
+
+def _remember_scheduling(key: str, team_id: Optional[str], hackathon_name: Optional[str]):
+    info = (team_id, find_hackathon_deadline(hackathon_name))
+    if team_id:
+        _scheduling_cache[key] = info
+    return info
+
+
+def fetch_team_profiles(project_id: UUID, roster: Optional[Dict] = None) -> List[Dict]:
+    """
+    Profiles of the project's team members, from roster if the caller already
+    has the project_roster() result, else looked up in one round trip.
+    """
+    if roster is None:
+        roster = repository.project_roster_sync(project_id)
+
+    if not roster:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    if not roster.get("team"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Team not found"
+        )
+
+    return roster.get("members") or []
+
+
+def to_team(profiles: List[Dict]) -> List[Dict]:
+    # user_id is passed as the person's name so assignments map back to users
+    return [
+        {
+            "name": str(profile.get("user_id")),
+            "role": profile.get("role", {}),
+            "skills": profile.get("skills", [])
+        }
+        for profile in profiles
+    ]
+
+
+def fetch_problem_statement(project_id: UUID) -> str:
+    response = supabase.table("project_db") \
+        .select("problem_statement") \
+        .eq("id", str(project_id)) \
+        .execute()
+
+    if not response or not response.data:
+        raise HTTPException(status_code=404, detail="Project ID not found")
+
+    problem_statement = response.data[0].get("problem_statement")
+
+    if not problem_statement:
+        raise HTTPException(status_code=400, detail="Problem statement is empty or missing")
+
+    return problem_statement
+
+
+# -------------------------
+# Ideation Q&A
+# -------------------------
+def build_qna(
+    project_id: UUID,
+    problem_statement: Optional[str] = None,
+    still_current: Callable[[], bool] = _always_current,
+) -> List[Dict[str, str]]:
+    if problem_statement is None:
+        problem_statement = fetch_problem_statement(project_id)
+
+    raw_llm_response = generate_combined_questions(problem_statement, "")
+
+    if not raw_llm_response or not isinstance(raw_llm_response, list):
+        raise HTTPException(status_code=500, detail="LLM returned invalid response")
+
+    qna = [
+        {"question": item.get("question", ""), "answer": ""}
+        for item in raw_llm_response
+        if item.get("question")
+    ]
+
+    if still_current():
+        # Only q_n_a: a pitch the team already saved is kept
+        write_or_defer(f"ideation_stage.q_n_a {project_id}", lambda: supabase.table("ideation_stage").upsert(
+            {
+                "project_id": str(project_id),
+                "q_n_a": qna
+            },
+            on_conflict="project_id"
+        ).execute())
+
+    return remember("qna", project_id, qna)
+
+
+# -------------------------
+# Research TODOs
+# -------------------------
+def build_research_todo(
+    project_id: UUID,
+    roster: Optional[Dict] = None,
+    still_current: Callable[[], bool] = _always_current,
+) -> List[Dict]:
+    """
+    roster is the project's repository.project_roster() result if the caller
+    already has it; it is fetched (one round trip) when omitted.
+    """
+    if roster is None:
+        roster = repository.project_roster_sync(project_id)
+    if not roster:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    profiles = roster.get("members") or []
+
+    if not profiles:
+        return []
+
+    user_id_to_name = {str(profile["user_id"]): profile.get("full_name") for profile in profiles}
+
+    answer = final_call(to_team(profiles), roster["project"].get("problem_statement"))
+
+    grouped_data: Dict[str, List[str]] = {}
+    for item in answer.get("assignments", []):
+        uid = item.get("assigned_to")
+        if uid:
+            grouped_data.setdefault(uid, []).append(item.get("topic"))
+
+    members = [
+        {
+            "user_id": user_id,
+            "name": user_id_to_name.get(user_id),
+            "task": tasks,
+            "pdf_url": None
+        }
+        for user_id, tasks in grouped_data.items()
+        if user_id in user_id_to_name
+    ]
+
+    if members and still_current():
+        # One request for every current team member (unassigned members get no
+        # tasks); only tasks are written, so PDFs already uploaded are kept
+        rows = [
+            {
+                "project_id": str(project_id),
+                "user_id": user_id,
+                "tasks": grouped_data.get(user_id, [])
+            }
+            for user_id in user_id_to_name
+        ]
+        repository.upsert_or_defer_sync(
+            f"research_stage {project_id} ({len(rows)} members)",
+            "research_stage",
+            rows,
+            repository.RESEARCH_STAGE_KEY
+        )
+
+    return remember("research_todo", project_id, members)
+
+
+# -------------------------
+# PRD
+# -------------------------
+def build_prd(
+    project_id: UUID,
+    ideation: Optional[Dict] = None,
+    problem_statement: Optional[str] = None,
+    still_current: Callable[[], bool] = _always_current,
+) -> str:
+    """
+    ideation is the project's ideation_stage row if the caller already has it
+    ({} when there is no row yet), problem_statement the project's statement;
+    each is fetched when omitted.
+    """
+    if ideation is None:
+        ideation_res = supabase.table("ideation_stage") \
+            .select("pitch, q_n_a, prd") \
+            .eq("project_id", str(project_id)) \
+            .maybe_single() \
+            .execute()
+        ideation = (ideation_res and ideation_res.data) or {}
+
+    if problem_statement is None:
+        # Problem statement is not in the 'ideation_stage' schema
+        project_res = supabase.table("project_db") \
+            .select("problem_statement") \
+            .eq("id", str(project_id)) \
+            .execute()
+
+        if not project_res.data:
+            raise HTTPException(status_code=404, detail="Project ID not found in project_db")
+
+        problem_statement = project_res.data[0].get("problem_statement")
+
+    prd_text = run_prd_agent(
+        problem_statement,
+        ideation.get("pitch") or "",
+        ideation.get("q_n_a") or []
+    )
+
+    if not still_current():
+        return prd_text
+
+    remember("prd", project_id, prd_text)
+
+    if ideation:
+        # Row exists: only touch 'prd' so the saved pitch/qna are preserved
+        write_or_defer(f"ideation_stage.prd {project_id}", lambda: supabase.table("ideation_stage") \
+            .update({"prd": prd_text}) \
+            .eq("project_id", str(project_id)) \
+            .execute())
+    else:
+        write_or_defer(f"ideation_stage.prd {project_id}", lambda: supabase.table("ideation_stage") \
+            .insert({
+                "project_id": str(project_id),
+                "prd": prd_text
+            }) \
+            .execute())
+
+    return prd_text
+
+
+# -------------------------
+# Implementation TODOs
+# -------------------------
+def build_implementation_todo(
+    project_id: UUID,
+    roster: Optional[Dict] = None,
+    still_current: Callable[[], bool] = _always_current,
+) -> List[Dict[str, str]]:
+    """roster is the project's repository.project_roster() result if the caller already has it."""
+    ideation_res = supabase.table("ideation_stage") \
+        .select("prd") \
+        .eq("project_id", str(project_id)) \
+        .maybe_single() \
+        .execute()
+
+    prd_text = ideation_res and ideation_res.data and ideation_res.data.get("prd")
+    if not prd_text:
+        raise HTTPException(status_code=400, detail="PRD has not been generated yet")
+
+    profiles = fetch_team_profiles(project_id, roster)
+
+    tasks = final_call_todo(prd_text, to_team(profiles))["tasks"]
+
+    if still_current():
+        write_or_defer(f"implementation_stage {project_id}", lambda: supabase.table("implementation_stage").upsert(
+            {
+                "project_id": str(project_id),
+                "tasks": tasks
+            },
+            on_conflict="project_id"
+        ).execute())
+
+    return remember("implementation_todo", project_id, tasks)
+
+
+def cached_implementation_todo(project_id: UUID) -> Optional[List[Dict[str, str]]]:
+    response = supabase.table("implementation_stage") \
+        .select("tasks") \
+        .eq("project_id", str(project_id)) \
+        .maybe_single() \
+        .execute()
+
+    if response and response.data and response.data.get("tasks"):
+        return response.data["tasks"]
+    return None
+
+
+# -------------------------
+# Eager precompute
+# -------------------------
+# Statement last precomputed per project, so saving it again unchanged queues nothing
+PRECOMPUTED_SIZE = 512
+_precomputed: "OrderedDict[str, str]" = OrderedDict()
+
+
+def precompute_for_problem_statement(project_id: UUID, problem_statement: str) -> None:
+    """
+    Queue the Q&A and research TODO runs for a freshly saved problem statement,
+    in the BATCH class behind stage prefetches, unless they were already queued
+    for this statement. Any runs still queued or in flight for an older
+    statement are superseded.
+    """
+    key = str(project_id)
+    if _precomputed.get(key) == problem_statement:
+        _precomputed.move_to_end(key)
+        return
+    _precomputed[key] = problem_statement
+    _precomputed.move_to_end(key)
+    while len(_precomputed) > PRECOMPUTED_SIZE:
+        _precomputed.popitem(last=False)
+
+    team_id, hackathon_deadline = scheduling_info(project_id)
+    llm_queue.submit(
+        f"qna:{project_id}", build_qna, project_id, problem_statement,
+        team_id=team_id, deadline=hackathon_deadline, priority=Priority.BATCH
+    )
+    llm_queue.submit(
+        f"research_todo:{project_id}", build_research_todo, project_id,
+        team_id=team_id, deadline=hackathon_deadline, priority=Priority.BATCH
+    )
+
+
+# -------------------------
+# Stage prefetch
+# -------------------------
+def _has_ideation_field(project_id: UUID, field: str) -> bool:
+    response = supabase.table("ideation_stage") \
+        .select(field) \
+        .eq("project_id", str(project_id)) \
+        .maybe_single() \
+        .execute()
+    return bool(response and response.data and response.data.get(field))
+
+
+def _prefetch(kind: str, build: Callable, is_cached: Callable[[UUID], bool]) -> Callable:
+    def run(project_id: UUID, still_current: Callable[[], bool] = _always_current):
+        if is_cached(project_id):
+            return None
+        metrics.incr("prefetch.started", kind)
+        return build(project_id, still_current=still_current)
+    return run
+
+
+PREFETCHERS: Dict[str, Callable] = {
+    "qna": _prefetch("qna", build_qna, lambda pid: _has_ideation_field(pid, "q_n_a")),
+    "prd": _prefetch("prd", build_prd, lambda pid: _has_ideation_field(pid, "prd")),
+    "implementation_todo": _prefetch(
+        "implementation_todo",
+        build_implementation_todo,
+        lambda pid: cached_implementation_todo(pid) is not None
+    ),
+}
+
+
+def prefetch(kind: str, project_id: UUID) -> None:
+    """Warm the given artifact in the background unless it is already cached."""
+    team_id, hackathon_deadline = scheduling_info(project_id)
+    llm_queue.submit_prefetch(
+        f"{kind}:{project_id}", PREFETCHERS[kind], project_id,
+        team_id=team_id, deadline=hackathon_deadline
+    )
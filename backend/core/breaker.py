@@ -0,0 +1,166 @@
+"""
+Circuit breakers for the external dependencies (Gemini, Supabase, Cloudinary).
+
+A breaker opens after failure_threshold consecutive failures and then fails
+calls immediately with CircuitOpen (a 503 with Retry-After) instead of letting
+every handler wait on a dependency that is down. After reset_seconds it goes
+half-open and lets one probe call through: success closes it, failure opens
+it again. A probe that never reports back is replaced after reset_seconds.
+
+State is published as the gauge breaker.state[<name>]
+(0 closed, 1 half-open, 2 open).
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+
+from core import metrics
+
+load_dotenv()
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+BREAKER_SETTINGS: Dict[str, Dict] = json.loads(os.getenv("BREAKER_SETTINGS", "{}"))
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+_STATE_GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpen(HTTPException):
+    """A dependency's breaker is open; the call was not attempted."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"{name} is temporarily unavailable, please retry shortly",
+            headers={"Retry-After": str(max(1, int(retry_after + 0.5)))}
+        )
+        self.name = name
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._publish()
+
+    def _publish(self):
+        metrics.set_gauge("breaker.state", self.name, _STATE_GAUGE[self.state])
+
+    def _set_state(self, state: str):
+        # Caller holds self._lock
+        if state != self.state:
+            print(f"[WARN] Circuit breaker '{self.name}' {self.state} -> {state}")
+            self.state = state
+            self._publish()
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self.state == OPEN:
+                return max(self.opened_at + self.reset_seconds - time.monotonic(), 0.0)
+            return 0.0
+
+    def available(self) -> bool:
+        """True if a call would be let through now (without claiming a probe)."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                return now - self.opened_at >= self.reset_seconds
+            return self.probe_started_at is None or now - self.probe_started_at >= self.reset_seconds
+
+    def allow(self) -> bool:
+        """Whether to attempt a call now; in half-open state this claims the probe."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN and now - self.opened_at >= self.reset_seconds:
+                self._set_state(HALF_OPEN)
+                self.probe_started_at = None
+
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN:
+                if self.probe_started_at is None or now - self.probe_started_at >= self.reset_seconds:
+                    self.probe_started_at = now
+                    return True
+            return False
+
+    def check(self) -> None:
+        """Raise CircuitOpen unless a call may be attempted now."""
+        if not self.allow():
+            metrics.incr("breaker.rejected", self.name)
+            raise CircuitOpen(self.name, self.retry_after())
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.probe_started_at = None
+            self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        metrics.incr("breaker.failures", self.name)
+        with self._lock:
+            self.failures += 1
+            self.probe_started_at = None
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    metrics.incr("breaker.opened", self.name)
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def release(self) -> None:
+        """
+        The call ended without saying anything about the dependency (e.g. the
+        caller's own deadline ran out): no state change, but a half-open probe
+        slot is freed for the next call.
+        """
+        with self._lock:
+            self.probe_started_at = None
+
+    @contextmanager
+    def guard(self):
+        """Run the block as one call through the breaker."""
+        self.check()
+        try:
+            yield
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+
+    def call(self, fn: Callable, *args, **kwargs):
+        with self.guard():
+            return fn(*args, **kwargs)
+
+
+def _breaker(name: str) -> CircuitBreaker:
+    settings = BREAKER_SETTINGS.get(name, {})
+    return CircuitBreaker(
+        name,
+        int(settings.get("failure_threshold", BREAKER_FAILURE_THRESHOLD)),
+        float(settings.get("reset_seconds", BREAKER_RESET_SECONDS))
+    )
+
+
+BREAKERS: Dict[str, CircuitBreaker] = {
+    "gemini": _breaker("gemini"),
+    "supabase": _breaker("supabase"),
+    "cloudinary": _breaker("cloudinary"),
+}
@@ -0,0 +1,254 @@
+"""
+Hackathon catalog behind the explore API, with hot reload.
+
+CATALOG_SOURCE selects where hackathons come from: a .json file holding an
+array, a .jsonl file with one hackathon per line, or "supabase:<table>".
+Without it the mock list in routers/exploreApi.py is served. Files are
+parsed as a stream, one hackathon at a time, and Supabase tables are read
+in pages.
+
+A watcher thread polls the source every CATALOG_POLL_SECONDS (files are
+only re-read when their mtime or size changes). Each hackathon is compared
+with the previous load by content digest, and only the added, changed and
+removed ones are applied to the search index (HackathonIndex.apply); the
+index is rebuilt from scratch only once replaced entries make up
+REBUILD_DEAD_RATIO of it. The new index is swapped in with a single
+assignment, so searches in flight finish on the index they started with.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO
+
+from dotenv import load_dotenv
+
+from core import metrics
+from core.hackathon_index import HackathonIndex, catalog_key
+
+load_dotenv()
+
+CATALOG_SOURCE = os.getenv("CATALOG_SOURCE", "")
+CATALOG_POLL_SECONDS = float(os.getenv("CATALOG_POLL_SECONDS", "10"))
+
+CATALOG_PAGE_SIZE = 1000
+REBUILD_DEAD_RATIO = 0.25
+READ_CHUNK = 1 << 16
+
+
+def iter_json_array(handle: TextIO) -> Iterator[Any]:
+    """Items of a top-level JSON array, decoded one at a time while reading."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    opened = False
+
+    while True:
+        chunk = handle.read(READ_CHUNK)
+        buffer = buffer[position:] + chunk
+        position = 0
+
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position == len(buffer):
+                break
+            if not opened:
+                if buffer[position] != "[":
+                    raise ValueError("Catalog file must hold a JSON array")
+                opened = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if not chunk:
+                    raise
+                break  # item continues in the next chunk
+            yield item
+
+        if not chunk:
+            raise ValueError("Catalog file ended inside the JSON array")
+
+
+# -------------------------
+# Sources
+# -------------------------
+class CatalogSource(ABC):
+    def signature(self) -> Any:
+        """Cheap change marker; None means the source must be read to find out."""
+        return None
+
+    @abstractmethod
+    def read(self) -> Iterator[Dict[str, Any]]:
+        """Every hackathon of the source."""
+
+
+class StaticSource(CatalogSource):
+    def __init__(self, hackathons: List[Dict[str, Any]]):
+        self.hackathons = hackathons
+
+    def signature(self) -> Any:
+        return "static"
+
+    def read(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.hackathons)
+
+
+class FileSource(CatalogSource):
+    def __init__(self, path: str):
+        self.path = path
+
+    def signature(self) -> Any:
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def read(self) -> Iterator[Dict[str, Any]]:
+        with open(self.path, encoding="utf-8") as handle:
+            if self.path.endswith(".jsonl"):
+                for line in handle:
+                    if line.strip():
+                        yield json.loads(line)
+            else:
+                yield from iter_json_array(handle)
+
+
+class SupabaseSource(CatalogSource):
+    def __init__(self, table: str):
+        self.table = table
+
+    def read(self) -> Iterator[Dict[str, Any]]:
+        from core.database import supabase
+
+        start = 0
+        while True:
+            page = supabase.table(self.table) \
+                .select("*") \
+                .range(start, start + CATALOG_PAGE_SIZE - 1) \
+                .execute()
+            rows = page.data or []
+            yield from rows
+            if len(rows) < CATALOG_PAGE_SIZE:
+                return
+            start += CATALOG_PAGE_SIZE
+
+
+def source_from_env(fallback: List[Dict[str, Any]]) -> CatalogSource:
+    if CATALOG_SOURCE.startswith("supabase:"):
+        return SupabaseSource(CATALOG_SOURCE.split(":", 1)[1])
+    if CATALOG_SOURCE:
+        return FileSource(CATALOG_SOURCE)
+    return StaticSource(fallback)
+
+
+# -------------------------
+# Catalog
+# -------------------------
+class Catalog:
+    def __init__(self, source: CatalogSource):
+        self.source = source
+        self.index: Optional[HackathonIndex] = None
+        self.version = 0
+        self._digests: Dict[Any, str] = {}
+        self._signature: Any = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[], None]] = []
+
+    def subscribe(self, listener: Callable[[], None]):
+        """Call listener() after every new index is swapped in."""
+        self._listeners.append(listener)
+
+    def current(self) -> HackathonIndex:
+        """The index to search; loads the catalog on first use."""
+        index = self.index
+        if index is None:
+            self.load()
+            index = self.index
+        return index
+
+    def load(self):
+        """
+        First load and start of the watcher, once. The app preloads at startup
+        (routers.exploreApi.warm_up); requests arriving before that finishes
+        wait for the same load instead of reading the source again.
+        """
+        with self._load_lock:
+            if self.index is None:
+                self.refresh()
+        self.watch()
+
+    def refresh(self) -> bool:
+        """Apply source changes to the index; True if a new index was swapped in."""
+        with self._lock:
+            signature = self.source.signature()
+            if self.index is not None and signature is not None and signature == self._signature:
+                return False
+
+            started = time.monotonic()
+            digests: Dict[Any, str] = {}
+            changed: Dict[Any, Dict[str, Any]] = {}
+            for hackathon in self.source.read():
+                key = catalog_key(hackathon)
+                digest = hashlib.sha1(
+                    json.dumps(hackathon, sort_keys=True, default=str).encode("utf-8")
+                ).hexdigest()
+                digests[key] = digest
+                if self._digests.get(key) != digest:
+                    changed[key] = hackathon
+                else:
+                    changed.pop(key, None)
+            deleted = [key for key in self._digests if key not in digests]
+
+            self._signature = signature
+            if self.index is not None and not changed and not deleted:
+                self._digests = digests
+                return False
+
+            index = self._updated(list(changed.values()), deleted)
+            self.index = index
+            self._digests = digests
+            self.version += 1
+
+        for listener in self._listeners:
+            listener()
+        metrics.incr("catalog.reloads")
+        metrics.set_gauge("catalog.hackathons", "", len(index))
+        metrics.set_gauge("catalog.version", "", self.version)
+        metrics.incr("catalog.changed", "", len(changed) + len(deleted))
+        metrics.observe("catalog.reload", "", time.monotonic() - started)
+        return True
+
+    def _updated(self, upserts: List[Dict[str, Any]], deletes: List[Any]) -> HackathonIndex:
+        # Caller holds self._lock
+        current = self.index
+        if current is None:
+            return HackathonIndex(upserts)
+
+        index = current.apply(upserts, deletes)
+        if index.dead_ratio < REBUILD_DEAD_RATIO:
+            return index
+        # Too many replaced entries: rebuild from the live hackathons, refreshing IDF and lengths
+        return HackathonIndex(index.docs[doc] for doc in sorted(index.by_key.values()))
+
+    def watch(self):
+        """Start polling the source for changes (once)."""
+        with self._lock:
+            if self._watcher is not None or isinstance(self.source, StaticSource):
+                return
+            self._watcher = threading.Thread(target=self._poll, name="catalog-watcher", daemon=True)
+            self._watcher.start()
+
+    def _poll(self):
+        while True:
+            time.sleep(CATALOG_POLL_SECONDS)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"[WARN] Catalog reload failed, keeping version {self.version}: {e}")
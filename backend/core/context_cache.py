@@ -0,0 +1,170 @@
+"""
+Explicit context caching for the static instruction prefixes of the prompts.
+
+Prompts built from a prompts.SplitPrompt start with a system message that is
+identical on every call. With LLM_CONTEXT_CACHE on, core.llm asks this module
+for a cached-content handle for that prefix and sends only the variable part
+of the prompt, so the prefix is not re-processed on every call. One handle is
+kept per (model, prefix) and recreated shortly before its TTL runs out.
+
+Prefixes shorter than CONTEXT_CACHE_MIN_TOKENS (the provider's minimum cache
+size) are sent inline; being a stable prefix they can still hit the
+provider's implicit cache. If creating a handle fails, the prefix is sent
+inline for CONTEXT_CACHE_RETRY_SECONDS before the next attempt.
+
+GeminiContextCache talks to the Gemini caching API; LocalContextCache is an
+in-memory stand-in used with LLM_OFFLINE and in tests.
+"""
+
+import hashlib
+import itertools
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from core import metrics
+from core.prompts import count_tokens
+
+load_dotenv()
+
+LLM_CONTEXT_CACHE = os.getenv("LLM_CONTEXT_CACHE", "false").lower() == "true"
+CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("CONTEXT_CACHE_TTL_SECONDS", "3600"))
+CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("CONTEXT_CACHE_MIN_TOKENS", "1024"))
+CONTEXT_CACHE_RETRY_SECONDS = float(os.getenv("CONTEXT_CACHE_RETRY_SECONDS", "300"))
+
+# Handles this close to expiry are replaced rather than used
+REFRESH_MARGIN_SECONDS = 60
+
+
+@dataclass
+class CachedContent:
+    name: str
+    model: str
+    digest: str
+    tokens: int
+    expires_at: float
+
+
+class ContextCacheBackend(ABC):
+    """Creates provider-side cached content holding a system prompt."""
+
+    @abstractmethod
+    def create(self, model: str, system: str, ttl_seconds: int, display_name: str) -> str:
+        """Name of a new cached content for system on model, kept for ttl_seconds."""
+
+
+class GeminiContextCache(ContextCacheBackend):
+    def __init__(self):
+        from google import genai
+
+        self._client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+
+    def create(self, model: str, system: str, ttl_seconds: int, display_name: str) -> str:
+        from google.genai import types
+
+        cache = self._client.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                system_instruction=system,
+                ttl=f"{ttl_seconds}s",
+                display_name=display_name
+            )
+        )
+        return cache.name
+
+
+class LocalContextCache(ContextCacheBackend):
+    """In-memory stand-in: records every created prefix under a fake name."""
+
+    def __init__(self):
+        self.contents: Dict[str, Tuple[str, str]] = {}
+        self.created = 0
+        self._ids = itertools.count(1)
+
+    def create(self, model: str, system: str, ttl_seconds: int, display_name: str) -> str:
+        name = f"cachedContents/local-{next(self._ids)}"
+        self.contents[name] = (model, system)
+        self.created += 1
+        return name
+
+
+class ContextCache:
+    def __init__(self, backend: ContextCacheBackend, ttl_seconds: int, min_tokens: int):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self._handles: Dict[Tuple[str, str], CachedContent] = {}
+        self._failed_until: Dict[Tuple[str, str], float] = {}
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def handle_for(self, model: str, system: str) -> Optional[CachedContent]:
+        """A live handle for this prefix on this model, or None to send it inline."""
+        tokens = count_tokens(system)
+        if tokens < self.min_tokens:
+            return None
+
+        digest = hashlib.sha256(system.encode("utf-8")).hexdigest()
+        key = (model, digest)
+
+        with self._lock:
+            handle = self._fresh(key)
+            if handle is not None:
+                metrics.incr("context_cache.hit", model)
+                return handle
+            if time.monotonic() < self._failed_until.get(key, 0.0):
+                return None
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # One creator per prefix; concurrent callers wait and reuse its handle
+        with key_lock:
+            with self._lock:
+                handle = self._fresh(key)
+            if handle is not None:
+                metrics.incr("context_cache.hit", model)
+                return handle
+
+            try:
+                name = self.backend.create(model, system, self.ttl_seconds, f"prefix-{digest[:12]}")
+            except Exception as e:
+                print(f"[WARN] Context cache create failed for {model}, sending prefix inline: {e}")
+                metrics.incr("context_cache.failed", model)
+                with self._lock:
+                    self._failed_until[key] = time.monotonic() + CONTEXT_CACHE_RETRY_SECONDS
+                return None
+
+            handle = CachedContent(name, model, digest, tokens, time.monotonic() + self.ttl_seconds)
+            with self._lock:
+                self._handles[key] = handle
+            metrics.incr("context_cache.created", model)
+
+        # A replaced handle is left to expire: in-flight calls may still use it
+        return handle
+
+    def _fresh(self, key: Tuple[str, str]) -> Optional[CachedContent]:
+        # Caller holds self._lock
+        handle = self._handles.get(key)
+        if handle is not None and handle.expires_at - time.monotonic() > REFRESH_MARGIN_SECONDS:
+            return handle
+        return None
+
+
+_cache: Optional[ContextCache] = None
+_cache_lock = threading.Lock()
+
+
+def get(offline: bool = False) -> Optional[ContextCache]:
+    """The process-wide context cache, or None when LLM_CONTEXT_CACHE is off."""
+    global _cache
+    if not LLM_CONTEXT_CACHE:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            backend = LocalContextCache() if offline else GeminiContextCache()
+            _cache = ContextCache(backend, CONTEXT_CACHE_TTL_SECONDS, CONTEXT_CACHE_MIN_TOKENS)
+        return _cache
@@ -1,11 +1,260 @@
+import asyncio
+import inspect
 import os
-from supabase import create_client, Client
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Optional, Tuple
+
+import httpx
+from supabase import acreate_client, create_client, AsyncClient, AsyncClientOptions, Client, ClientOptions
 from dotenv import load_dotenv
 
+from core import deadline, metrics
+from core.breaker import BREAKERS, CircuitOpen
+
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+SUPABASE_TIMEOUT_SECONDS = float(os.getenv("SUPABASE_TIMEOUT_SECONDS", "10"))
+DEFERRED_WRITES_MAX = int(os.getenv("DEFERRED_WRITES_MAX", "1000"))
+SUPABASE_HTTP2 = os.getenv("SUPABASE_HTTP2", "true").lower() == "true"
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "100"))
+SUPABASE_MAX_KEEPALIVE = int(os.getenv("SUPABASE_MAX_KEEPALIVE", "20"))
+SUPABASE_KEEPALIVE_SECONDS = float(os.getenv("SUPABASE_KEEPALIVE_SECONDS", "30"))
+
+breaker = BREAKERS["supabase"]
+
+
+def _apply_deadline(request: httpx.Request):
+    """
+    httpx request hook: inside a core.deadline scope, refuse to start a
+    PostgREST call once the budget is gone and cap its timeout to what is left.
+    """
+    left = deadline.remaining()
+    if left is None:
+        return
+    if left <= 0:
+        raise deadline.DeadlineExceeded("Deadline exceeded before Supabase query")
+    request.extensions["timeout"] = httpx.Timeout(min(left, SUPABASE_TIMEOUT_SECONDS)).as_dict()
+
+
+class _BreakerTransport(httpx.BaseTransport):
+    """
+    Sends Supabase requests through the supabase circuit breaker. Connection
+    errors and 5xx responses count as failures; a timeout caused by the
+    request's own deadline does not.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        breaker.check()
+        try:
+            response = self._transport.handle_request(request)
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            _record_error(e)
+            raise
+        _record_response(response)
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class _AsyncBreakerTransport(httpx.AsyncBaseTransport):
+    """_BreakerTransport for the async client."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        breaker.check()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            _record_error(e)
+            raise
+        _record_response(response)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _record_error(error: Exception):
+    if isinstance(error, httpx.TimeoutException):
+        left = deadline.remaining()
+        if left is not None and left <= 0:
+            return
+    breaker.record_failure()
+
+
+def _record_response(response: httpx.Response):
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+
+_http_client = httpx.Client(
+    transport=_BreakerTransport(httpx.HTTPTransport()),
+    timeout=SUPABASE_TIMEOUT_SECONDS,
+    follow_redirects=True,
+    event_hooks={"request": [_apply_deadline]}
+)
+
+supabase: Client = create_client(
+    SUPABASE_URL,
+    SUPABASE_KEY,
+    options=ClientOptions(httpx_client=_http_client)
+)
+
+
+# -------------------------
+# Async client
+# -------------------------
+# One pooled HTTP/2 client per worker for the async handlers, opened and
+# closed by the app's lifespan (connect() / disconnect())
+async_supabase: Optional[AsyncClient] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_connect_lock = asyncio.Lock()
+
+
+async def _apply_deadline_async(request: httpx.Request):
+    _apply_deadline(request)
+
+
+async def connect() -> AsyncClient:
+    """Open the shared async client (once) and return it."""
+    global async_supabase, _async_http_client, _loop
+    async with _connect_lock:
+        if async_supabase is not None:
+            return async_supabase
+
+        limits = httpx.Limits(
+            max_connections=SUPABASE_MAX_CONNECTIONS,
+            max_keepalive_connections=SUPABASE_MAX_KEEPALIVE,
+            keepalive_expiry=SUPABASE_KEEPALIVE_SECONDS
+        )
+        _async_http_client = httpx.AsyncClient(
+            transport=_AsyncBreakerTransport(httpx.AsyncHTTPTransport(http2=SUPABASE_HTTP2, limits=limits)),
+            timeout=SUPABASE_TIMEOUT_SECONDS,
+            follow_redirects=True,
+            event_hooks={"request": [_apply_deadline_async]}
+        )
+        async_supabase = await acreate_client(
+            SUPABASE_URL,
+            SUPABASE_KEY,
+            options=AsyncClientOptions(httpx_client=_async_http_client)
+        )
+        _loop = asyncio.get_running_loop()
+        print(f"[INFO] Async Supabase client ready (http2={SUPABASE_HTTP2}, max_connections={SUPABASE_MAX_CONNECTIONS})")
+        return async_supabase
+
+
+async def disconnect():
+    global async_supabase, _async_http_client, _loop
+    async with _connect_lock:
+        if _async_http_client is not None:
+            await _async_http_client.aclose()
+        async_supabase = None
+        _async_http_client = None
+        _loop = None
+
+
+async def db() -> AsyncClient:
+    """The shared async client; connects on first use outside the lifespan (e.g. scripts, tests)."""
+    return async_supabase or await connect()
+
+
+# -------------------------
+# Deferred writes
+# -------------------------
+# Writes refused by the open breaker, replayed in order once it lets calls through.
+# Async writes are replayed on the event loop of the async client.
+_deferred: Deque[Tuple[str, Callable[[], Any]]] = deque()
+_deferred_lock = threading.Lock()
+_drainer: threading.Thread = None
+
+
+def write_or_defer(description: str, write: Callable[[], object]):
+    """
+    Run write() now, or queue it for later if the Supabase breaker is open.
+    Returns write()'s result, or None when the write was deferred. Only use
+    for idempotent writes (upserts, updates keyed on a primary key).
+    """
+    try:
+        return write()
+    except CircuitOpen:
+        _defer(description, write)
+        return None
+
+
+async def awrite_or_defer(description: str, write: Callable[[], Awaitable[Any]]):
+    """write_or_defer for writes through the async client."""
+    try:
+        return await write()
+    except CircuitOpen:
+        _defer(description, write)
+        return None
+
+
+def _replay(write: Callable[[], Any]):
+    result = write()
+    if inspect.isawaitable(result):
+        if _loop is None:
+            raise RuntimeError("Async Supabase client is closed")
+        result = asyncio.run_coroutine_threadsafe(result, _loop).result(SUPABASE_TIMEOUT_SECONDS)
+    return result
+
+
+def _defer(description: str, write: Callable[[], Any]):
+    global _drainer
+    with _deferred_lock:
+        if len(_deferred) >= DEFERRED_WRITES_MAX:
+            dropped, _ = _deferred.popleft()
+            metrics.incr("database.deferred_dropped")
+            print(f"[WARN] Deferred write queue full, dropping: {dropped}")
+        _deferred.append((description, write))
+        metrics.set_gauge("database.deferred_writes", "", len(_deferred))
+
+        if _drainer is None:
+            _drainer = threading.Thread(target=_drain, name="supabase-deferred-writes", daemon=True)
+            _drainer.start()
+
+    print(f"[INFO] Supabase unavailable, deferred write: {description}")
+
+
+def _drain():
+    global _drainer
+    while True:
+        time.sleep(max(breaker.retry_after(), 1.0))
+
+        while True:
+            with _deferred_lock:
+                if not _deferred:
+                    _drainer = None
+                    return
+                description, write = _deferred[0]
+
+            if not breaker.available():
+                break
 
+            try:
+                _replay(write)
+            except (CircuitOpen, httpx.TransportError):
+                break
+            except Exception as e:
+                print(f"[WARN] Deferred write failed, dropping: {description}: {e}")
+                metrics.incr("database.deferred_dropped")
+            else:
+                metrics.incr("database.deferred_replayed")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
\ No newline at end of file
+            with _deferred_lock:
+                if _deferred and _deferred[0][1] is write:
+                    _deferred.popleft()
+                metrics.set_gauge("database.deferred_writes", "", len(_deferred))
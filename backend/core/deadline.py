@@ -0,0 +1,117 @@
+"""
+Per-request deadlines propagated down to each LLM call and Supabase query.
+
+A request opens a scope with an absolute expiry. Each pipeline declares its
+graph nodes with plan([...]); when a node calls the LLM it gets a share of
+the remaining time proportional to its recent p50 latency relative to the
+nodes still ahead of it. Work started after the deadline raises
+DeadlineExceeded. Optional refinement nodes can call should_skip() and pass
+their input through when their share is too small to be useful.
+"""
+
+import contextvars
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+from core import metrics
+
+load_dotenv()
+
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "120"))
+DEADLINE_MIN_NODE_SECONDS = float(os.getenv("DEADLINE_MIN_NODE_SECONDS", "5"))
+ROUTE_DEADLINES = json.loads(os.getenv("ROUTE_DEADLINES", "{}"))
+
+# Assumed latency for a node that has no recorded samples yet
+DEFAULT_NODE_SECONDS = 8.0
+
+
+class DeadlineExceeded(Exception):
+    """The request ran out of its time budget."""
+
+
+def for_route(route: str) -> float:
+    """Time budget in seconds for one request to the given route."""
+    return float(ROUTE_DEADLINES.get(route, REQUEST_DEADLINE_SECONDS))
+
+
+_expires_at: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline_expires_at", default=None)
+_plan: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar("deadline_plan", default=None)
+
+
+@contextmanager
+def scope_until(expires_at: Optional[float]):
+    """Run the block under an absolute time.monotonic() expiry (None: no deadline)."""
+    current = _expires_at.get()
+    if current is not None and expires_at is not None:
+        expires_at = min(current, expires_at)
+    token = _expires_at.set(expires_at if expires_at is not None else current)
+    try:
+        yield
+    finally:
+        _expires_at.reset(token)
+
+
+@contextmanager
+def scope(seconds: Optional[float]):
+    with scope_until(time.monotonic() + seconds if seconds is not None else None):
+        yield
+
+
+@contextmanager
+def plan(nodes: List[str]):
+    """Declare the graph nodes the enclosed pipeline will run, in order."""
+    token = _plan.set(list(nodes))
+    try:
+        yield
+    finally:
+        _plan.reset(token)
+
+
+def remaining() -> Optional[float]:
+    expires_at = _expires_at.get()
+    if expires_at is None:
+        return None
+    return expires_at - time.monotonic()
+
+
+def check(what: str = "") -> None:
+    left = remaining()
+    if left is not None and left <= 0:
+        metrics.incr("deadline.exceeded", what)
+        raise DeadlineExceeded(f"Deadline exceeded before {what or 'operation'}")
+
+
+def _node_cost(node: str) -> float:
+    return metrics.percentile("llm.call", node, 0.5) or DEFAULT_NODE_SECONDS
+
+
+def budget_for(node: str) -> Optional[float]:
+    """
+    Seconds this node may spend, or None when no deadline is set. Nodes not
+    in the current plan get whatever time is left.
+    """
+    left = remaining()
+    if left is None:
+        return None
+
+    nodes = _plan.get() or []
+    if node not in nodes:
+        return max(left, 0.0)
+
+    ahead = nodes[nodes.index(node):]
+    total = sum(_node_cost(n) for n in ahead)
+    return max(left * _node_cost(node) / total, 0.0)
+
+
+def should_skip(node: str) -> bool:
+    """True if an optional node's share of the budget is below the useful minimum."""
+    budget = budget_for(node)
+    if budget is None or budget >= DEADLINE_MIN_NODE_SECONDS:
+        return False
+    metrics.incr("deadline.skipped", node)
+    return True
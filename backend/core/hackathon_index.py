@@ -0,0 +1,656 @@
+"""
+In-memory search index over the hackathon catalog (routers/exploreApi.py).
+
+Built when the catalog is loaded: name, description and tags are
+lowercased and tokenized a single time, and every token maps to a posting
+list, the sorted positions of the hackathons containing it, and to the same
+set as a bitmap (a Python int with bit i set for hackathon i). Catalog
+changes are applied by apply(), which returns an updated copy (see
+core.catalog); positions of removed hackathons drop out of the live bitmap.
+
+Every platform, mode and tag value has a bitmap too. Filters are OR-ed
+within their facet group and AND-ed across groups, and facet counts are
+popcounts of each value's bitmap against the matches, so a search is a
+handful of big-int operations whatever the catalog size.
+
+Matches are ranked with BM25F: each field's term frequency is normalized by
+that field's length and weighted (SEARCH_FIELD_WEIGHTS) before saturation,
+and featured hackathons get SEARCH_FEATURED_BOOST added to their score.
+Document lengths are fixed once the index is built, so every posting's
+contribution (its "impact") and the IDF table are computed at build time; a
+query only sums impacts and takes the top k with a heap.
+
+Query words are matched leniently for search-as-you-type: the last word,
+while still being typed, also matches vocabulary words it is a prefix of
+(found by bisecting the sorted vocabulary), and a word that is not in the
+vocabulary matches words within a small edit distance (candidates come from
+a trigram index over the vocabulary). Expanded words count for less than
+exact ones, and at most SEARCH_MAX_EXPANSIONS words stand in for one query
+word. Expansions of recent words and prefixes are kept in an LRU, so each
+keystroke narrows the previous prefix's candidates instead of starting over.
+
+deadline, daysLeft, participants and prize are parsed into numbers (dates
+as ordinals, "$50,000" as 50000) and kept as sorted columns: range filters
+are two bisections, and sorting by a column walks its sorted order from a
+keyset cursor, the (value, position) of the last hackathon served, so a
+deep page costs the same as the first one. Relevance pages use the same
+cursor form with the score as value.
+"""
+
+import copy
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SEARCH_FIELD_WEIGHTS: Dict[str, float] = {
+    "name": 3.0,
+    "tags": 2.0,
+    "description": 1.0,
+    **json.loads(os.getenv("SEARCH_FIELD_WEIGHTS", "{}")),
+}
+SEARCH_FEATURED_BOOST = float(os.getenv("SEARCH_FEATURED_BOOST", "1.0"))
+
+SEARCH_MAX_EXPANSIONS = int(os.getenv("SEARCH_MAX_EXPANSIONS", "32"))
+SEARCH_PREFIX_CACHE_SIZE = int(os.getenv("SEARCH_PREFIX_CACHE_SIZE", "512"))
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Score multipliers for words matched by prefix or with 1 / 2 typos
+PREFIX_WEIGHT = 0.8
+TYPO_WEIGHTS = {1: 0.6, 2: 0.4}
+MIN_PREFIX_LENGTH = 1
+# Trigram candidates checked with the edit distance per misspelled word
+FUZZY_CANDIDATES = 200
+
+# Hackathons examined per step when walking a sorted column for one page
+SCAN_CHUNK = 256
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_AMOUNT = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*([km])?", re.IGNORECASE)
+
+TEXT_FIELDS = ("name", "description", "tags")
+FACET_GROUPS = ("platform", "mode", "tags")
+SORT_COLUMNS = ("deadline", "daysLeft", "participants", "prize")
+RELEVANCE = "relevance"
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def max_typos(word: str) -> int:
+    return 0 if len(word) <= 3 else 1 if len(word) <= 7 else 2
+
+
+def trigrams(word: str) -> set:
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> Optional[int]:
+    """Levenshtein distance between a and b, or None if it exceeds limit."""
+    if abs(len(a) - len(b)) > limit:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other)))
+        if min(current) > limit:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= limit else None
+
+
+def members(bits: int) -> List[int]:
+    """Positions of the set bits, ascending."""
+    if not bits:
+        return []
+    raw = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder="little")).tolist()
+
+
+def bitmap(docs: List[int], size: int) -> int:
+    """Bitmap with the given positions set."""
+    if len(docs) < 64:
+        bits = 0
+        for doc in docs:
+            bits |= 1 << int(doc)
+        return bits
+    flags = np.zeros(size, dtype=bool)
+    flags[docs] = True
+    return int.from_bytes(np.packbits(flags, bitorder="little").tobytes(), "little")
+
+
+def parse_date(value: Any) -> Optional[int]:
+    """Day ordinal of "Feb 15, 2026" or "2026-02-15"."""
+    for layout in ("%b %d, %Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(str(value).strip(), layout).toordinal()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_amount(value: Any) -> Optional[float]:
+    """Number in "$50,000", "10k", 1250, ..."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    match = _AMOUNT.search(str(value or ""))
+    if not match:
+        return None
+    amount = float(match.group(1).replace(",", ""))
+    return amount * {"k": 1e3, "m": 1e6}.get((match.group(2) or "").lower(), 1)
+
+
+def column_value(column: str, value: Any) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    if column == "deadline":
+        return parse_date(value)
+    return parse_amount(value)
+
+
+def range_bound(column: str, value: Any) -> Optional[float]:
+    """column_value() of a range filter bound; ValueError if it is given but does not parse."""
+    parsed = column_value(column, value)
+    if parsed is None and value is not None and value != "":
+        raise ValueError(f"{column} bound {value!r} is not a valid {column} value")
+    return parsed
+
+
+@dataclass
+class SortedColumn:
+    values: np.ndarray   # ascending
+    docs: np.ndarray     # hackathon positions in that order, ties by position
+    missing: np.ndarray  # hackathons without a value, ascending; they sort last
+
+
+def analyze(hackathon: Dict[str, Any]) -> Tuple[Dict[str, str], Dict[str, Counter], List[Tuple[str, str]]]:
+    """Lowercased text fields, per-field token counts and (group, value) facets of one hackathon."""
+    lowered = {
+        "name": str(hackathon.get("name", "")).lower(),
+        "description": str(hackathon.get("description", "")).lower(),
+        "tags": " ".join(hackathon.get("tags", [])).lower(),
+    }
+    counts = {field: Counter(tokenize(lowered[field])) for field in TEXT_FIELDS}
+
+    values = [("platform", hackathon.get("platform")), ("mode", hackathon.get("mode"))]
+    values += [("tags", tag) for tag in hackathon.get("tags", [])]
+    facets = [(group, str(value).strip()) for group, value in values if value and str(value).strip()]
+
+    return lowered, counts, facets
+
+
+def catalog_key(hackathon: Dict[str, Any]) -> Any:
+    """Identity of a hackathon across catalog reloads: its id, else its name."""
+    key = hackathon.get("id")
+    return key if key is not None else str(hackathon.get("name", "")).lower()
+
+
+class HackathonIndex:
+    def __init__(self, hackathons: Iterable[Dict[str, Any]]):
+        hackathons = list(hackathons)
+        analyzed = [analyze(hackathon) for hackathon in hackathons]
+
+        self.docs: List[Dict[str, Any]] = []
+        self.live = 0
+        self.by_name: Dict[str, int] = {}
+        self.by_key: Dict[Any, int] = {}
+        self.postings: Dict[str, np.ndarray] = {}
+        self.impacts: Dict[str, np.ndarray] = {}
+        self.idf: Dict[str, float] = {}
+        self.token_bits: Dict[str, int] = {}
+        self.facet_bits: Dict[str, Dict[str, int]] = {group: {} for group in FACET_GROUPS}
+        self.facet_labels: Dict[str, Dict[str, str]] = {group: {} for group in FACET_GROUPS}
+        self.boost = np.zeros(0, dtype=np.float64)
+        self.columns: Dict[str, SortedColumn] = {
+            column: SortedColumn(np.zeros(0), np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp))
+            for column in SORT_COLUMNS
+        }
+        self.vocabulary: List[str] = []
+        self.trigrams: Dict[str, List[str]] = {}
+
+        # Field lengths are normalized by the averages of the initial catalog
+        self.averages: Dict[str, float] = {}
+        for field in TEXT_FIELDS:
+            lengths = [sum(counts[field].values()) for _, counts, _ in analyzed]
+            average = sum(lengths) / len(lengths) if lengths else 0.0
+            self.averages[field] = average if average > 0 else 1.0
+
+        self._add(hackathons, analyzed)
+        self._recent: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._recent_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.live.bit_count()
+
+    @property
+    def dead_ratio(self) -> float:
+        """Share of indexed positions held by deleted or replaced hackathons."""
+        return 1 - len(self) / len(self.docs) if self.docs else 0.0
+
+    def is_live(self, doc: int) -> bool:
+        return bool(self.live >> doc & 1)
+
+    # -------------------------
+    # Building and updates
+    # -------------------------
+    def apply(self, upserts: List[Dict[str, Any]], deletes: Iterable[Any] = ()) -> "HackathonIndex":
+        """
+        A new index with hackathons added, replaced (same catalog_key) or
+        deleted; this one is left untouched for searches still using it.
+        Replaced and deleted hackathons keep their position but leave the
+        live bitmap, and new versions are appended, so unchanged postings,
+        bitmaps and cursor positions carry over. IDF and average lengths stay
+        those of the last full build until the index is rebuilt.
+        """
+        index = copy.copy(self)
+        index.docs = list(self.docs)
+        index.by_name = dict(self.by_name)
+        index.by_key = dict(self.by_key)
+        index.postings = dict(self.postings)
+        index.impacts = dict(self.impacts)
+        index.idf = dict(self.idf)
+        index.token_bits = dict(self.token_bits)
+        index.facet_bits = {group: dict(values) for group, values in self.facet_bits.items()}
+        index.facet_labels = {group: dict(values) for group, values in self.facet_labels.items()}
+        index.columns = dict(self.columns)
+        index.trigrams = dict(self.trigrams)
+        index._recent = OrderedDict()
+        index._recent_lock = threading.Lock()
+
+        removed = 0
+        for key in [*deletes, *(catalog_key(hackathon) for hackathon in upserts)]:
+            doc = index.by_key.pop(key, None)
+            if doc is not None:
+                removed |= 1 << doc
+        index.live &= ~removed
+
+        index._add(upserts, [analyze(hackathon) for hackathon in upserts])
+        return index
+
+    def _add(self, hackathons: List[Dict[str, Any]], analyzed: List[Tuple]):
+        """Append hackathons at new positions; replaces (never mutates) shared arrays and lists."""
+        start = len(self.docs)
+        self.docs.extend(hackathons)
+        size = len(self.docs)
+        self.live |= ((1 << size) - 1) ^ ((1 << start) - 1)
+
+        facet_postings: Dict[str, Dict[str, List[int]]] = {group: {} for group in FACET_GROUPS}
+        postings: Dict[str, Tuple[List[int], List[float]]] = {}
+        for doc, (hackathon, (lowered, counts, facets)) in enumerate(zip(hackathons, analyzed), start):
+            current = self.by_name.get(lowered["name"])
+            if current is None or not self.is_live(current):
+                self.by_name[lowered["name"]] = doc
+            self.by_key[catalog_key(hackathon)] = doc
+
+            for group, label in facets:
+                value = label.lower()
+                docs = facet_postings[group].setdefault(value, [])
+                if not docs or docs[-1] != doc:
+                    docs.append(doc)
+                self.facet_labels[group].setdefault(value, label)
+
+            for token, tf in self._weighted_tf(counts).items():
+                docs, tfs = postings.setdefault(token, ([], []))
+                docs.append(doc)
+                tfs.append(tf)
+
+        for group, values in facet_postings.items():
+            bits = self.facet_bits[group]
+            for value, docs in values.items():
+                bits[value] = bits.get(value, 0) | bitmap(docs, size)
+
+        live = len(self)
+        new_tokens = []
+        for token, (docs, tfs) in postings.items():
+            docs = np.array(docs, dtype=np.intp)
+            tf = np.array(tfs, dtype=np.float64)
+            if token not in self.postings:
+                new_tokens.append(token)
+                self.idf[token] = math.log(1 + (live - len(docs) + 0.5) / (len(docs) + 0.5))
+                self.postings[token] = docs
+                self.impacts[token] = self.idf[token] * tf / (BM25_K1 + tf)
+                self.token_bits[token] = bitmap(docs, size)
+            else:
+                self.postings[token] = np.concatenate((self.postings[token], docs))
+                self.impacts[token] = np.concatenate((self.impacts[token], self.idf[token] * tf / (BM25_K1 + tf)))
+                self.token_bits[token] |= bitmap(docs, size)
+
+        self.boost = np.concatenate((self.boost, np.array(
+            [SEARCH_FEATURED_BOOST if hackathon.get("featured") else 0.0 for hackathon in hackathons],
+            dtype=np.float64
+        )))
+
+        for column in SORT_COLUMNS:
+            values = [column_value(column, hackathon.get(column)) for hackathon in hackathons]
+            present = np.array([doc for doc, value in enumerate(values, start) if value is not None], dtype=np.intp)
+            numbers = np.array([value for value in values if value is not None], dtype=np.float64)
+            missing = np.array([doc for doc, value in enumerate(values, start) if value is None], dtype=np.intp)
+
+            # New positions are above every existing one, so among equal values
+            # they go after the old entries: a merge, not a re-sort
+            old = self.columns[column]
+            order = np.lexsort((present, numbers))
+            at = np.searchsorted(old.values, numbers[order], "right")
+            self.columns[column] = SortedColumn(
+                np.insert(old.values, at, numbers[order]),
+                np.insert(old.docs, at, present[order]),
+                np.concatenate((old.missing, missing))
+            )
+
+        if new_tokens:
+            self.vocabulary = list(heapq.merge(self.vocabulary, sorted(new_tokens)))
+            grams: Dict[str, List[str]] = {}
+            for token in new_tokens:
+                for gram in trigrams(token):
+                    grams.setdefault(gram, []).append(token)
+            for gram, tokens in grams.items():
+                self.trigrams[gram] = self.trigrams.get(gram, []) + tokens
+
+    def _weighted_tf(self, counts: Dict[str, Counter]) -> Dict[str, float]:
+        """BM25F pseudo term frequency: field tfs, length-normalized and weighted, summed."""
+        weighted: Dict[str, float] = {}
+        for field in TEXT_FIELDS:
+            length = sum(counts[field].values())
+            scale = SEARCH_FIELD_WEIGHTS.get(field, 1.0) / (1 - BM25_B + BM25_B * length / self.averages[field])
+            for token, count in counts[field].items():
+                weighted[token] = weighted.get(token, 0.0) + count * scale
+        return weighted
+
+    # -------------------------
+    # Query words
+    # -------------------------
+    def terms(self, query: str) -> List[Dict[str, float]]:
+        """
+        For each query word, the vocabulary words it matches with their
+        weights. The last word counts as a prefix unless the query ends in
+        whitespace (the user has finished typing it).
+        """
+        tokens = tokenize(query)
+        typing = bool(tokens) and not query[-1:].isspace()
+        seen = set()
+        terms = []
+        for position, token in enumerate(tokens):
+            key = (token, typing and position == len(tokens) - 1)
+            if key not in seen:
+                seen.add(key)
+                terms.append(self.expansions(*key))
+        return terms
+
+    def expansions(self, word: str, prefix: bool = False) -> Dict[str, float]:
+        key = ("word", word, prefix)
+        found = self._cached(key)
+        if found is not None:
+            return found
+
+        found = {}
+        if word in self.postings:
+            found[word] = 1.0
+        if prefix and len(word) >= MIN_PREFIX_LENGTH:
+            for token in self._prefixed(word):
+                found.setdefault(token, PREFIX_WEIGHT)
+        if word not in self.postings:
+            for token, weight in self._misspelled(word).items():
+                found.setdefault(token, weight)
+
+        if len(found) > SEARCH_MAX_EXPANSIONS:
+            best = heapq.nlargest(
+                SEARCH_MAX_EXPANSIONS, found,
+                key=lambda token: (found[token], len(self.postings[token]))
+            )
+            found = {token: found[token] for token in best}
+
+        self._remember(key, found)
+        return found
+
+    def _prefixed(self, prefix: str) -> List[str]:
+        """Vocabulary words starting with prefix, the most frequent ones if there are too many."""
+        key = ("prefix", prefix)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached[0]
+
+        # A complete candidate list for the previous keystroke already holds every answer
+        parent = self._cached(("prefix", prefix[:-1]))
+        if parent is not None and parent[1]:
+            candidates, complete = [token for token in parent[0] if token.startswith(prefix)], True
+        else:
+            start = bisect_left(self.vocabulary, prefix)
+            end = bisect_left(self.vocabulary, prefix + "~", start)
+            complete = end - start <= SEARCH_MAX_EXPANSIONS
+            candidates = self.vocabulary[start:end]
+            if not complete:
+                candidates = heapq.nlargest(
+                    SEARCH_MAX_EXPANSIONS, candidates,
+                    key=lambda token: len(self.postings[token])
+                )
+
+        self._remember(key, (candidates, complete))
+        return candidates
+
+    def _misspelled(self, word: str) -> Dict[str, float]:
+        """Vocabulary words within max_typos(word) edits of word."""
+        limit = max_typos(word)
+        if not limit:
+            return {}
+
+        grams = trigrams(word)
+        shared: Counter = Counter()
+        for gram in grams:
+            shared.update(self.trigrams.get(gram, ()))
+
+        # Each edit destroys at most three of the word's trigrams
+        needed = len(grams) - 3 * limit
+        found = {}
+        for token, count in shared.most_common(FUZZY_CANDIDATES):
+            if count < needed:
+                break
+            distance = edit_distance(word, token, limit)
+            if distance:
+                found[token] = TYPO_WEIGHTS[distance]
+        return found
+
+    def _cached(self, key: Tuple) -> Any:
+        with self._recent_lock:
+            value = self._recent.get(key)
+            if value is not None:
+                self._recent.move_to_end(key)
+            return value
+
+    def _remember(self, key: Tuple, value: Any):
+        with self._recent_lock:
+            self._recent[key] = value
+            while len(self._recent) > SEARCH_PREFIX_CACHE_SIZE:
+                self._recent.popitem(last=False)
+
+    # -------------------------
+    # Matching and ranking
+    # -------------------------
+    def match(self, query: str) -> int:
+        """Bitmap of hackathons matching every query word in their name, description or tags."""
+        terms = self.terms(query)
+        if not terms:
+            return self.live
+        bits = self.live
+        for expansions in sorted(terms, key=len):
+            term_bits = 0
+            for token in expansions:
+                term_bits |= self.token_bits[token]
+            bits &= term_bits
+            if not bits:
+                break
+        return bits
+
+    def filter_groups(self, values: Iterable[str]) -> Dict[str, int]:
+        """
+        Filter values grouped by facet, each group OR-ed into one bitmap. A
+        value is assigned to the first group that has it; a value no
+        hackathon has forms a group of its own that matches nothing.
+        """
+        groups: Dict[str, int] = {}
+        for value in values:
+            value = value.strip().lower()
+            if not value:
+                continue
+            group = next((g for g in FACET_GROUPS if value in self.facet_bits[g]), None)
+            if group is None:
+                groups[f"unknown:{value}"] = 0
+                continue
+            groups[group] = groups.get(group, 0) | self.facet_bits[group][value]
+        return groups
+
+    def in_range(self, column: str, low: Any = None, high: Any = None) -> int:
+        """Bitmap of the hackathons whose column value is within [low, high]; ValueError for a bound that does not parse."""
+        sorted_column = self.columns[column]
+        low = range_bound(column, low)
+        high = range_bound(column, high)
+        start = np.searchsorted(sorted_column.values, low, "left") if low is not None else 0
+        end = np.searchsorted(sorted_column.values, high, "right") if high is not None else len(sorted_column.values)
+        return bitmap(sorted_column.docs[start:end], len(self.docs))
+
+    def search(
+        self,
+        query: str,
+        filters: Optional[List[str]] = None,
+        ranges: Optional[Dict[str, Tuple[Any, Any]]] = None,
+    ) -> Tuple[int, Dict[str, Dict[str, int]]]:
+        """
+        Bitmap of the matching hackathons and the facet counts for them.
+        ranges maps sort columns to inclusive (low, high) bounds, either may
+        be None. Counts for a group ignore that group's own filter (counts
+        for "Hybrid" stay visible while "Online" is selected, as the two are OR-ed).
+        """
+        base = self.match(query) if query else self.live
+        for column, (low, high) in (ranges or {}).items():
+            if low is not None or high is not None:
+                base &= self.in_range(column, low, high)
+        groups = self.filter_groups(filters or [])
+
+        result = base
+        for bits in groups.values():
+            result &= bits
+
+        facets: Dict[str, Dict[str, int]] = {}
+        for group in FACET_GROUPS:
+            scope = base
+            for other, bits in groups.items():
+                if other != group:
+                    scope &= bits
+            counts = {}
+            for value, bits in self.facet_bits[group].items():
+                count = (scope & bits).bit_count()
+                if count:
+                    counts[self.facet_labels[group][value]] = count
+            facets[group] = dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+        return result, facets
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25F score plus the featured boost of every hackathon."""
+        scores = self.boost.copy()
+        for expansions in self.terms(query):
+            # A hackathon scores by its best match for each query word
+            best = np.zeros(len(self.docs))
+            for token, weight in expansions.items():
+                docs = self.postings[token]
+                best[docs] = np.maximum(best[docs], weight * self.impacts[token])
+            scores += best
+        return scores
+
+    def page(
+        self,
+        query: str,
+        bits: int,
+        limit: int,
+        sort: str = RELEVANCE,
+        after: Optional[Tuple[Optional[float], int]] = None,
+    ) -> Tuple[List[int], Optional[Tuple[Optional[float], int]]]:
+        """
+        Up to limit hackathons of bits in sort order ("relevance", or a sort
+        column, "-" prefixed for descending), starting after the keyset
+        after. Returns them with the keyset of the last one if more follow.
+        """
+        if sort.lstrip("-") == RELEVANCE:
+            return self._page_by_relevance(query, bits, limit, after)
+        return self._page_by_column(sort.lstrip("-"), sort.startswith("-"), bits, limit, after)
+
+    def _page_by_relevance(self, query, bits, limit, after):
+        candidates = np.array(members(bits), dtype=np.intp)
+        if limit <= 0 or not len(candidates):
+            return [], None
+
+        scores = self.scores(query)
+        if after is not None:
+            score, last = after
+            ranked = scores[candidates]
+            candidates = candidates[(ranked < score) | ((ranked == score) & (candidates > last))]
+
+        # nlargest is stable, so ties keep catalog order
+        top = heapq.nlargest(limit + 1, candidates.tolist(), key=scores.__getitem__)
+        docs = top[:limit]
+        more = len(top) > limit
+        return docs, ((float(scores[docs[-1]]), docs[-1]) if more else None)
+
+    def _page_by_column(self, column, descending, bits, limit, after):
+        sorted_column = self.columns[column]
+        if limit <= 0 or not bits:
+            return [], None
+
+        # The rest of the sort order after the cursor as array views: hackathons
+        # with a value (reversed for descending), then those without one
+        if after is None:
+            ordered = sorted_column.docs[::-1] if descending else sorted_column.docs
+            segments = [ordered, sorted_column.missing]
+        elif after[0] is not None:
+            value, last = after
+            low = np.searchsorted(sorted_column.values, value, "left")
+            high = np.searchsorted(sorted_column.values, value, "right")
+            start = low + np.searchsorted(sorted_column.docs[low:high], last, "left" if descending else "right")
+            ordered = sorted_column.docs[:start][::-1] if descending else sorted_column.docs[start:]
+            segments = [ordered, sorted_column.missing]
+        else:
+            segments = [sorted_column.missing[np.searchsorted(sorted_column.missing, after[1], "right"):]]
+
+        flags = np.unpackbits(
+            np.frombuffer(bits.to_bytes((len(self.docs) + 7) // 8, "little"), dtype=np.uint8),
+            bitorder="little"
+        ).astype(bool)
+
+        docs: List[int] = []
+        for segment in segments:
+            for offset in range(0, len(segment), SCAN_CHUNK):
+                chunk = segment[offset:offset + SCAN_CHUNK]
+                docs.extend(chunk[flags[chunk]].tolist())
+                if len(docs) > limit:
+                    break
+            if len(docs) > limit:
+                break
+
+        more = len(docs) > limit
+        docs = docs[:limit]
+        if not more:
+            return docs, None
+        return docs, (self._value_of(column, docs[-1]), docs[-1])
+
+    def _value_of(self, column: str, doc: int) -> Optional[float]:
+        return column_value(column, self.docs[doc].get(column))
+
+    def find(self, name: str) -> Optional[Dict[str, Any]]:
+        doc = self.by_name.get(name.lower())
+        return self.docs[doc] if doc is not None and self.is_live(doc) else None
@@ -0,0 +1,404 @@
+"""
+Shared call path for every Gemini invocation made by the notebooks.
+
+All calls draw from one process-wide token bucket so foreground requests and
+background work (eager precompute, stage prefetch) share a single rate limit.
+Background calls may only spend the part of the bucket above a reserve, which
+keeps headroom for interactive requests.
+
+Inside a core.deadline scope, each call is bounded by its node's share of
+the request budget, including the time spent waiting for a token. What is
+left of it is also the client's request timeout, so a call the caller has
+given up on does not keep running.
+
+The model behind each call is picked per node by core.llm_routing. A call
+that hits quota exhaustion on its tier marks the tier degraded and is retried
+once on the tier's downgrade target. With LLM_OFFLINE set, every tier is
+served by OfflineLLM instead of Gemini.
+
+A prompt that starts with a system message (prompts.SplitPrompt) has that
+prefix replaced by a cached-content handle when LLM_CONTEXT_CACHE is on.
+
+Calls go through the "gemini" circuit breaker, so during an outage they fail
+fast with CircuitOpen instead of tying up workers until they time out. Only
+provider errors count against it; a call that runs out of its own deadline
+does not.
+
+Pipelines can opt into hedging with `with hedging():`. When LLM_HEDGE is on,
+a call still running after its node's recent LLM_HEDGE_PERCENTILE latency
+gets a duplicate; whichever returns first wins and the other is cancelled
+(or, if already running, its result is dropped). Hedges are limited to
+LLM_HEDGE_BUDGET of all calls and also take a rate-limit token.
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from collections import deque
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+from langchain_core.exceptions import ModelRateLimitError
+from langchain_core.messages import AIMessage, SystemMessage
+
+from core import context_cache, deadline, llm_routing, metrics
+from core.breaker import BREAKERS
+
+load_dotenv()
+
+LLM_RATE_PER_MINUTE = float(os.getenv("LLM_RATE_PER_MINUTE", "30"))
+LLM_BURST = float(os.getenv("LLM_BURST", "5"))
+LLM_BACKGROUND_RESERVE = float(os.getenv("LLM_BACKGROUND_RESERVE", "2"))
+LLM_BOUNDED_CALL_WORKERS = int(os.getenv("LLM_BOUNDED_CALL_WORKERS", "16"))
+LLM_OFFLINE = os.getenv("LLM_OFFLINE", "false").lower() == "true"
+LLM_HEDGE = os.getenv("LLM_HEDGE", "false").lower() == "true"
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+LLM_HEDGE_BUDGET = float(os.getenv("LLM_HEDGE_BUDGET", "0.05"))
+LLM_HEDGE_NODES = json.loads(os.getenv("LLM_HEDGE_NODES", "null"))
+
+# Samples a node needs before its percentile is trusted as a hedge trigger
+HEDGE_MIN_SAMPLES = 20
+
+
+class RateLimiter:
+    """Token bucket refilled continuously at rate_per_minute, capped at burst."""
+
+    def __init__(self, rate_per_minute: float, burst: float):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(burst, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, reserve: float = 0.0, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a token can be taken while leaving at least `reserve`
+        tokens in the bucket. Returns False if that takes longer than timeout.
+        """
+        reserve = min(reserve, self.capacity - 1.0)
+        give_up_at = time.monotonic() + timeout if timeout is not None else None
+        with self.cond:
+            while True:
+                self._refill()
+                if self.tokens - 1.0 >= reserve:
+                    self.tokens -= 1.0
+                    return True
+                missing = reserve + 1.0 - self.tokens
+                wait = missing / self.rate if self.rate > 0 else 1.0
+                if give_up_at is not None:
+                    left = give_up_at - time.monotonic()
+                    if left <= 0:
+                        return False
+                    wait = min(wait, left)
+                self.cond.wait(timeout=wait)
+
+    def wait_estimate(self, calls: int = 1) -> float:
+        """Seconds until `calls` tokens would be available, ignoring other waiters."""
+        with self.cond:
+            self._refill()
+            missing = calls - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate if self.rate > 0 else float("inf")
+
+
+rate_limiter = RateLimiter(LLM_RATE_PER_MINUTE, LLM_BURST)
+gemini_breaker = BREAKERS["gemini"]
+
+# Runs calls that have a deadline or may be hedged, so the caller can stop waiting
+_bounded_calls = ThreadPoolExecutor(max_workers=LLM_BOUNDED_CALL_WORKERS, thread_name_prefix="llm-call")
+
+_background = contextvars.ContextVar("llm_background", default=False)
+
+
+@contextmanager
+def background_priority():
+    """Mark LLM calls made inside this block as background work."""
+    token = _background.set(True)
+    try:
+        yield
+    finally:
+        _background.reset(token)
+
+
+# -------------------------
+# Hedging
+# -------------------------
+_hedging = contextvars.ContextVar("llm_hedging", default=False)
+_hedge_lock = threading.Lock()
+_calls_seen = 0
+_hedges_sent = 0
+
+
+@contextmanager
+def hedging():
+    """Allow LLM calls made inside this block to be hedged (needs LLM_HEDGE)."""
+    token = _hedging.set(True)
+    try:
+        yield
+    finally:
+        _hedging.reset(token)
+
+
+def _hedge_delay(node: str) -> Optional[float]:
+    """Seconds after which this call should be hedged, or None for no hedge."""
+    global _calls_seen
+    if not (LLM_HEDGE and _hedging.get()):
+        return None
+    if LLM_HEDGE_NODES is not None and node not in LLM_HEDGE_NODES:
+        return None
+
+    with _hedge_lock:
+        _calls_seen += 1
+    if metrics.count("llm.call", node) < HEDGE_MIN_SAMPLES:
+        return None
+    return metrics.percentile("llm.call", node, LLM_HEDGE_PERCENTILE)
+
+
+def _take_hedge(node: str) -> bool:
+    """Spend one hedge from the budget, if the budget and rate limit allow it."""
+    global _hedges_sent
+    with _hedge_lock:
+        if _hedges_sent + 1 > LLM_HEDGE_BUDGET * _calls_seen:
+            metrics.incr("llm.hedge_denied", node)
+            return False
+        _hedges_sent += 1
+
+    reserve = LLM_BACKGROUND_RESERVE if _background.get() else 0.0
+    if not rate_limiter.acquire(reserve=reserve, timeout=0):
+        with _hedge_lock:
+            _hedges_sent -= 1
+        metrics.incr("llm.hedge_denied", node)
+        return False
+
+    metrics.incr("llm.hedged", node)
+    return True
+
+
+# -------------------------
+# Models
+# -------------------------
+# Parses as an empty object for json.loads and leaves "[]" for the array parsers
+OFFLINE_REPLY = "{}\n[]"
+
+
+class OfflineLLM:
+    """
+    Stand-in for ChatGoogleGenerativeAI with no network access. Replies with
+    OFFLINE_REPLY and keeps the last prompts it was sent in .calls. Tests can
+    queue per-call behaviour: .delays holds seconds the next calls take (cut
+    short by the request timeout, which then raises TimeoutError as the real
+    client would), .errors exceptions the next calls raise and .replies the
+    content the next calls return instead of OFFLINE_REPLY.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self.calls = deque(maxlen=100)
+        self.delays: deque = deque()
+        self.errors: deque = deque()
+        self.replies: deque = deque()
+
+    def invoke(self, prompt, timeout: Optional[float] = None, **kwargs):
+        self.calls.append(prompt)
+        delay = self.delays.popleft() if self.delays else 0.0
+        if delay:
+            time.sleep(delay if timeout is None else min(delay, timeout))
+            if timeout is not None and delay > timeout:
+                raise TimeoutError(f"{self.model} request timed out after {timeout:.2f}s")
+        if self.errors:
+            raise self.errors.popleft()
+        content = self.replies.popleft() if self.replies else OFFLINE_REPLY
+        return AIMessage(content=content, response_metadata={"model_name": self.model})
+
+
+_clients: Dict[str, object] = {}
+_clients_lock = threading.Lock()
+
+
+def client_for(model: str):
+    """One shared chat client per model name."""
+    with _clients_lock:
+        if model not in _clients:
+            if LLM_OFFLINE:
+                _clients[model] = OfflineLLM(model)
+            else:
+                from langchain_google_genai import ChatGoogleGenerativeAI
+
+                _clients[model] = ChatGoogleGenerativeAI(
+                    model=model,
+                    temperature=0,
+                    google_api_key=os.getenv("GOOGLE_API_KEY")
+                )
+        return _clients[model]
+
+
+def _is_exhausted(error: Exception) -> bool:
+    """
+    Whether the provider rejected the call for quota or rate: LangChain's
+    ModelRateLimitError, or a google.genai / google.api_core error with HTTP
+    code 429 or status RESOURCE_EXHAUSTED, anywhere in the exception chain.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, ModelRateLimitError):
+            return True
+        if getattr(error, "code", None) == 429 or getattr(error, "status", None) == "RESOURCE_EXHAUSTED":
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def _call_tier(tier: llm_routing.Tier, prompt, node: str, budget: Optional[float]):
+    started = time.monotonic()
+    give_up_at = started + budget if budget is not None else None
+    send = _sender(client_for(tier.model), tier.model, prompt, node, give_up_at)
+    hedge_after = _hedge_delay(node)
+    if budget is None and hedge_after is None:
+        response = send()
+    else:
+        response = _race(send, node, budget, hedge_after)
+
+    elapsed = time.monotonic() - started
+    metrics.observe("llm.model_call", tier.model, elapsed)
+    llm_routing.record_latency(tier.name, elapsed)
+    return response
+
+
+def _sender(llm, model: str, prompt, node: str, give_up_at: Optional[float]) -> Callable[[], Any]:
+    """
+    The call to make for this prompt. A leading system message is replaced by
+    a cached-content handle when context caching has one for it. With a
+    give_up_at time, each send (a hedge included) is a single attempt whose
+    request timeout is the time left until then, so a call the caller has
+    stopped waiting for ends too instead of holding a pool thread.
+    """
+    kwargs: Dict[str, Any] = {}
+    cache = context_cache.get(offline=LLM_OFFLINE)
+    if cache is not None and isinstance(prompt, list) and prompt and isinstance(prompt[0], SystemMessage):
+        handle = cache.handle_for(model, prompt[0].content)
+        if handle is not None:
+            prompt = prompt[1:]
+            kwargs["cached_content"] = handle.name
+    if give_up_at is None:
+        return partial(llm.invoke, prompt, **kwargs)
+
+    def send():
+        left = give_up_at - time.monotonic()
+        if left <= 0:
+            raise deadline.DeadlineExceeded(f"LLM call for {node} exceeded its budget")
+        return llm.invoke(prompt, timeout=left, max_retries=1, **kwargs)
+    return send
+
+
+def _race(send: Callable[[], Any], node: str, budget: Optional[float], hedge_after: Optional[float]):
+    """
+    Run send() on the bounded pool, hedging once after hedge_after seconds,
+    and return the first successful response within budget. Calls left
+    running end at their own request timeout (see _sender); their results
+    are dropped.
+    """
+    give_up_at = time.monotonic() + budget if budget is not None else None
+    primary = _bounded_calls.submit(contextvars.copy_context().run, send)
+    pending = {primary}
+    error = None
+
+    if hedge_after is not None and (budget is None or hedge_after < budget):
+        done, _ = wait(pending, timeout=hedge_after)
+        if not done and _take_hedge(node):
+            pending.add(_bounded_calls.submit(contextvars.copy_context().run, send))
+
+    while pending:
+        timeout = max(give_up_at - time.monotonic(), 0.0) if give_up_at is not None else None
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            for future in pending:
+                future.cancel()
+            metrics.incr("llm.deadline_exceeded", node)
+            raise deadline.DeadlineExceeded(f"LLM call for {node} exceeded its budget")
+
+        for future in done:
+            if future.exception() is None:
+                for loser in pending:
+                    loser.cancel()
+                if future is not primary:
+                    metrics.incr("llm.hedge_won", node)
+                return future.result()
+            error = future.exception()
+
+    raise error
+
+
+def invoke(prompt, node: str = ""):
+    """
+    Rate-limited, routed replacement for llm.invoke(prompt). node names the
+    graph node making the call; it selects the model tier, and its latency is
+    recorded under llm.call[node].
+    Raises deadline.DeadlineExceeded when the node's budget runs out, and
+    breaker.CircuitOpen without calling Gemini while its breaker is open.
+    """
+    deadline.check(node)
+    gemini_breaker.check()
+    budget = deadline.budget_for(node)
+    started = time.monotonic()
+
+    reserve = LLM_BACKGROUND_RESERVE if _background.get() else 0.0
+    if not rate_limiter.acquire(reserve=reserve, timeout=budget):
+        gemini_breaker.release()
+        metrics.incr("llm.deadline_exceeded", node)
+        raise deadline.DeadlineExceeded(f"No LLM capacity for {node} within its budget")
+
+    if budget is not None:
+        budget -= time.monotonic() - started
+
+    started = time.monotonic()
+    tier = llm_routing.route(node)
+    try:
+        try:
+            response = _call_tier(tier, prompt, node, _left(budget, started))
+        except deadline.DeadlineExceeded:
+            raise
+        except Exception as e:
+            lower = llm_routing.downgrade(node, tier) if _is_exhausted(e) else None
+            if lower is None:
+                raise
+            llm_routing.mark_exhausted(tier.name)
+            metrics.incr("llm.downgraded", node)
+            print(f"[WARN] {tier.model} exhausted for {node}, retrying on {lower.model}")
+            response = _call_tier(lower, prompt, node, _left(budget, started))
+    except deadline.DeadlineExceeded:
+        # The request ran out of its own budget, which says nothing about Gemini
+        gemini_breaker.release()
+        raise
+    except Exception as e:
+        left = _left(budget, started)
+        if left is not None and left <= 0:
+            # Failed only once the node's budget was gone (e.g. the client
+            # timeout set from it): a deadline, not a Gemini failure
+            gemini_breaker.release()
+            metrics.incr("llm.deadline_exceeded", node)
+            raise deadline.DeadlineExceeded(f"LLM call for {node} exceeded its budget") from e
+        gemini_breaker.record_failure()
+        metrics.incr("llm.errors", node)
+        raise
+
+    gemini_breaker.record_success()
+    metrics.observe("llm.call", node, time.monotonic() - started)
+    return response
+
+
+def _left(budget: Optional[float], started: float) -> Optional[float]:
+    if budget is None:
+        return None
+    return budget - (time.monotonic() - started)
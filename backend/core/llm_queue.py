@@ -0,0 +1,103 @@
+"""
+Background queue for LLM-backed precomputation.
+
+Jobs are submitted under a key (e.g. "qna:<project_id>"). Submitting a new
+job under a key that already has one supersedes it: a run that has not
+started yet is cancelled outright, and a run that is already in flight is
+left to finish but told it is stale, so it never writes its result back.
+
+Jobs are executed by core.scheduler: stage prefetch runs in the PREFETCH
+class, eager precompute for a new problem statement (more speculative) in
+BATCH, and both share the global LLM rate limit without eating into the
+headroom kept for interactive calls.
+"""
+
+import itertools
+import os
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from core.scheduler import Priority, scheduler
+
+load_dotenv()
+
+EAGER_PRECOMPUTE = os.getenv("EAGER_PRECOMPUTE", "false").lower() in ("1", "true", "yes")
+STAGE_PREFETCH = os.getenv("STAGE_PREFETCH", "true").lower() in ("1", "true", "yes")
+
+# Re-entrant: cancelling a future runs its done-callback (_forget) inline
+_lock = threading.RLock()
+_generations = itertools.count(1)
+_jobs: Dict[str, Tuple[int, Future]] = {}
+
+
+def is_current(key: str, generation: int) -> bool:
+    with _lock:
+        job = _jobs.get(key)
+        return job is not None and job[0] == generation
+
+
+def submit(
+    key: str,
+    fn: Callable,
+    *args,
+    team_id: Optional[str] = None,
+    deadline: Optional[datetime] = None,
+    priority: Priority = Priority.PREFETCH,
+    replace: bool = True,
+    **kwargs,
+) -> Future:
+    """
+    Queue fn(*args, **kwargs) in the background under the given key.
+
+    fn is called with an extra still_current keyword: a zero-argument
+    callable that returns False once a newer job has been submitted for the
+    same key. Jobs must check it before persisting anything.
+
+    With replace=False an existing job for the key is kept and returned
+    instead of being superseded.
+    """
+    with _lock:
+        previous = _jobs.get(key)
+        if previous is not None:
+            if not replace:
+                return previous[1]
+            previous[1].cancel()
+
+        generation = next(_generations)
+        future = scheduler.submit(
+            _run, key, generation, fn, args, kwargs,
+            team_id=team_id,
+            priority=priority,
+            deadline=deadline
+        )
+        _jobs[key] = (generation, future)
+        future.add_done_callback(lambda _: _forget(key, generation))
+
+    return future
+
+
+def submit_prefetch(key: str, fn: Callable, *args, **kwargs) -> Future:
+    """
+    Same as submit(), but never supersedes a job already queued under the
+    same key; that job is returned instead.
+    """
+    return submit(key, fn, *args, replace=False, **kwargs)
+
+
+def _forget(key: str, generation: int):
+    with _lock:
+        job = _jobs.get(key)
+        if job is not None and job[0] == generation:
+            del _jobs[key]
+
+
+def _run(key: str, generation: int, fn: Callable, args, kwargs):
+    try:
+        return fn(*args, still_current=lambda: is_current(key, generation), **kwargs)
+    except Exception as e:
+        print(f"[WARN] Background job {key} failed: {e}")
+        raise
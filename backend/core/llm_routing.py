@@ -0,0 +1,179 @@
+"""
+Per-node model routing for the notebook pipelines.
+
+Every graph node is mapped to a tier, and every tier to a model plus its
+latency/quality SLO metadata. Defaults send cheap review and refine steps
+to the fast tier and generation to the pro tier. Overrides come from a JSON
+file (LLM_ROUTING_FILE) and/or a JSON string (LLM_ROUTING) of the same shape
+as DEFAULT_ROUTING; per-tier models can also be set with
+LLM_TIER_<NAME>_MODEL (e.g. LLM_TIER_PRO_MODEL).
+
+A tier is treated as degraded for LLM_DOWNGRADE_COOLDOWN_SECONDS when its
+recent p95 latency breaks its SLO or the provider reports it exhausted.
+Nodes routed to a degraded tier fall through to its downgrade_to tier unless
+the node sets "allow_downgrade": false. Latency samples are cleared when a
+tier degrades, so it is retried with a fresh window after the cooldown.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional
+
+from dotenv import load_dotenv
+
+from core import metrics
+
+load_dotenv()
+
+LLM_ROUTING_FILE = os.getenv("LLM_ROUTING_FILE")
+LLM_DOWNGRADE_COOLDOWN_SECONDS = float(os.getenv("LLM_DOWNGRADE_COOLDOWN_SECONDS", "120"))
+
+# Samples needed before a tier's p95 is trusted
+MIN_SLO_SAMPLES = 10
+SLO_WINDOW = 50
+
+DEFAULT_ROUTING = {
+    "default_tier": "pro",
+    "tiers": {
+        "pro": {
+            "model": "gemini-3-pro-preview",
+            "latency_slo_p95_seconds": 90,
+            "quality": "high",
+            "downgrade_to": "fast",
+        },
+        "fast": {
+            "model": "gemini-3-flash-preview",
+            "latency_slo_p95_seconds": 20,
+            "quality": "standard",
+            "downgrade_to": None,
+        },
+    },
+    "nodes": {
+        "refine_topics": "fast",
+        "evaluate_prd": "fast",
+        "verify_tasks": "fast",
+        "extract_skills": "fast",
+    },
+}
+
+
+@dataclass
+class Tier:
+    name: str
+    model: str
+    latency_slo_p95_seconds: Optional[float] = None
+    quality: str = ""
+    downgrade_to: Optional[str] = None
+
+
+@dataclass
+class NodeRoute:
+    tier: str
+    allow_downgrade: bool = True
+
+
+def _load_config() -> Dict:
+    config = json.loads(json.dumps(DEFAULT_ROUTING))
+
+    overrides = []
+    if LLM_ROUTING_FILE:
+        with open(LLM_ROUTING_FILE) as f:
+            overrides.append(json.load(f))
+    if os.getenv("LLM_ROUTING"):
+        overrides.append(json.loads(os.getenv("LLM_ROUTING")))
+
+    for override in overrides:
+        config["default_tier"] = override.get("default_tier", config["default_tier"])
+        for name, tier in override.get("tiers", {}).items():
+            config["tiers"].setdefault(name, {}).update(tier)
+        config["nodes"].update(override.get("nodes", {}))
+
+    for name, tier in config["tiers"].items():
+        model = os.getenv(f"LLM_TIER_{name.upper()}_MODEL")
+        if model:
+            tier["model"] = model
+
+    return config
+
+
+_config = _load_config()
+
+TIERS: Dict[str, Tier] = {name: Tier(name=name, **spec) for name, spec in _config["tiers"].items()}
+DEFAULT_TIER: str = _config["default_tier"]
+NODES: Dict[str, NodeRoute] = {
+    node: NodeRoute(tier=spec) if isinstance(spec, str) else NodeRoute(**spec)
+    for node, spec in _config["nodes"].items()
+}
+
+
+# -------------------------
+# Tier health
+# -------------------------
+_lock = threading.Lock()
+_samples: Dict[str, Deque[float]] = {name: deque(maxlen=SLO_WINDOW) for name in TIERS}
+_degraded_until: Dict[str, float] = {}
+
+
+def _degrade(tier: str, reason: str):
+    # Caller holds _lock
+    _degraded_until[tier] = time.monotonic() + LLM_DOWNGRADE_COOLDOWN_SECONDS
+    _samples[tier].clear()
+    metrics.incr("llm.tier_degraded", f"{tier}:{reason}")
+    print(f"[WARN] LLM tier '{tier}' degraded ({reason}) for {LLM_DOWNGRADE_COOLDOWN_SECONDS:.0f}s")
+
+
+def record_latency(tier: str, seconds: float) -> None:
+    spec = TIERS[tier]
+    with _lock:
+        samples = _samples[tier]
+        samples.append(seconds)
+        if spec.latency_slo_p95_seconds is None or len(samples) < MIN_SLO_SAMPLES:
+            return
+        ordered = sorted(samples)
+        p95 = ordered[int(0.95 * (len(ordered) - 1))]
+        if p95 > spec.latency_slo_p95_seconds:
+            _degrade(tier, "slow")
+
+
+def mark_exhausted(tier: str) -> None:
+    with _lock:
+        _degrade(tier, "exhausted")
+
+
+def is_degraded(tier: str) -> bool:
+    with _lock:
+        return time.monotonic() < _degraded_until.get(tier, 0.0)
+
+
+# -------------------------
+# Routing
+# -------------------------
+def node_route(node: str) -> NodeRoute:
+    return NODES.get(node) or NodeRoute(tier=DEFAULT_TIER)
+
+
+def downgrade(node: str, tier: Tier) -> Optional[Tier]:
+    """The tier to use instead of `tier` for this node, or None if there is none."""
+    if not node_route(node).allow_downgrade or not tier.downgrade_to:
+        return None
+    return TIERS.get(tier.downgrade_to)
+
+
+def route(node: str) -> Tier:
+    """Tier to call for this node, following downgrades past degraded tiers."""
+    tier = TIERS[node_route(node).tier]
+    visited = {tier.name}
+
+    while is_degraded(tier.name):
+        lower = downgrade(node, tier)
+        if lower is None or lower.name in visited:
+            break
+        metrics.incr("llm.downgraded", node)
+        tier = lower
+        visited.add(tier.name)
+
+    return tier
@@ -0,0 +1,74 @@
+"""
+In-process metrics registry.
+
+Counters, gauges and rolling latency windows, keyed by name plus an optional
+label string (e.g. "llm.queue_depth", "interactive"). snapshot() returns
+everything as plain JSON for the /metrics endpoint.
+"""
+
+import threading
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional, Tuple
+
+LATENCY_WINDOW = 200
+
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, str], float] = defaultdict(float)
+_gauges: Dict[Tuple[str, str], float] = {}
+_latencies: Dict[Tuple[str, str], Deque[float]] = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+
+
+def incr(name: str, label: str = "", value: float = 1.0) -> None:
+    with _lock:
+        _counters[(name, label)] += value
+
+
+def set_gauge(name: str, label: str = "", value: float = 0.0) -> None:
+    with _lock:
+        _gauges[(name, label)] = value
+
+
+def observe(name: str, label: str = "", seconds: float = 0.0) -> None:
+    """Record one latency sample (in seconds)."""
+    with _lock:
+        _latencies[(name, label)].append(seconds)
+
+
+def percentile(name: str, label: str = "", q: float = 0.5) -> Optional[float]:
+    """q-th quantile (0..1) of the recent samples, or None with no samples."""
+    with _lock:
+        samples = sorted(_latencies.get((name, label), ()))
+    if not samples:
+        return None
+    index = min(len(samples) - 1, int(q * len(samples)))
+    return samples[index]
+
+
+def count(name: str, label: str = "") -> int:
+    """Number of samples currently in the window."""
+    with _lock:
+        return len(_latencies.get((name, label), ()))
+
+
+def _key(name: str, label: str) -> str:
+    return f"{name}[{label}]" if label else name
+
+
+def snapshot() -> Dict[str, Dict]:
+    with _lock:
+        counters = {_key(*k): v for k, v in _counters.items()}
+        gauges = {_key(*k): v for k, v in _gauges.items()}
+        latencies = {k: sorted(v) for k, v in _latencies.items()}
+
+    summaries = {}
+    for (name, label), samples in latencies.items():
+        if not samples:
+            continue
+        summaries[_key(name, label)] = {
+            "count": len(samples),
+            "p50": samples[int(0.5 * (len(samples) - 1))],
+            "p95": samples[int(0.95 * (len(samples) - 1))],
+            "max": samples[-1],
+        }
+
+    return {"counters": counters, "gauges": gauges, "latencies": summaries}
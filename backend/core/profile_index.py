@@ -0,0 +1,274 @@
+"""
+In-memory skill index over user_profiles.
+
+Every profile is a row of a NumPy float32 matrix whose columns are skill
+IDs from core.skills.registry, holding role-weighted skills: a profile's
+listed skills are canonicalized and expanded through the taxonomy (so "web
+development" also covers html, react, ...) and weigh 1.0, and skills
+implied by its role names ({"ML Engineer": 0.9} -> machine learning,
+python, ...) weigh the role's weight. The matrix is filled from
+user_profiles on first use (paged, PROFILE_INDEX_PAGE_SIZE rows per
+request) and then kept current by calling upsert() whenever a profile is
+written.
+
+recommend() scores every profile with one matrix-vector product over the
+query's columns, so the cost grows with the number of query skills rather
+than the size of the vocabulary, and takes the top k with argpartition.
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from core import metrics
+from core.skills import SkillRegistry, registry, taxonomy
+
+load_dotenv()
+
+PROFILE_INDEX_PAGE_SIZE = int(os.getenv("PROFILE_INDEX_PAGE_SIZE", "1000"))
+
+INITIAL_ROWS = 256
+INITIAL_COLUMNS = 256
+
+# user_profiles columns kept alongside each row for filtering and results
+PROFILE_FIELDS = ("user_id", "full_name", "username", "avatar_url", "availability", "location", "role", "skills")
+
+
+def role_weights(role: Any) -> Dict[str, float]:
+    """Skill -> weight implied by a profile's role column ({role name: weight})."""
+    if not role:
+        return {}
+    if not isinstance(role, dict):
+        role = {str(role): 1.0}
+
+    weights: Dict[str, float] = {}
+    for name, weight in role.items():
+        try:
+            weight = min(max(float(weight), 0.0), 1.0)
+        except (TypeError, ValueError):
+            weight = 1.0
+        known, _ = taxonomy.parse(str(name))
+        for skill in taxonomy.expand(known):
+            weights[skill] = max(weights.get(skill, 0.0), weight)
+    return weights
+
+
+class ProfileIndex:
+    def __init__(self, skill_registry: SkillRegistry):
+        self.registry = skill_registry
+        self.user_ids: List[str] = []
+        self.version = 0
+        self.profiles: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+        self._weights = np.zeros((INITIAL_ROWS, max(INITIAL_COLUMNS, len(skill_registry))), dtype=np.float32)
+        # Filter columns as small integer codes, so filters compare code arrays
+        self._availability = np.zeros(INITIAL_ROWS, dtype=np.int32)
+        self._location = np.zeros(INITIAL_ROWS, dtype=np.int32)
+        self._codes: Dict[str, Dict[str, int]] = {"availability": {"": 0}, "location": {"": 0}}
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+        self._listeners: List[Callable[[str], None]] = []
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    # -------------------------
+    # Building
+    # -------------------------
+    def upsert(self, profile: Dict[str, Any]) -> int:
+        """Index (or re-index) one user_profiles row; returns its row number."""
+        user_id = str(profile["user_id"])
+        skill_ids = self.registry.ids(taxonomy.expand(profile.get("skills") or []))
+        weighted = {
+            self.registry.intern(skill): weight
+            for skill, weight in role_weights(profile.get("role")).items()
+        }
+        columns = max(skill_ids[-1:] + list(weighted), default=-1) + 1
+        meta = {field: profile.get(field) for field in PROFILE_FIELDS}
+        meta["user_id"] = user_id
+
+        with self._lock:
+            row = self._rows.get(user_id)
+            if row is None:
+                row = len(self.user_ids)
+                self._reserve(row + 1, columns)
+                self._rows[user_id] = row
+                self.user_ids.append(user_id)
+                self.profiles.append(meta)
+            else:
+                self._reserve(row + 1, columns)
+                self._weights[row] = 0.0
+                self.profiles[row] = meta
+
+            if weighted:
+                self._weights[row, list(weighted)] = list(weighted.values())
+            self._weights[row, skill_ids] = 1.0
+            self._availability[row] = self._code("availability", meta["availability"])
+            self._location[row] = self._code("location", meta["location"])
+            self.version += 1
+
+        metrics.set_gauge("profile_index.rows", "", len(self.user_ids))
+        for listener in self._listeners:
+            listener(user_id)
+        return row
+
+    def subscribe(self, listener: Callable[[str], None]):
+        """Call listener(user_id) after every upsert."""
+        self._listeners.append(listener)
+
+    def load(self, profiles: Iterable[Dict[str, Any]]):
+        with self._lock:
+            for profile in profiles:
+                self.upsert(profile)
+            self._loaded = True
+
+    def ensure_loaded(self):
+        """
+        Fill the index from user_profiles the first time it is needed. The
+        pages are fetched before the index lock is taken, so searches are not
+        blocked on Supabase; profiles upserted meanwhile are newer and kept.
+        """
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            from core.database import supabase
+
+            profiles: List[Dict[str, Any]] = []
+            start = 0
+            while True:
+                page = supabase.table("user_profiles") \
+                    .select(", ".join(PROFILE_FIELDS)) \
+                    .range(start, start + PROFILE_INDEX_PAGE_SIZE - 1) \
+                    .execute()
+                rows = page.data or []
+                profiles.extend(rows)
+                if len(rows) < PROFILE_INDEX_PAGE_SIZE:
+                    break
+                start += PROFILE_INDEX_PAGE_SIZE
+
+            with self._lock:
+                self.load(profile for profile in profiles if str(profile["user_id"]) not in self._rows)
+            print(f"[INFO] Profile index loaded: {len(self.user_ids)} profiles, {len(self.registry)} skills")
+
+    def _reserve(self, rows: int, columns: int):
+        # Caller holds self._lock; both dimensions grow by doubling
+        height, width = self._weights.shape
+        if rows <= height and columns <= width:
+            return
+        while height < rows:
+            height *= 2
+        while width < columns:
+            width *= 2
+
+        self._weights = _grown(self._weights, (height, width))
+        self._availability = _grown(self._availability, (height,))
+        self._location = _grown(self._location, (height,))
+
+    def _code(self, column: str, value: Optional[str]) -> int:
+        # Caller holds self._lock
+        codes = self._codes[column]
+        return codes.setdefault(_normalized(value), len(codes))
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+    def row_of(self, user_id: str) -> Optional[int]:
+        return self._rows.get(str(user_id))
+
+    def weights(self, user_ids: Sequence[str], columns: np.ndarray) -> Tuple[List[str], np.ndarray]:
+        """Role-weighted skill rows of the indexed users among user_ids, restricted to columns."""
+        with self._lock:
+            found = [str(user_id) for user_id in user_ids if str(user_id) in self._rows]
+            rows = np.array([self._rows[user_id] for user_id in found], dtype=np.intp)
+            inside = columns[columns < self._weights.shape[1]]
+            matrix = np.zeros((len(found), len(columns)), dtype=np.float32)
+            matrix[:, :len(inside)] = self._weights[rows][:, inside]
+        return found, matrix
+
+    def query_ids(self, skills: Iterable[str]) -> np.ndarray:
+        """Column IDs of the query's (expanded) skills that any profile could have."""
+        return np.array(self.registry.ids(taxonomy.expand(skills), intern=False), dtype=np.intp)
+
+    # -------------------------
+    # Teammate search
+    # -------------------------
+    def recommend(
+        self,
+        skills: Sequence[str],
+        k: int,
+        availability: Optional[Sequence[str]] = None,
+        location: Optional[str] = None,
+        exclude: Iterable[str] = (),
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-k (row, score) pairs for a normalized skill query, best first.
+        score is the role-weighted share of the query skills a profile has;
+        profiles with no matching skill are left out. availability keeps
+        profiles whose availability is one of the given values, location
+        those whose location contains the given text (both case-insensitive).
+        """
+        expanded = taxonomy.expand(skills)
+        query = self.query_ids(expanded)
+        if not len(query) or k <= 0:
+            return []
+
+        with self._lock:
+            rows = len(self.user_ids)
+            # IDs interned elsewhere after the matrix was last widened: no profile has them
+            query = query[query < self._weights.shape[1]]
+            scores = self._weights[:rows, query] @ np.ones(len(query), dtype=np.float32)
+            scores /= len(expanded)
+
+            keep = scores > 0
+            if availability:
+                keep &= np.isin(self._availability[:rows], self._matching("availability", availability))
+            if location:
+                keep &= np.isin(self._location[:rows], self._matching("location", [location], substring=True))
+            for user_id in exclude:
+                row = self._rows.get(str(user_id))
+                if row is not None:
+                    keep[row] = False
+
+        candidates = np.flatnonzero(keep)
+        if len(candidates) > k:
+            top = np.argpartition(-scores[candidates], k - 1)[:k]
+            candidates = candidates[top]
+        order = np.argsort(-scores[candidates], kind="stable")
+        return [(int(row), float(scores[row])) for row in candidates[order]]
+
+    def matched_skills(self, row: int, skills: Sequence[str]) -> List[str]:
+        """Query skills (expanded) that this profile has or its roles imply."""
+        with self._lock:
+            return [
+                skill for skill in taxonomy.expand(skills)
+                if (skill_id := self.registry.get(skill)) is not None
+                and skill_id < self._weights.shape[1]
+                and self._weights[row, skill_id] > 0
+            ]
+
+    def _matching(self, column: str, values: Sequence[str], substring: bool = False) -> np.ndarray:
+        # Caller holds self._lock
+        wanted = [_normalized(value) for value in values]
+        codes = self._codes[column].items()
+        if substring:
+            return np.array([code for value, code in codes if any(w in value for w in wanted)], dtype=np.int32)
+        return np.array([code for value, code in codes if value in wanted], dtype=np.int32)
+
+
+def _normalized(value: Optional[str]) -> str:
+    return " ".join(str(value).lower().split()) if value else ""
+
+
+def _grown(array: np.ndarray, shape: Tuple[int, ...]) -> np.ndarray:
+    grown = np.zeros(shape, dtype=array.dtype)
+    grown[tuple(slice(0, size) for size in array.shape)] = array
+    return grown
+
+
+profile_index = ProfileIndex(registry)
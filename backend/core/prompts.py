@@ -0,0 +1,230 @@
+"""
+Token-budget aware prompt building for the notebook pipelines.
+
+build() formats a template for one graph node after squeezing redundant
+whitespace out of every field and trimming fields that exceed their token
+budget (head and tail are kept, the middle is cut at a line boundary).
+Structured values are serialized with compact_json() and shrunk by
+fit_json(), which shortens the lists and strings inside them (e.g. each team
+member's skill list) but never cuts the serialized text, so the model always
+gets valid JSON with every item. Lists of strings (e.g. rendered Q&A pairs)
+go through fit_items(), which shares the budget across the items instead of
+cutting the last ones off.
+
+Tokens are estimated at PROMPT_CHARS_PER_TOKEN characters per token; Gemini's
+tokenizer is only available through the API, and the estimate only has to
+be good enough to enforce budgets. Per-node token counts and savings are
+published as prompt.tokens[<node>] and prompt.tokens_saved[<node>].
+
+Templates with a large instruction block are SplitPrompts: the instructions
+form a system message that never changes between calls, and only the short
+template after it carries the request's data. That keeps the prefix stable
+for provider-side caching (see core.context_cache).
+"""
+
+import json
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from core import metrics
+
+load_dotenv()
+
+PROMPT_CHARS_PER_TOKEN = float(os.getenv("PROMPT_CHARS_PER_TOKEN", "4"))
+
+# Token budget per "<node>.<field>"; fields without a budget are only squeezed
+DEFAULT_FIELD_BUDGETS: Dict[str, int] = {
+    "generate_prd.qa_pairs": 4000,
+    "generate_prd.pitch": 2000,
+    "evaluate_prd.prd": 12000,
+    "improve_prd.prd": 12000,
+    "improve_prd.evaluation": 2000,
+    "extract_requirements.prd_text": 12000,
+    "generate_tasks.extracted_requirements": 4000,
+    "verify_tasks.extracted_requirements": 3000,
+    "verify_tasks.task_breakdown": 4000,
+    "assign_tasks.verified_tasks": 4000,
+    "assign_tasks.team_members": 1500,
+    "assign_topics.team": 1500,
+    "assign_topics.topics": 1000,
+}
+PROMPT_FIELD_BUDGETS: Dict[str, int] = {
+    **DEFAULT_FIELD_BUDGETS,
+    **json.loads(os.getenv("PROMPT_FIELD_BUDGETS", "{}")),
+}
+
+TRIM_MARKER = "\n[... trimmed ...]\n"
+
+
+@dataclass(frozen=True)
+class SplitPrompt:
+    """Static system instructions followed by a per-call str.format template."""
+
+    system: str
+    template: str
+
+    def format(self, **fields: Any) -> List[BaseMessage]:
+        return [
+            SystemMessage(content=self.system.strip()),
+            HumanMessage(content=self.template.format(**fields).strip())
+        ]
+
+
+def count_tokens(text: str) -> int:
+    return math.ceil(len(text) / PROMPT_CHARS_PER_TOKEN)
+
+
+def compact_json(value: Any) -> str:
+    """JSON without indentation or separator padding."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def squeeze(text: str) -> str:
+    """Drop trailing spaces and collapse runs of blank lines."""
+    text = re.sub(r"[ \t]+\n", "\n", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def trim(text: str, budget: int) -> str:
+    """Cut text to about `budget` tokens, keeping its beginning and end."""
+    if count_tokens(text) <= budget:
+        return text
+
+    keep = max(int(budget * PROMPT_CHARS_PER_TOKEN) - len(TRIM_MARKER), 0)
+    head_chars = keep * 2 // 3
+    tail_chars = keep - head_chars
+
+    head = text[:head_chars]
+    if "\n" in head:
+        head = head[:head.rindex("\n")]
+    tail = text[len(text) - tail_chars:] if tail_chars else ""
+    if "\n" in tail:
+        tail = tail[tail.index("\n") + 1:]
+
+    return head + TRIM_MARKER + tail
+
+
+def fit_items(items: List[str], budget: Optional[int], separator: str = "\n") -> str:
+    """
+    Join items, trimming the longest ones first so the result fits the
+    budget: every item is capped at the largest size that makes the total fit.
+    """
+    items = [squeeze(item) for item in items]
+    joined = separator.join(items)
+    if budget is None or count_tokens(joined) <= budget or not items:
+        return joined
+
+    available = int(budget * PROMPT_CHARS_PER_TOKEN) - len(separator) * (len(items) - 1)
+    lengths = sorted(len(item) for item in items)
+
+    cap = 0
+    remaining = available
+    for index, length in enumerate(lengths):
+        share = remaining // (len(lengths) - index)
+        if length > share:
+            cap = share
+            break
+        remaining -= length
+    else:
+        cap = lengths[-1]
+
+    cap = max(cap, 1)
+    return separator.join(item if len(item) <= cap else item[:max(cap - 1, 0)] + "…" for item in items)
+
+
+def _capped(value: Any, list_cap: Optional[int], str_cap: Optional[int], top: bool = True) -> Any:
+    """value with nested lists cut to list_cap items and strings to str_cap characters; the top-level list is kept whole."""
+    if isinstance(value, list):
+        items = value if top or list_cap is None else value[:list_cap]
+        return [_capped(item, list_cap, str_cap, False) for item in items]
+    if isinstance(value, dict):
+        return {key: _capped(item, list_cap, str_cap, False) for key, item in value.items()}
+    if isinstance(value, str) and str_cap is not None and len(value) > str_cap:
+        return value[:max(str_cap - 1, 0)] + "…"
+    return value
+
+
+def _longest(value: Any, kind: type, top: bool = True) -> int:
+    """Length of the longest nested list (below the top level) or string in value."""
+    if isinstance(value, (list, dict)):
+        items = value.values() if isinstance(value, dict) else value
+        own = len(value) if kind is list and isinstance(value, list) and not top else 0
+        return max([own, *(_longest(item, kind, False) for item in items)])
+    return len(value) if kind is str and isinstance(value, str) else 0
+
+
+def fit_json(value: Any, budget: Optional[int]) -> str:
+    """
+    compact_json(value), shrunk to the budget by first shortening the lists
+    nested in it (keeping their first entries) and then its longest strings.
+    The top-level items are all kept and the text is never cut, so the result
+    stays valid JSON even if it still exceeds the budget.
+    """
+    text = compact_json(value)
+    if budget is None or count_tokens(text) <= budget:
+        return text
+
+    for list_cap in range(_longest(value, list) - 1, 0, -1):
+        text = compact_json(_capped(value, list_cap, None))
+        if count_tokens(text) <= budget:
+            return text
+
+    list_cap = 1 if _longest(value, list) else None
+    str_cap = _longest(value, str) // 2
+    while str_cap >= 16:
+        text = compact_json(_capped(value, list_cap, str_cap))
+        if count_tokens(text) <= budget:
+            break
+        str_cap //= 2
+    return text
+
+
+def field_budget(node: str, field: str) -> Optional[int]:
+    return PROMPT_FIELD_BUDGETS.get(f"{node}.{field}")
+
+
+def build(template, node: str, **fields: Any) -> str:
+    """
+    Format template (a str, SplitPrompt or prompt template) for the given
+    graph node, compacting each field to its budget, and record token counts.
+    Savings are measured against the verbatim / indent=2 rendering.
+    """
+    original_tokens = 0
+    compacted: Dict[str, str] = {}
+
+    for name, value in fields.items():
+        budget = field_budget(node, name)
+
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            original_tokens += count_tokens("\n\n".join(value))
+            compacted[name] = fit_items(value, budget)
+            continue
+
+        if not isinstance(value, str):
+            original_tokens += count_tokens(json.dumps(value, indent=2, ensure_ascii=False))
+            compacted[name] = fit_json(value, budget)
+            continue
+
+        original_tokens += count_tokens(value)
+        text = squeeze(value)
+        compacted[name] = trim(text, budget) if budget is not None else text
+
+    prompt = template.format(**compacted)
+
+    if isinstance(prompt, list):
+        tokens = sum(count_tokens(message.content) for message in prompt)
+    else:
+        tokens = count_tokens(prompt)
+    saved = original_tokens - sum(count_tokens(text) for text in compacted.values())
+    metrics.set_gauge("prompt.tokens", node, tokens)
+    if saved > 0:
+        metrics.incr("prompt.tokens_saved", node, saved)
+
+    return prompt
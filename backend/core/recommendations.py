@@ -0,0 +1,192 @@
+"""
+Personalized hackathon recommendations.
+
+Every hackathon gets a skill vector from its tags, name and description,
+parsed with the local taxonomy (core.skills) and interned through the same
+registry as the profile index: tags weigh 1.0, the name 0.8 and the
+description 0.5. A user's vector is their role-weighted profile row
+(core.profile_index), and the score is the cosine similarity between the
+two, computed for every hackathon with one matrix-vector product.
+
+The top RECOMMENDATIONS_PER_USER hackathons are cached per user together
+with the catalog version they were computed for. A profile upsert drops the
+user's entry; a catalog reload marks every entry stale and wakes a
+background thread that recomputes all cached users in batches (one matrix
+product per RECOMMENDATION_BATCH_SIZE users) against the new catalog, so
+the landing page is served from the cache rather than scored on request.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from core import metrics
+from core.catalog import Catalog
+from core.hackathon_index import HackathonIndex
+from core.profile_index import ProfileIndex
+from core.skills import SkillRegistry, taxonomy
+
+load_dotenv()
+
+RECOMMENDATIONS_PER_USER = int(os.getenv("RECOMMENDATIONS_PER_USER", "50"))
+RECOMMENDATION_CACHE_SIZE = int(os.getenv("RECOMMENDATION_CACHE_SIZE", "10000"))
+RECOMMENDATION_BATCH_SIZE = 256
+
+FIELD_WEIGHTS = {"tags": 1.0, "name": 0.8, "description": 0.5}
+
+
+class HackathonSkills:
+    """Unit-length skill vectors of one catalog version, over the skills its hackathons mention."""
+
+    def __init__(self, index: HackathonIndex, registry: SkillRegistry):
+        rows: List[Dict[int, float]] = []
+        for doc, hackathon in enumerate(index.docs):
+            weights: Dict[int, float] = {}
+            if index.is_live(doc):
+                texts = {
+                    "tags": list(hackathon.get("tags", [])),
+                    "name": [str(hackathon.get("name", ""))],
+                    "description": [str(hackathon.get("description", ""))],
+                }
+                for field, values in texts.items():
+                    known = [skill for value in values for skill in taxonomy.parse(value)[0]]
+                    for skill in taxonomy.expand(known):
+                        skill_id = registry.intern(skill)
+                        weights[skill_id] = max(weights.get(skill_id, 0.0), FIELD_WEIGHTS[field])
+            rows.append(weights)
+
+        self.index = index
+        self.columns = np.array(sorted({skill_id for weights in rows for skill_id in weights}), dtype=np.intp)
+        position = {skill_id: i for i, skill_id in enumerate(self.columns)}
+
+        self.matrix = np.zeros((len(rows), len(self.columns)), dtype=np.float32)
+        for doc, weights in enumerate(rows):
+            for skill_id, weight in weights.items():
+                self.matrix[doc, position[skill_id]] = weight
+        norms = np.linalg.norm(self.matrix, axis=1, keepdims=True)
+        np.divide(self.matrix, norms, out=self.matrix, where=norms > 0)
+
+    def top(self, users: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        """Best k (doc, score) pairs for each row of users, best first; zero scores left out."""
+        norms = np.linalg.norm(users, axis=1, keepdims=True)
+        scores = self.matrix @ np.divide(users, norms, out=np.zeros_like(users), where=norms > 0).T
+
+        results = []
+        for column in scores.T:
+            k_user = min(k, len(column))
+            if not k_user:
+                results.append([])
+                continue
+            best = np.argpartition(-column, k_user - 1)[:k_user]
+            best = best[np.argsort(-column[best], kind="stable")]
+            results.append([(int(doc), float(column[doc])) for doc in best if column[doc] > 0])
+        return results
+
+
+class HackathonRecommender:
+    def __init__(self, catalog: Catalog, profiles: ProfileIndex):
+        self.catalog = catalog
+        self.profiles = profiles
+        # user_id -> (catalog version, index the picks' doc positions refer to, picks)
+        self._cache: "OrderedDict[str, Tuple[int, HackathonIndex, List[Tuple[int, float]]]]" = OrderedDict()
+        self._skills: Optional[Tuple[int, HackathonSkills]] = None
+        self._lock = threading.Lock()
+        self._stale = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+
+        catalog.subscribe(self._catalog_changed)
+        profiles.subscribe(self.invalidate)
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self._cache.pop(str(user_id), None)
+
+    def recommend(self, user_id: str) -> Optional[Tuple[HackathonIndex, List[Tuple[int, float]]]]:
+        """Catalog index and its recommended (doc, score) pairs for a user, or None without a profile."""
+        user_id = str(user_id)
+        # Version read first (as in exploreApi): a reload in between files newer picks under the old version, never the reverse
+        version = self.catalog.version
+        index = self.catalog.current()
+
+        with self._lock:
+            entry = self._cache.get(user_id)
+            if entry is not None and entry[0] == version:
+                self._cache.move_to_end(user_id)
+                metrics.incr("recommendations.hit")
+                # Served with the index they were computed on: doc positions are only meaningful there
+                return entry[1], entry[2]
+
+        metrics.incr("recommendations.miss")
+        self.profiles.ensure_loaded()
+        version, skills = self._skills_for(version, index)
+        found, users = self.profiles.weights([user_id], skills.columns)
+        if not found:
+            return None
+
+        picks = skills.top(users, RECOMMENDATIONS_PER_USER)[0]
+        self._store({user_id: picks}, version, skills.index)
+        return skills.index, picks
+
+    def _skills_for(self, version: int, index: HackathonIndex) -> Tuple[int, HackathonSkills]:
+        cached = self._skills
+        if cached is not None and cached[1].index is index:
+            return cached
+        skills = HackathonSkills(index, self.profiles.registry)
+        self._skills = (version, skills)
+        return version, skills
+
+    def _store(self, picks: Dict[str, List[Tuple[int, float]]], version: int, index: HackathonIndex):
+        with self._lock:
+            for user_id, docs in picks.items():
+                self._cache[user_id] = (version, index, docs)
+                self._cache.move_to_end(user_id)
+            while len(self._cache) > RECOMMENDATION_CACHE_SIZE:
+                self._cache.popitem(last=False)
+            metrics.set_gauge("recommendations.cached_users", "", len(self._cache))
+
+    # -------------------------
+    # Background refresh
+    # -------------------------
+    def _catalog_changed(self):
+        self._stale.set()
+        with self._lock:
+            if self._refresher is None:
+                self._refresher = threading.Thread(target=self._refresh_loop, name="recommendations", daemon=True)
+                self._refresher.start()
+
+    def _refresh_loop(self):
+        while True:
+            self._stale.wait()
+            self._stale.clear()
+            try:
+                self.refresh_all()
+            except Exception as e:
+                print(f"[WARN] Recommendation refresh failed: {e}")
+
+    def refresh_all(self):
+        """Recompute every cached user against the current catalog, in batches."""
+        version = self.catalog.version
+        index = self.catalog.current()
+        version, skills = self._skills_for(version, index)
+        with self._lock:
+            users = [user_id for user_id, (cached, _, _) in self._cache.items() if cached != version]
+        if not users:
+            return
+
+        for start in range(0, len(users), RECOMMENDATION_BATCH_SIZE):
+            found, matrix = self.profiles.weights(users[start:start + RECOMMENDATION_BATCH_SIZE], skills.columns)
+            picks = dict(zip(found, skills.top(matrix, RECOMMENDATIONS_PER_USER)))
+            with self._lock:
+                # Entries dropped or recomputed meanwhile are left alone
+                picks = {
+                    user_id: docs for user_id, docs in picks.items()
+                    if user_id in self._cache and self._cache[user_id][0] != version
+                }
+            self._store(picks, version, skills.index)
+
+        metrics.incr("recommendations.refreshed", "", len(users))
+        print(f"[INFO] Recommendations refreshed for {len(users)} users (catalog v{version})")
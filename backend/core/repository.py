@@ -0,0 +1,170 @@
+"""
+Async data access for the request handlers.
+
+Wraps the PostgREST table operations the async endpoints use on the shared
+pooled client from core.database, so a handler awaits its queries instead of
+blocking the event loop for each round trip. Synchronous code (the LLM
+pipelines running in scheduler threads, the background loaders) keeps using
+core.database.supabase.
+
+project_roster() returns a project, its team and the members' profiles in
+one round trip through the project_roster Postgres function (SQL in the
+README). Until that function is installed it falls back to one query per
+table; project_roster_sync() is the same lookup for the scheduler threads.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence
+
+from postgrest import APIError
+
+from core.database import awrite_or_defer, db, supabase, write_or_defer
+
+# Composite primary key of research_stage: one row per project member
+RESEARCH_STAGE_KEY = "project_id,user_id"
+
+ROSTER_FUNCTION = "project_roster"
+# PostgREST error code for a function that is not in its schema cache
+FUNCTION_NOT_FOUND = "PGRST202"
+
+_roster_function_missing = False
+
+
+async def fetch_one(table: str, columns: str, **equals: Any) -> Optional[Dict[str, Any]]:
+    """The row of table matching all column=value pairs, or None."""
+    query = (await db()).table(table).select(columns)
+    for column, value in equals.items():
+        query = query.eq(column, str(value))
+    response = await query.maybe_single().execute()
+    return response.data if response and response.data else None
+
+
+async def fetch_all(table: str, columns: str, limit: Optional[int] = None, **equals: Any) -> List[Dict[str, Any]]:
+    query = (await db()).table(table).select(columns)
+    for column, value in equals.items():
+        query = query.eq(column, str(value))
+    if limit is not None:
+        query = query.limit(limit)
+    response = await query.execute()
+    return response.data or []
+
+
+async def fetch_in(table: str, columns: str, column: str, values: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Rows of table whose column is one of values."""
+    if not values:
+        return []
+    response = await (await db()).table(table) \
+        .select(columns) \
+        .in_(column, [str(value) for value in values]) \
+        .execute()
+    return response.data or []
+
+
+async def insert(table: str, row: Dict[str, Any]) -> List[Dict[str, Any]]:
+    response = await (await db()).table(table).insert(row).execute()
+    return response.data or []
+
+
+async def upsert(table: str, rows: Any, on_conflict: str) -> List[Dict[str, Any]]:
+    response = await (await db()).table(table).upsert(rows, on_conflict=on_conflict).execute()
+    return response.data or []
+
+
+async def upsert_or_defer(description: str, table: str, rows: Any, on_conflict: str):
+    """
+    upsert(), queued for replay if the Supabase breaker is open (see
+    core.database.write_or_defer). A list of rows goes out as one request,
+    which PostgREST applies as a single statement: all rows or none.
+    """
+    if not rows:
+        return []
+    return await awrite_or_defer(description, lambda: upsert(table, rows, on_conflict))
+
+
+def upsert_or_defer_sync(description: str, table: str, rows: Any, on_conflict: str):
+    """upsert_or_defer() on the synchronous client, for the scheduler threads."""
+    if not rows:
+        return []
+    return write_or_defer(
+        description,
+        lambda: supabase.table(table).upsert(rows, on_conflict=on_conflict).execute().data or []
+    )
+
+
+# -------------------------
+# Project roster
+# -------------------------
+# {"project": {id, team_id, problem_statement, hackathon_name},
+#  "team": {team_id, team_members} or None,
+#  "members": [{user_id, full_name, role, skills}, ...]}, or None without the project
+PROJECT_COLUMNS = "id, team_id, problem_statement"
+TEAM_COLUMNS = "team_id, team_members"
+MEMBER_COLUMNS = "user_id, full_name, role, skills"
+
+
+async def project_roster(project_id: Any) -> Optional[Dict[str, Any]]:
+    if not _roster_function_missing:
+        try:
+            response = await (await db()).rpc(ROSTER_FUNCTION, {"p_project_id": str(project_id)}).execute()
+            return response.data or None
+        except APIError as e:
+            _check_missing_function(e)
+
+    project = await fetch_one("project_db", PROJECT_COLUMNS, id=project_id)
+    if not project:
+        return None
+    hackathons = fetch_all("user_projects", "hackathon_name", limit=1, project_id=project_id)
+    if project.get("team_id"):
+        team, hackathons = await asyncio.gather(
+            fetch_one("team_db", TEAM_COLUMNS, team_id=project["team_id"]),
+            hackathons
+        )
+    else:
+        team, hackathons = None, await hackathons
+    project["hackathon_name"] = hackathons[0].get("hackathon_name") if hackathons else None
+    members = await fetch_in("user_profiles", MEMBER_COLUMNS, "user_id", (team or {}).get("team_members") or [])
+    return {"project": project, "team": team, "members": members}
+
+
+def project_roster_sync(project_id: Any) -> Optional[Dict[str, Any]]:
+    """project_roster() on the synchronous client."""
+    if not _roster_function_missing:
+        try:
+            response = supabase.rpc(ROSTER_FUNCTION, {"p_project_id": str(project_id)}).execute()
+            return response.data or None
+        except APIError as e:
+            _check_missing_function(e)
+
+    project = _single(supabase.table("project_db").select(PROJECT_COLUMNS).eq("id", str(project_id)))
+    if not project:
+        return None
+    team = None
+    if project.get("team_id"):
+        team = _single(supabase.table("team_db").select(TEAM_COLUMNS).eq("team_id", str(project["team_id"])))
+    hackathons = supabase.table("user_projects") \
+        .select("hackathon_name") \
+        .eq("project_id", str(project_id)) \
+        .limit(1) \
+        .execute().data or []
+    project["hackathon_name"] = hackathons[0].get("hackathon_name") if hackathons else None
+    member_ids = (team or {}).get("team_members") or []
+    members = []
+    if member_ids:
+        members = supabase.table("user_profiles") \
+            .select(MEMBER_COLUMNS) \
+            .in_("user_id", member_ids) \
+            .execute().data or []
+    return {"project": project, "team": team, "members": members}
+
+
+def _single(query) -> Optional[Dict[str, Any]]:
+    response = query.maybe_single().execute()
+    return response.data if response and response.data else None
+
+
+def _check_missing_function(error: APIError):
+    global _roster_function_missing
+    if error.code != FUNCTION_NOT_FOUND:
+        raise error
+    _roster_function_missing = True
+    print(f"[WARN] Postgres function {ROSTER_FUNCTION} not found (see README); using one query per table")
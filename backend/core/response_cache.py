@@ -0,0 +1,87 @@
+"""
+Cached JSON responses with strong ETags.
+
+ResponseCache keeps the serialized body of recent responses, keyed by a
+normalized request plus the version of the data it was computed from, so a
+repeated request is answered without recomputing or re-serializing it. Each
+body carries a strong ETag (a digest of its bytes); a client that sends the
+ETag back in If-None-Match gets 304 Not Modified with no body.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from fastapi import Response
+
+from core import metrics
+
+
+def serialize(payload: Any) -> bytes:
+    """The body FastAPI's JSONResponse would send for payload."""
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def etag_of(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value lists etag (weak comparison, per RFC 9110)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+        self._entries: "OrderedDict[Tuple[Any, Hashable], Tuple[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def respond(
+        self,
+        version: Any,
+        key: Hashable,
+        if_none_match: Optional[str],
+        compute: Callable[[], Any],
+    ) -> Response:
+        """
+        Response for a request: 304 when the client already holds the
+        current body, else the cached body, else compute()'s payload
+        (serialized and cached).
+        """
+        entry_key = (version, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None:
+                self._entries.move_to_end(entry_key)
+
+        if entry is None:
+            metrics.incr("response_cache.miss", self.name)
+            body = serialize(compute())
+            entry = (etag_of(body), body)
+            with self._lock:
+                self._entries[entry_key] = entry
+                while len(self._entries) > self.size:
+                    self._entries.popitem(last=False)
+        else:
+            metrics.incr("response_cache.hit", self.name)
+
+        etag, body = entry
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if matches(if_none_match, etag):
+            metrics.incr("response_cache.not_modified", self.name)
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,217 @@
+"""
+Priority and fair-share scheduler for LLM pipeline runs.
+
+Jobs fall into three priority classes. A worker always takes the highest
+class that has work, so interactive requests never wait behind stage prefetches or
+eager precomputes, and background classes may never occupy the last
+SCHEDULER_INTERACTIVE_WORKERS workers (the pool is grown to one more than
+that if SCHEDULER_WORKERS is not larger).
+
+Within a class, jobs are ordered by weighted fair queueing on team_id
+(self-clocked: each job gets a virtual finish tag of
+max(class virtual time, team's last tag) + cost / weight), so one team
+spamming regenerate only delays its own queue. A team whose hackathon
+deadline is within DEADLINE_BOOST_HOURS gets its weight multiplied by
+DEADLINE_BOOST.
+
+A job submitted with a timeout runs inside a core.deadline scope that
+started when it was queued, so queueing time counts against the request's
+budget; a job whose budget is gone before it starts is failed unrun.
+"""
+
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from core import deadline as request_deadline
+from core import llm, metrics
+
+load_dotenv()
+
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", os.getenv("LLM_QUEUE_WORKERS", "3")))
+SCHEDULER_INTERACTIVE_WORKERS = int(os.getenv("SCHEDULER_INTERACTIVE_WORKERS", "1"))
+SCHEDULER_TEAM_WEIGHTS: Dict[str, float] = json.loads(os.getenv("SCHEDULER_TEAM_WEIGHTS", "{}"))
+DEADLINE_BOOST_HOURS = float(os.getenv("DEADLINE_BOOST_HOURS", "48"))
+DEADLINE_BOOST = float(os.getenv("DEADLINE_BOOST", "4"))
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    PREFETCH = 1
+    BATCH = 2
+
+
+@dataclass
+class Job:
+    fn: Callable
+    args: Tuple
+    kwargs: Dict[str, Any]
+    team_id: str
+    priority: Priority
+    future: Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+    expires_at: Optional[float] = None
+
+
+class Scheduler:
+    def __init__(self, workers: int, interactive_workers: int = 1):
+        interactive_workers = max(interactive_workers, 0)
+        # Background jobs get at least one worker of their own, never a reserved one
+        self.workers = max(workers, interactive_workers + 1)
+        self.background_limit = self.workers - interactive_workers
+
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._queues: Dict[Priority, List[Tuple[float, int, Job]]] = {p: [] for p in Priority}
+        self._virtual_time: Dict[Priority, float] = {p: 0.0 for p in Priority}
+        self._last_tag: Dict[Priority, Dict[str, float]] = {p: {} for p in Priority}
+        self._running_background = 0
+        self._threads: List[threading.Thread] = []
+
+    # -------------------------
+    # Submission
+    # -------------------------
+    def submit(
+        self,
+        fn: Callable,
+        *args,
+        team_id: Optional[str] = None,
+        priority: Priority = Priority.BATCH,
+        deadline: Optional[datetime] = None,
+        cost: float = 1.0,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Future:
+        """
+        deadline is the team's hackathon deadline (used for fair-share
+        weighting); timeout is this request's time budget in seconds.
+        """
+        team = str(team_id) if team_id else "-"
+        future: Future = Future()
+        job = Job(fn, args, kwargs, team, priority, future)
+        if timeout is not None:
+            job.expires_at = job.enqueued_at + timeout
+
+        with self._cond:
+            self._ensure_started()
+
+            weight = self._weight(team, deadline)
+            start = max(self._virtual_time[priority], self._last_tag[priority].get(team, 0.0))
+            tag = start + cost / weight
+            self._last_tag[priority][team] = tag
+
+            heapq.heappush(self._queues[priority], (tag, next(self._seq), job))
+            self._publish_depth()
+            self._cond.notify()
+
+        metrics.incr("scheduler.submitted", priority.name.lower())
+        return future
+
+    def _weight(self, team: str, deadline: Optional[datetime]) -> float:
+        weight = float(SCHEDULER_TEAM_WEIGHTS.get(team, 1.0))
+        if deadline is not None:
+            if deadline.tzinfo is None:
+                deadline = deadline.replace(tzinfo=timezone.utc)
+            hours_left = (deadline - datetime.now(timezone.utc)).total_seconds() / 3600
+            if 0 <= hours_left <= DEADLINE_BOOST_HOURS:
+                weight *= DEADLINE_BOOST
+        return max(weight, 1e-6)
+
+    # -------------------------
+    # Workers
+    # -------------------------
+    def _ensure_started(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._worker,
+                name=f"llm-scheduler-{len(self._threads)}",
+                daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def _pop_next(self) -> Optional[Job]:
+        for priority in Priority:
+            if priority != Priority.INTERACTIVE and self._running_background >= self.background_limit:
+                return None
+
+            queue = self._queues[priority]
+            while queue:
+                tag, _, job = heapq.heappop(queue)
+                if not job.future.set_running_or_notify_cancel():
+                    continue  # cancelled while queued
+
+                self._virtual_time[priority] = tag
+                self._prune_tags(priority)
+                if priority != Priority.INTERACTIVE:
+                    self._running_background += 1
+                return job
+        return None
+
+    def _prune_tags(self, priority: Priority):
+        # Caller holds self._cond. A tag at or behind the virtual time no longer
+        # affects the team's next start, so idle teams are forgotten.
+        virtual_time = self._virtual_time[priority]
+        last_tag = self._last_tag[priority]
+        for team in [team for team, tag in last_tag.items() if tag <= virtual_time]:
+            del last_tag[team]
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = self._pop_next()
+                while job is None:
+                    self._cond.wait()
+                    job = self._pop_next()
+                self._publish_depth()
+
+            label = job.priority.name.lower()
+            started = time.monotonic()
+            metrics.observe("scheduler.wait", label, started - job.enqueued_at)
+
+            try:
+                with request_deadline.scope_until(job.expires_at):
+                    request_deadline.check(f"{label} job")
+                    if job.priority == Priority.INTERACTIVE:
+                        result = job.fn(*job.args, **job.kwargs)
+                    else:
+                        with llm.background_priority():
+                            result = job.fn(*job.args, **job.kwargs)
+            except BaseException as e:
+                job.future.set_exception(e)
+                metrics.incr("scheduler.failed", label)
+            else:
+                job.future.set_result(result)
+                metrics.incr("scheduler.completed", label)
+            finally:
+                metrics.observe("scheduler.run", label, time.monotonic() - started)
+                with self._cond:
+                    if job.priority != Priority.INTERACTIVE:
+                        self._running_background -= 1
+                    self._cond.notify_all()
+
+    # -------------------------
+    # Metrics
+    # -------------------------
+    def depth(self) -> Dict[str, int]:
+        with self._cond:
+            return {p.name.lower(): len(q) for p, q in self._queues.items()}
+
+    def _publish_depth(self):
+        # Caller holds self._cond
+        for priority, queue in self._queues.items():
+            metrics.set_gauge("scheduler.queue_depth", priority.name.lower(), len(queue))
+        metrics.set_gauge("scheduler.running_background", "", self._running_background)
+
+
+scheduler = Scheduler(SCHEDULER_WORKERS, SCHEDULER_INTERACTIVE_WORKERS)
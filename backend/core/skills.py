@@ -0,0 +1,317 @@
+"""
+Local skill taxonomy used to normalize and expand technical keywords.
+
+SKILL_SYNONYMS maps surface forms to a canonical skill name and
+SKILL_IMPLICATIONS lists the skills each one brings along (the expansion
+rules of the keyword generator's prompt). The implication graph is closed
+transitively once at import, so expansion is a set union per skill.
+
+parse() tokenizes free text and matches the longest known phrase at each
+position; words that are neither known skills nor filler words are returned
+as unknown spans, which callers may send to the LLM. AMBIGUOUS_SKILLS are
+names that are also ordinary words ("go", "c", "r"): in running text they
+only count as list items (a whole text, e.g. a tag, or an entry between
+commas) and are otherwise treated as filler; unambiguous synonyms such as
+"golang" match anywhere.
+
+SkillRegistry interns canonical skill names to dense integer IDs so skill
+sets can be held as int bitsets (overlap / coverage / jaccard below) or as
+NumPy rows (core.profile_index).
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+SKILL_IMPLICATIONS: Dict[str, List[str]] = {
+    "web development": ["html", "css", "javascript", "frontend development", "backend development"],
+    "frontend development": ["react", "ui development"],
+    "backend development": ["api development", "node.js", "databases"],
+    "machine learning": [
+        "python", "data preprocessing", "model training", "model evaluation",
+        "supervised learning", "unsupervised learning",
+    ],
+    "deep learning": ["neural networks", "tensorflow", "pytorch"],
+    "data science": ["python", "statistics", "data analysis", "pandas", "numpy"],
+    "cyber security": [
+        "network security", "cryptography", "vulnerability assessment",
+        "penetration testing", "security fundamentals",
+    ],
+}
+
+# Skills recognised as-is (beyond those appearing in SKILL_IMPLICATIONS)
+KNOWN_SKILLS: List[str] = [
+    "python", "java", "c", "c++", "c#", "go", "rust", "kotlin", "swift", "ruby", "php",
+    "javascript", "typescript", "html", "css", "sql", "r", "scala", "dart", "solidity",
+    "react", "angular", "vue", "next.js", "node.js", "express", "django", "flask", "fastapi",
+    "spring boot", "flutter", "react native", "tailwind css",
+    "databases", "postgresql", "mysql", "mongodb", "redis", "firebase", "supabase",
+    "docker", "kubernetes", "aws", "gcp", "azure", "devops", "git", "linux", "ci/cd",
+    "tensorflow", "pytorch", "scikit-learn", "pandas", "numpy", "statistics",
+    "natural language processing", "computer vision", "artificial intelligence",
+    "generative ai", "large language models", "data analysis", "data engineering",
+    "mobile development", "android development", "ios development", "game development",
+    "ui development", "ui/ux design", "figma", "api development", "blockchain",
+    "cloud computing", "embedded systems", "iot", "robotics", "product management",
+]
+
+SKILL_SYNONYMS: Dict[str, str] = {
+    "web dev": "web development",
+    "web developer": "web development",
+    "webdev": "web development",
+    "full stack": "web development",
+    "fullstack": "web development",
+    "full stack development": "web development",
+    "frontend": "frontend development",
+    "front end": "frontend development",
+    "front-end": "frontend development",
+    "frontend developer": "frontend development",
+    "backend": "backend development",
+    "back end": "backend development",
+    "back-end": "backend development",
+    "backend developer": "backend development",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "ai": "artificial intelligence",
+    "genai": "generative ai",
+    "llm": "large language models",
+    "llms": "large language models",
+    "nlp": "natural language processing",
+    "cybersecurity": "cyber security",
+    "cyber-security": "cyber security",
+    "infosec": "cyber security",
+    "information security": "cyber security",
+    "it security": "cyber security",
+    "security engineering": "cyber security",
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "cpp": "c++",
+    "csharp": "c#",
+    "golang": "go",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "nextjs": "next.js",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "expressjs": "express",
+    "postgres": "postgresql",
+    "mongo": "mongodb",
+    "k8s": "kubernetes",
+    "sklearn": "scikit-learn",
+    "tf": "tensorflow",
+    "torch": "pytorch",
+    "ui": "ui development",
+    "ux": "ui/ux design",
+    "ui/ux": "ui/ux design",
+    "android": "android development",
+    "ios": "ios development",
+    "app development": "mobile development",
+    "mobile": "mobile development",
+    "web3": "blockchain",
+    "cloud": "cloud computing",
+    "database": "databases",
+    "neural network": "neural networks",
+    "stats": "statistics",
+}
+
+# Filler words in teammate search queries; they end an unknown span
+STOPWORDS: Set[str] = {
+    "a", "an", "the", "and", "or", "with", "in", "on", "of", "for", "to", "at", "by", "as",
+    "i", "we", "me", "my", "our", "us", "you", "who", "whom", "that", "which", "is", "are",
+    "be", "has", "have", "having", "can", "could", "should", "must", "will", "would",
+    "need", "needs", "needed", "want", "wants", "looking", "require", "requires", "required",
+    "someone", "somebody", "anyone", "person", "people", "teammate", "teammates", "team",
+    "member", "members", "partner", "candidate", "help", "find", "please", "also", "plus",
+    "some", "any", "like", "etc", "good", "great", "strong", "solid", "basic", "advanced",
+    "experience", "experienced", "skills", "skill", "skilled", "knowledge", "know", "knows",
+    "knowing", "familiar", "familiarity", "proficient", "proficiency", "expert", "expertise",
+    "specialisation", "specialization", "specialised", "specialized", "background",
+    "developer", "developers", "development", "engineer", "engineers", "engineering",
+    "work", "working", "build", "building", "senior", "junior", "level", "years", "year",
+}
+
+# Skill names that are also ordinary words or letters
+AMBIGUOUS_SKILLS: Set[str] = {"go", "c", "r"}
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#./\-]*|[,;:()&|]")
+_SEPARATORS = {",", ";", ":", "(", ")", "&", "|"}
+
+
+class SkillTaxonomy:
+    def __init__(
+        self,
+        implications: Dict[str, List[str]],
+        known: Iterable[str],
+        synonyms: Dict[str, str],
+    ):
+        self.skills: Set[str] = set(known) | set(implications)
+        for implied in implications.values():
+            self.skills.update(implied)
+
+        self.lookup: Dict[str, str] = {skill: skill for skill in self.skills}
+        self.lookup.update(synonyms)
+        self.max_phrase = max(len(phrase.split()) for phrase in self.lookup)
+
+        self.closure: Dict[str, List[str]] = {
+            skill: self._close(skill, implications) for skill in self.skills
+        }
+
+    @staticmethod
+    def _close(skill: str, implications: Dict[str, List[str]]) -> List[str]:
+        """skill followed by everything it implies, transitively, in BFS order."""
+        ordered = [skill]
+        seen = {skill}
+        for current in ordered:
+            for implied in implications.get(current, []):
+                if implied not in seen:
+                    seen.add(implied)
+                    ordered.append(implied)
+        return ordered
+
+    def canonical(self, term: str) -> str:
+        """Canonical name of a term; unknown terms are returned lowercased."""
+        term = term.strip().lower()
+        return self.lookup.get(term, term)
+
+    def is_known(self, term: str) -> bool:
+        return term.strip().lower() in self.lookup
+
+    def expand(self, skills: Iterable[str]) -> List[str]:
+        """Canonicalize skills and add their implications, without duplicates."""
+        result: List[str] = []
+        seen: Set[str] = set()
+        for skill in skills:
+            skill = self.canonical(skill)
+            for expanded in self.closure.get(skill, [skill]):
+                if expanded not in seen:
+                    seen.add(expanded)
+                    result.append(expanded)
+        return result
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        return [token.rstrip(".") or token for token in _TOKEN.findall(text.lower())]
+
+    def parse(self, text: str) -> Tuple[List[str], List[str]]:
+        """
+        Split free text into (known canonical skills, unknown spans). Unknown
+        spans are runs of words that are neither a known skill nor filler.
+        """
+        tokens = self.tokenize(text)
+        known: List[str] = []
+        unknown: List[str] = []
+        span: List[str] = []
+
+        def flush():
+            if span:
+                unknown.append(" ".join(span))
+                span.clear()
+
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token in _SEPARATORS:
+                flush()
+                i += 1
+                continue
+
+            for length in range(min(self.max_phrase, len(tokens) - i), 0, -1):
+                words = tokens[i:i + length]
+                if any(word in _SEPARATORS for word in words):
+                    continue
+                phrase = " ".join(words)
+                if phrase in AMBIGUOUS_SKILLS and not self._is_list_item(tokens, i):
+                    continue
+                if phrase in self.lookup:
+                    flush()
+                    known.append(self.lookup[phrase])
+                    i += length
+                    break
+            else:
+                if token in STOPWORDS or token in AMBIGUOUS_SKILLS or token.isdigit():
+                    flush()
+                else:
+                    span.append(token)
+                i += 1
+
+        flush()
+        return known, unknown
+
+    @staticmethod
+    def _is_list_item(tokens: List[str], i: int) -> bool:
+        """Whether tokens[i] stands alone between separators or the ends of the text."""
+        return (i == 0 or tokens[i - 1] in _SEPARATORS) and (i + 1 == len(tokens) or tokens[i + 1] in _SEPARATORS)
+
+
+taxonomy = SkillTaxonomy(SKILL_IMPLICATIONS, KNOWN_SKILLS, SKILL_SYNONYMS)
+
+
+# -------------------------
+# Integer IDs and bitsets
+# -------------------------
+class SkillRegistry:
+    """Append-only mapping between canonical skill names and dense integer IDs."""
+
+    def __init__(self, skills: Iterable[str] = ()):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+        for skill in sorted(skills):
+            self.intern(skill)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def intern(self, skill: str) -> int:
+        skill = taxonomy.canonical(skill)
+        skill_id = self._ids.get(skill)
+        if skill_id is not None:
+            return skill_id
+        with self._lock:
+            if skill not in self._ids:
+                self._ids[skill] = len(self._names)
+                self._names.append(skill)
+            return self._ids[skill]
+
+    def get(self, skill: str) -> Optional[int]:
+        """ID of an already interned skill, without interning new ones."""
+        return self._ids.get(taxonomy.canonical(skill))
+
+    def name(self, skill_id: int) -> str:
+        return self._names[skill_id]
+
+    def ids(self, skills: Iterable[str], intern: bool = True) -> List[int]:
+        if intern:
+            return sorted({self.intern(skill) for skill in skills})
+        return sorted({skill_id for skill_id in map(self.get, skills) if skill_id is not None})
+
+    def mask(self, skills: Iterable[str], intern: bool = True) -> int:
+        bits = 0
+        for skill_id in self.ids(skills, intern=intern):
+            bits |= 1 << skill_id
+        return bits
+
+    def names(self, mask: int) -> List[str]:
+        return [self._names[i] for i in range(mask.bit_length()) if mask >> i & 1]
+
+
+def overlap(a: int, b: int) -> int:
+    return (a & b).bit_count()
+
+
+def coverage(required: int, have: int) -> float:
+    """Share of the required skills present in have (1.0 when nothing is required)."""
+    needed = required.bit_count()
+    return (required & have).bit_count() / needed if needed else 1.0
+
+
+def jaccard(a: int, b: int) -> float:
+    union = (a | b).bit_count()
+    return (a & b).bit_count() / union if union else 0.0
+
+
+registry = SkillRegistry(taxonomy.skills)
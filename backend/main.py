@@ -1,4 +1,7 @@
+import asyncio
 import datetime
+import threading
+from contextlib import asynccontextmanager
 from typing import Any, Dict, List, Optional
 from fastapi import FastAPI , HTTPException , Query , status
 from grpc import Status
@@ -8,17 +11,23 @@ from realtime import TypedDict
 from routers import auth , exploreApi , team , uploadPdf , research , project , profile
 from uuid import UUID
 from core.database import supabase
+from core import admission, artifacts, database, llm_queue, metrics, repository
+from core.profile_index import profile_index
+from core.breaker import CircuitOpen
 from pydantic import BaseModel, Field
 import core.cloudinary
 from fastapi.middleware.cors import CORSMiddleware
 
 
-from notebooks.research_work import final_call
-from notebooks.prd_to_todo import final_call_todo
-from notebooks.ques_n_discussion import generate_combined_questions
-from notebooks.copy_of_prd import run_prd_agent
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await database.connect()
+    threading.Thread(target=exploreApi.warm_up, name="warm-up", daemon=True).start()
+    yield
+    await database.disconnect()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 
 
@@ -52,6 +61,11 @@ def root():
     return {"message": "Server running"}
 
 
+@app.get("/metrics")
+def get_metrics():
+    return metrics.snapshot()
+
+
 
 
 class ProblemStatementRequest(BaseModel):
@@ -70,10 +84,10 @@ def add_problem_statement(payload: ProblemStatementRequest):
         .execute()
     )
 
-
-    
-
-    
+    # Eager mode: warm the Q&A and research TODO caches in the background
+    # (skipped there when this statement was already precomputed)
+    if llm_queue.EAGER_PRECOMPUTE and response.data and payload.problem_statement.strip():
+        artifacts.precompute_for_problem_statement(payload.project_id, payload.problem_statement)
 
     return {
         "message": "Problem statement added successfully",
@@ -248,6 +262,8 @@ def create_or_update_user_profile(payload: UserProfileCreateRequest):
             
         )
 
+    profile_index.upsert(response.data[0])
+
     return {
         "message": "User profile saved successfully",
         "user_id": payload.user_id
@@ -366,53 +382,28 @@ def generate_prd(payload: GeneratePRDRequest):
 async def get_project_team_details(project_id: UUID):
     """
     Retrieves the complete team roster for a given project ID.
-    Performs a relational lookup from Project -> Team -> User Profiles.
+    Performs the relational lookup Project -> Team -> User Profiles in a
+    single round trip (project_roster Postgres function).
     """
     try:
-        # 1. Retrieve team_id from project_db
-        project_query = supabase.table("project_db") \
-            .select("team_id") \
-            .eq("id", str(project_id)) \
-            .maybe_single() \
-            .execute()
-
-        if not project_query.data:
+        # 1. Project, team and member profiles together
+        project_roster = await repository.project_roster(project_id)
+
+        if not project_roster:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Project not found"
             )
 
-        team_id = project_query.data.get("team_id")
-
-        # 2. Retrieve team_members (UUID array) from team_db
-        team_query = supabase.table("team_db") \
-            .select("team_members") \
-            .eq("team_id", team_id) \
-            .maybe_single() \
-            .execute()
-
-        if not team_query.data:
+        if not project_roster.get("team"):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Associated team records not found"
             )
 
-        member_ids = team_query.data.get("team_members", [])
-
-        # Handle empty team scenario
-        if not member_ids:
-            return []
-
-        # 3 & 4. Bulk Query user_profiles (Optimized from N+1 to 1 query)
-        # We fetch all users where id is in the member_ids list
-        user_query = supabase.table("user_profiles") \
-            .select("user_id, full_name, role") \
-            .in_("user_id", member_ids) \
-            .execute()
-
-        # 5. Collect and Format Results
+        # 2. Collect and Format Results (empty team -> [])
         roster = []
-        for user in user_query.data:
+        for user in project_roster.get("members") or []:
             role_data = user.get("role", {})
             
             # If role_data is a dict like {"student": 1}, extract the keys
@@ -488,144 +479,67 @@ class SearchQuery(BaseModel):
 @app.get("/research/{project_id}/todo", response_model=Dict[str, List[MemberOutput]])
 async def get_team_members(project_id: UUID):
     try:
-        # 1. Get team_id from project_db
-        project_response = supabase.table("project_db") \
-        .select("team_id") \
-        .eq("id", str(project_id)) \
-        .maybe_single() \
-        .execute()
+        # 1. Project, team roster and problem statement in one round trip,
+        #    alongside the existing research rows
+        project_roster, existing_research = await asyncio.gather(
+            repository.project_roster(project_id),
+            repository.fetch_all("research_stage", "user_id, tasks, pdf_url", project_id=project_id)
+        )
         
-        if not project_response.data:
+        if not project_roster:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Project not found"
             )
             
-        actual_team_id = project_response.data.get("team_id")
+        actual_team_id = project_roster["project"].get("team_id")
 
         # --- CACHE CHECK: If research tasks already exist, return them directly ---
-        existing_research = supabase.table("research_stage") \
-            .select("user_id, tasks, pdf_url") \
-            .eq("project_id", str(project_id)) \
-            .execute()
-
-        if existing_research.data and any(row.get("tasks") for row in existing_research.data):
-            # Fetch user profiles for names
-            member_ids = [row["user_id"] for row in existing_research.data]
-            user_response = supabase.table("user_profiles") \
-                .select("user_id, full_name") \
-                .in_("user_id", member_ids) \
-                .execute()
-            
-            user_id_to_name = {str(profile["user_id"]): profile.get("full_name") for profile in user_response.data}
+        if existing_research and any(row.get("tasks") for row in existing_research):
+            # Names from the roster; only former members need a profile lookup
+            user_id_to_name = {
+                str(profile["user_id"]): profile.get("full_name")
+                for profile in project_roster.get("members") or []
+            }
+            former = [row["user_id"] for row in existing_research if str(row["user_id"]) not in user_id_to_name]
+            if former:
+                profiles = await repository.fetch_in("user_profiles", "user_id, full_name", "user_id", former)
+                user_id_to_name.update({str(profile["user_id"]): profile.get("full_name") for profile in profiles})
             
             members_list = []
-            for row in existing_research.data:
+            for row in existing_research:
                 members_list.append(MemberOutput(
                     user_id=str(row["user_id"]),
                     name=user_id_to_name.get(str(row["user_id"])),
                     task=row.get("tasks") or [],
                     pdf_url=row.get("pdf_url")
                 ))
+            artifacts.remember("research_todo", project_id, [member.model_dump() for member in members_list])
             return {"members": members_list}
         # --- END CACHE CHECK ---
 
-        # 2. Fetch team record to get the UUID array
-        team_response = supabase.table("team_db") \
-            .select("team_members") \
-            .eq("team_id", str(actual_team_id)) \
-            .maybe_single() \
-            .execute()
-
-        if not team_response.data:
+        if not project_roster.get("team"):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Team not found"
             )
-        
-        member_ids: List[str] = team_response.data.get("team_members", [])
-
-        if not member_ids:
-            return {"members": []}
-
-        # 3. Fetch profiles using user_id instead of full_name
-        user_response = supabase.table("user_profiles") \
-            .select("user_id, full_name, role, skills") \
-            .in_("user_id", member_ids) \
-            .execute()
-
-        profiles = user_response.data
-        user_id_to_name = {str(profile["user_id"]): profile.get("full_name") for profile in profiles}
-
-        
-        ps = supabase.table("project_db") \
-            .select("problem_statement") \
-            .eq("team_id", str(actual_team_id)) \
-            .order("created_at", desc=True) \
-            .limit(1) \
-            .execute()
-
-        if not ps.data:
-            raise HTTPException(
-                status_code=404, 
-                detail=f"No project found for team_id: {actual_team_id}"
-            )
 
-        # 3. Build response: Convert user_id UUID to string and map to 'name'
-        result: List[Person] = [
-            {
-                "name": str(profile.get("user_id")),
-                "role": profile.get("role", {}),
-                "skills": profile.get("skills", [])
-            }
-            for profile in profiles
-        ]
-        
-        answer = final_call(result, ps.data[0].get("problem_statement"))
-        assignments = answer.get("assignments", [])
-        
-        grouped_data: Dict[str, List[str]] = {}
-        
-        for item in assignments:
-            # item is a dict with keys: topic, assigned_to, justification
-            uid = item.get("assigned_to")
-            topic = item.get("topic")
-            if uid:
-                if uid not in grouped_data:
-                    grouped_data[uid] = []
-                grouped_data[uid].append(topic)
-
-        # Build the response list
-        members_list = []
-        
-        for user_id, tasks in grouped_data.items():
-            
-            member = MemberOutput(
-                user_id=user_id,
-                name=user_id_to_name.get(user_id),
-                task=tasks,
-                pdf_url=None
-            )
-            members_list.append(member)
-
-        # Prepare data for research_stage insertion
-        research_stage_data = []
-        for member in members_list:
-            research_stage_data.append({
-                "project_id": str(project_id),
-                "user_id": member.user_id,
-                "tasks": member.task,
-                "pdf_url": member.pdf_url
-            })
-
-        # Insert into research_stage table
-        if research_stage_data:
-             print(f"DEBUG: Inserting {len(research_stage_data)} rows into research_stage: {research_stage_data}")
-             for entry in research_stage_data:
-                 supabase.table("research_stage").upsert(entry).execute()
+        # 2. Cache miss: run the research pipeline and persist the assignments
+        _, deadline = artifacts.scheduling_from_roster(project_id, project_roster)
+        members = await admission.run(
+            "research_todo", artifacts.build_research_todo, project_id,
+            stale=lambda: artifacts.last_built("research_todo", project_id),
+            roster=project_roster,
+            team_id=actual_team_id,
+            deadline=deadline
+        )
+        members_list = [MemberOutput(**member) for member in members]
 
         return {"members": members_list}
 
+    except CircuitOpen as e:
+        members = artifacts.stale_or_raise("research_todo", project_id, e)
+        return {"members": [MemberOutput(**member) for member in members]}
     except HTTPException:
         raise
     except Exception as e:
@@ -643,79 +557,43 @@ async def get_project_structure(project_id: UUID):
         # -------------------------------
         # STEP 1: CACHE CHECK (SAFE)
         # -------------------------------
-        existing_ideation = supabase.table("ideation_stage") \
-            .select("q_n_a, pitch") \
-            .eq("project_id", str(project_id)) \
-            .execute()
+        existing_ideation = await repository.fetch_all("ideation_stage", "q_n_a, pitch", project_id=project_id)
 
-        if existing_ideation and existing_ideation.data:
-            row = existing_ideation.data[0]
+        if existing_ideation:
+            row = existing_ideation[0]
             if row.get("q_n_a"):
+                artifacts.remember("qna", project_id, row["q_n_a"])
                 return FinalResponse(
                     qna=[QnAItem(**item) for item in row["q_n_a"]],
                     pitch=row.get("pitch") or ""
                 )
 
         # -------------------------------
-        # STEP 2: FETCH PROBLEM STATEMENT
+        # STEP 2: GENERATE + SAVE TO IDEATION STAGE
         # -------------------------------
-        response = supabase.table("project_db") \
-            .select("problem_statement") \
-            .eq("id", str(project_id)) \
-            .execute()
-
-        if not response or not response.data:
-            raise HTTPException(status_code=404, detail="Project ID not found")
-
-        problem_statement = response.data[0].get("problem_statement")
-
-        if not problem_statement:
-            raise HTTPException(status_code=400, detail="Problem statement is empty or missing")
-
-        # -------------------------------
-        # STEP 3: CALL LLM
-        # -------------------------------
-        raw_llm_response = generate_combined_questions(problem_statement, "")
-
-        if not raw_llm_response or not isinstance(raw_llm_response, list):
-            raise HTTPException(status_code=500, detail="LLM returned invalid response")
-
-        # -------------------------------
-        # STEP 4: FORMAT QnA
-        # -------------------------------
-        formatted_qna = [
-            QnAItem(
-                question=item.get("question", ""),
-                answer=""  # forced empty as required
-            )
-            for item in raw_llm_response
-            if item.get("question")
-        ]
-
-        # -------------------------------
-        # STEP 5: SAVE TO IDEATION STAGE
-        # -------------------------------
-        qna_json_data = [
-            {"question": item.question, "answer": item.answer}
-            for item in formatted_qna
-        ]
-
-        ideation_payload = {
-            "project_id": str(project_id),
-            "q_n_a": qna_json_data,
-            "pitch": ""
-        }
-
-        supabase.table("ideation_stage").upsert(ideation_payload).execute()
+        # Scheduling info and the problem statement in one round trip
+        project_roster = await repository.project_roster(project_id)
+        team_id, deadline = artifacts.scheduling_from_roster(project_id, project_roster)
+        qna = await admission.run(
+            "qna", artifacts.build_qna, project_id,
+            stale=lambda: artifacts.last_built("qna", project_id),
+            # None (missing project or empty statement) lets build_qna raise its 404 / 400
+            problem_statement=(project_roster["project"].get("problem_statement") or None) if project_roster else None,
+            team_id=team_id,
+            deadline=deadline
+        )
 
         # -------------------------------
-        # STEP 6: RETURN RESPONSE
+        # STEP 3: RETURN RESPONSE
         # -------------------------------
         return FinalResponse(
-            qna=formatted_qna,
+            qna=[QnAItem(**item) for item in qna],
             pitch=""
         )
 
+    except CircuitOpen as e:
+        qna = artifacts.stale_or_raise("qna", project_id, e)
+        return FinalResponse(qna=[QnAItem(**item) for item in qna], pitch="")
     except HTTPException:
         raise
     except Exception as e:
@@ -737,40 +615,40 @@ async def create_project(payload: CreateProjectRequest):
     
    
         # 1️⃣ Insert into project_db
-    project_res = supabase.table("project_db").insert({
+    project_rows = await repository.insert("project_db", {
             "project_name": "new project",
             "team_leader": str(user_id)
-        }).execute()
+        })
 
-    if not project_res.data:
+    if not project_rows:
             raise Exception("Project creation failed")
 
-    project = project_res.data[0]
+    project = project_rows[0]
     project_id = project["id"]
     team_id = project["team_id"]
 
         # 2️⃣ Insert into user_projects
-    user_project_res = supabase.table("user_projects").insert({
+    user_project_rows = await repository.insert("user_projects", {
             "user_id": str(user_id),
             "project_id": project_id,
             "project_name": "new project",
             "current_status": "Manage Team",
             "state": "active"
-        }).execute()
+        })
 
-    if not user_project_res.data:
+    if not user_project_rows:
             raise Exception("User project mapping failed")
 
         # 3️⃣ Insert into team_db
-    team_res = supabase.table("team_db").insert({
+    team_rows = await repository.insert("team_db", {
             "team_id": team_id,
             "project_id": project_id,
             "team_members": [str(user_id)],
             "team_leader": str(user_id),
             "team_name": "new project"
-        }).execute()
+        })
 
-    if not team_res.data:
+    if not team_rows:
             raise Exception("Team creation failed")
 
     return {
@@ -808,62 +686,63 @@ async def create_prd(project_id: UUID):
     try:
         # --- CACHE CHECK ---
         # Fetch existing ideation data (including pitch, qna, and prd for optimization)
-        ideation_res = supabase.table("ideation_stage")\
-            .select("pitch, q_n_a, prd")\
-            .eq("project_id", str(project_id))\
-            .maybe_single()\
-            .execute()
+        ideation = await repository.fetch_one("ideation_stage", "pitch, q_n_a, prd", project_id=project_id)
 
         # If PRD already exists, return it directly
-        if ideation_res.data and ideation_res.data.get("prd"):
-            return {"prd": ideation_res.data.get("prd")}
+        if ideation and ideation.get("prd"):
+            return {"prd": artifacts.remember("prd", project_id, ideation.get("prd"))}
         # --- END CACHE CHECK ---
 
-        # 1. Fetch Problem Statement from 'project_db'
-        # We need this because it is not in the 'ideation_stage' schema
-        project_res = supabase.table("project_db")\
-            .select("problem_statement")\
-            .eq("id", str(project_id))\
-            .execute()
-
-        if not project_res.data:
-            raise HTTPException(status_code=404, detail="Project ID not found in project_db")
-        
-        problem_statement = project_res.data[0].get("problem_statement")
-
-        # 2. Extract Pitch and QnA from the earlier fetch or default
-        pitch_val = None
-        qna_val = []
+        # 1. Cache miss: run the PRD agent and save the result
+        project_roster = await repository.project_roster(project_id)
+        team_id, deadline = artifacts.scheduling_from_roster(project_id, project_roster)
+        prd_text = await admission.run(
+            "prd", artifacts.build_prd, project_id,
+            stale=lambda: artifacts.last_built("prd", project_id),
+            ideation=ideation or {},
+            problem_statement=project_roster["project"].get("problem_statement") if project_roster else None,
+            team_id=team_id,
+            deadline=deadline
+        )
 
-        if ideation_res.data:
-            pitch_val = ideation_res.data.get("pitch")
-            qna_val = ideation_res.data.get("q_n_a")
-        
-        response = run_prd_agent(problem_statement, pitch_val or "", qna_val or [])
-        
-        prd_text = response 
-
-        if ideation_res.data:
-            # SCENARIO A: Row exists. 
-            # We strictly UPDATE only the 'prd' column to preserve existing pitch/qna.
-            save_res = supabase.table("ideation_stage")\
-                .update({"prd": prd_text})\
-                .eq("project_id", str(project_id))\
-                .execute()
-        else:
-            # SCENARIO B: Row does not exist.
-            # We INSERT a new row with the project_id and the prd.
-            save_res = supabase.table("ideation_stage")\
-                .insert({
-                    "project_id": str(project_id), 
-                    "prd": prd_text
-                })\
-                .execute()
-
-        # 4. Return the result
+        # 2. Return the result
         return {
             "prd": prd_text
         }
 
+    except CircuitOpen as e:
+        return {"prd": artifacts.stale_or_raise("prd", project_id, e)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+#API ENDPOINT FOR IMPLEMENTATION TODOS FROM PRD + TEAM
+@app.get("/implementation/todo/{project_id}")
+async def get_implementation_todo(project_id: UUID):
+    try:
+        # --- CACHE CHECK ---
+        implementation = await repository.fetch_one("implementation_stage", "tasks", project_id=project_id)
+        cached_tasks = implementation.get("tasks") if implementation else None
+        if cached_tasks:
+            return {"tasks": artifacts.remember("implementation_todo", project_id, cached_tasks)}
+        # --- END CACHE CHECK ---
+
+        project_roster = await repository.project_roster(project_id)
+        team_id, deadline = artifacts.scheduling_from_roster(project_id, project_roster)
+        tasks = await admission.run(
+            "implementation_todo", artifacts.build_implementation_todo, project_id,
+            stale=lambda: artifacts.last_built("implementation_todo", project_id),
+            roster=project_roster,
+            team_id=team_id,
+            deadline=deadline
+        )
+        return {"tasks": tasks}
+
+    except CircuitOpen as e:
+        return {"tasks": artifacts.stale_or_raise("implementation_todo", project_id, e)}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -9,131 +9,170 @@ Original file is located at
 
 
 
-from typing import TypedDict, List
+from collections import OrderedDict
+from typing import Dict, List, Tuple
 import json
 import os
+import threading
 
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
-from langgraph.graph import StateGraph, END
+from core import metrics, prompts
+from core.llm import invoke as invoke_llm
+from core.skills import taxonomy
 
 from dotenv import load_dotenv, find_dotenv
 
 _ = load_dotenv(find_dotenv())
-api_key = os.getenv("GOOGLE_API_KEY")
-llm = ChatGoogleGenerativeAI(
-    model="gemini-3-pro-preview",
-    temperature=0,
-    google_api_key=api_key
-)
 
-class SearchState(TypedDict):
-    query: str
-    raw_keywords: List[str]
-    normalized_keywords: List[str]
+SKILL_RULES = (
+    "You are a technical skill extraction and expansion engine.\n"
+    "Your task:\n"
+    "1. Extract all explicit technical skills, tools, programming languages, frameworks, and developer roles.\n"
+    "2. Infer closely related technologies that are commonly required together.\n"
+    "3. Do NOT add unrelated or speculative skills.\n"
+    "4. Normalize synonyms (e.g., 'web dev' → 'web development').\n"
+    "5. Prefer industry-standard terminology.\n\n"
 
+    "Expansion rules:\n"
 
-skill_prompt = ChatPromptTemplate.from_messages([
-    ("system",
-     "You are a technical skill extraction and expansion engine.\n"
-     "Your task:\n"
-     "1. Extract all explicit technical skills, tools, programming languages, frameworks, and developer roles.\n"
-     "2. Infer closely related technologies that are commonly required together.\n"
-     "3. Do NOT add unrelated or speculative skills.\n"
-     "4. Normalize synonyms (e.g., 'web dev' → 'web development').\n"
-     "5. Prefer industry-standard terminology.\n\n"
+    "- If 'web development' is present, include:\n"
+    "  'html', 'css', 'javascript', 'frontend development', 'backend development'.\n"
 
-     "Expansion rules:\n"
+    "- If 'frontend development' is present, include:\n"
+    "  'react', 'ui development'.\n"
 
-     "- If 'web development' is present, include:\n"
-     "  'html', 'css', 'javascript', 'frontend development', 'backend development'.\n"
+    "- If 'backend development' is present, include:\n"
+    "  'api development', 'node.js', 'databases'.\n"
 
-     "- If 'frontend development' is present, include:\n"
-     "  'react', 'ui development'.\n"
+    "- If 'machine learning' is present, include:\n"
+    "  'python', 'data preprocessing', 'model training', 'model evaluation',\n"
+    "  'supervised learning', 'unsupervised learning'.\n"
 
-     "- If 'backend development' is present, include:\n"
-     "  'api development', 'node.js', 'databases'.\n"
+    "- If 'deep learning' is present, include:\n"
+    "  'neural networks', 'tensorflow', 'pytorch'.\n"
 
-     "- If 'machine learning' is present, include:\n"
-     "  'python', 'data preprocessing', 'model training', 'model evaluation',\n"
-     "  'supervised learning', 'unsupervised learning'.\n"
+    "- If 'data science' is present, include:\n"
+    "  'python', 'statistics', 'data analysis', 'pandas', 'numpy'.\n"
 
-     "- If 'deep learning' is present, include:\n"
-     "  'neural networks', 'tensorflow', 'pytorch'.\n"
+    "- If 'cyber security' is present, include:\n"
+    "  'network security', 'cryptography', 'vulnerability assessment',\n"
+    "  'penetration testing', 'security fundamentals'.\n"
 
-     "- If 'data science' is present, include:\n"
-     "  'python', 'statistics', 'data analysis', 'pandas', 'numpy'.\n"
+    "- If a programming language is present (e.g., 'python', 'java', 'c++'),\n"
+    "  do NOT infer unrelated frameworks or domains.\n"
 
-     "- If 'cyber security' is present, include:\n"
-     "  'network security', 'cryptography', 'vulnerability assessment',\n"
-     "  'penetration testing', 'security fundamentals'.\n"
+    "- Do NOT infer cloud platforms, devops, or AI unless explicitly mentioned.\n\n"
+)
 
-     "- If a programming language is present (e.g., 'python', 'java', 'c++'),\n"
-     "  do NOT infer unrelated frameworks or domains.\n"
 
-     "- Do NOT infer cloud platforms, devops, or AI unless explicitly mentioned.\n\n"
+import re
 
-     "Output rules:\n"
-     "- Return ONLY a valid JSON array.\n"
-     "- All values must be lowercase strings.\n"
-     "- No explanations, no markdown, no comments.\n"
-     "- Output must be pure JSON."
+# Unknown-term lookups kept across calls; keyed on the lowercased span
+UNKNOWN_TERMS_CACHE_SIZE = int(os.getenv("UNKNOWN_TERMS_CACHE_SIZE", "2048"))
+# Unknown spans sent to the LLM per batched call
+KEYWORD_BATCH_SIZE = int(os.getenv("KEYWORD_BATCH_SIZE", "100"))
+
+BATCH_SKILL_PROMPT = prompts.SplitPrompt(
+    system=SKILL_RULES + (
+        "Input: a JSON object mapping ids to independent search terms.\n"
+        "Apply the task and expansion rules to each term on its own.\n\n"
+        "Output rules:\n"
+        "- Return ONLY a valid JSON object with the same ids as keys.\n"
+        "- Each value is a JSON array of lowercase skill strings (empty if the term has no skill).\n"
+        "- No explanations, no markdown, no comments.\n"
+        "- Output must be pure JSON."
     ),
-    ("human", "{query}")
-])
+    template="{terms}"
+)
 
-def safe_json_parse(text: str):
-    """
-    Extracts JSON array safely from Gemini output
-    """
-    match = re.search(r"\[.*\]", text, re.DOTALL)
-    if not match:
-        raise ValueError(f"No JSON array found in response: {text}")
-    return json.loads(match.group())
-
-def extract_skills_node(state: SearchState):
-    response = llm.invoke(
-        skill_prompt.format_messages(query=state["query"])
-    )
+_unknown_terms: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
+_unknown_terms_lock = threading.Lock()
 
-    raw_keywords = safe_json_parse(response.content)
 
-    return {
-        "raw_keywords": raw_keywords
-    }
+def _cached_terms(spans: List[str]) -> Dict[str, Tuple[str, ...]]:
+    with _unknown_terms_lock:
+        found = {}
+        for span in spans:
+            if span in _unknown_terms:
+                _unknown_terms.move_to_end(span)
+                found[span] = _unknown_terms[span]
+        return found
 
-def normalize_keywords_node(state: SearchState):
-    normalized = []
 
-    for kw in state["raw_keywords"]:
-        kw_lower = kw.lower()
-        normalized.append(SYNONYM_MAP.get(kw_lower, kw_lower))
+def _remember_terms(resolved: Dict[str, Tuple[str, ...]]):
+    with _unknown_terms_lock:
+        _unknown_terms.update(resolved)
+        while len(_unknown_terms) > UNKNOWN_TERMS_CACHE_SIZE:
+            _unknown_terms.popitem(last=False)
 
-    return {
-        "normalized_keywords": list(set(normalized))
-    }
 
-graph = StateGraph(SearchState)
+def _extract_unknown_batch(spans: List[str]) -> Dict[str, Tuple[str, ...]]:
+    """One LLM call resolving several unknown spans; spans missing from the reply are left out."""
+    metrics.incr("keywords.llm_calls")
+    metrics.incr("keywords.batched_terms", "", len(spans))
 
-graph.add_node("extract_skills", extract_skills_node)
-graph.add_node("normalize_keywords", normalize_keywords_node)
+    response = invoke_llm(
+        BATCH_SKILL_PROMPT.format(terms=prompts.compact_json({str(n): span for n, span in enumerate(spans)})),
+        node="extract_skills"
+    )
 
-graph.set_entry_point("extract_skills")
-graph.add_edge("extract_skills", "normalize_keywords")
-graph.add_edge("normalize_keywords", END)
+    match = re.search(r"\{.*\}", response.content, re.DOTALL)
+    try:
+        reply = json.loads(match.group()) if match else {}
+    except json.JSONDecodeError:
+        reply = {}
+    if not isinstance(reply, dict):
+        reply = {}
+
+    resolved = {}
+    for n, span in enumerate(spans):
+        skills = reply.get(str(n))
+        if isinstance(skills, list):
+            resolved[span] = tuple(taxonomy.expand(str(skill) for skill in skills))
+    if len(resolved) < len(spans):
+        print(f"[WARN] Keyword batch: no usable result for {len(spans) - len(resolved)} of {len(spans)} terms")
+    return resolved
+
+
+def get_normalized_keywords_batch(queries: List[str]) -> List[List[str]]:
+    """
+    Normalizes many queries at once; result i belongs to queries[i].
 
-search_graph = graph.compile()
+    Duplicate queries are parsed once, known skills and previously seen
+    unknown terms are resolved locally, and the remaining unknown terms of
+    all queries are sent together, KEYWORD_BATCH_SIZE per LLM call.
+    """
+    parsed: Dict[str, Tuple[List[str], List[str]]] = {}
+    for query in queries:
+        key = " ".join(query.lower().split())
+        if key not in parsed:
+            parsed[key] = taxonomy.parse(key)
 
-import re
+    spans = list(dict.fromkeys(span for _, unknown in parsed.values() for span in unknown))
+    resolved = _cached_terms(spans)
+    pending = [span for span in spans if span not in resolved]
+
+    for start in range(0, len(pending), KEYWORD_BATCH_SIZE):
+        chunk = _extract_unknown_batch(pending[start:start + KEYWORD_BATCH_SIZE])
+        _remember_terms(chunk)
+        resolved.update(chunk)
+
+    results = {}
+    for key, (known, unknown) in parsed.items():
+        if not unknown:
+            metrics.incr("keywords.resolved_locally")
+        skills = list(known)
+        for span in unknown:
+            skills += resolved.get(span, ())
+        results[key] = taxonomy.expand(skills)
+
+    return [list(results[" ".join(query.lower().split())]) for query in queries]
 
-SYNONYM_MAP = {
-    "web dev": "web development",
-    "ml": "machine learning"
-}
 
 def get_normalized_keywords(query: str) -> list[str]:
     """
     Extracts and normalizes technical keywords from a given query string.
+    Known skills are resolved and expanded locally (core.skills); only the
+    words the taxonomy does not recognise are sent to the LLM.
 
     Args:
         query: The input string containing technical skills or roles.
@@ -141,10 +180,7 @@ def get_normalized_keywords(query: str) -> list[str]:
     Returns:
         A list of normalized technical keywords.
     """
-    result = search_graph.invoke({
-        "query": query
-    })
-    return result["normalized_keywords"]
+    return get_normalized_keywords_batch([query])[0]
 
 # Example usage:
 # query_string = "I need someone with specialisation in machine learning, c++, java, web dev"
@@ -17,7 +17,8 @@ from typing import TypedDict
 from langchain_core.messages import HumanMessage
 
 
-from langchain_google_genai import ChatGoogleGenerativeAI
+from core.llm import hedging, invoke as invoke_llm
+from core import deadline, prompts
 
 from typing import TypedDict, Optional
 from langgraph.graph import StateGraph, END
@@ -27,12 +28,6 @@ import os
 from dotenv import load_dotenv, find_dotenv
 
 _ = load_dotenv(find_dotenv())
-api_key = os.getenv("GOOGLE_API_KEY")
-llm = ChatGoogleGenerativeAI(
-    model="gemini-3-pro-preview",
-    temperature=0,
-    google_api_key=api_key
-)
 
 class QAPair(TypedDict):
     question: str
@@ -75,19 +70,12 @@ Level 5 – Risks, Constraints, and Edge Cases
 """
 
 
-PRD_GENERATION_PROMPT = """
+PRD_GENERATION_PROMPT = prompts.SplitPrompt(
+    system="""
 You are a Principal Product Manager with a strong systems architecture and AI background.
 
-Generate a highly detailed, technically rigorous Product Requirement Document (PRD) using:
-
-Problem Statement:
-{ps}
-
-Questions_answer_pair:
-{qa_pairs}
-
-Pitch (Architecture + Technical + Vision):
-{pitch}
+Generate a highly detailed, technically rigorous Product Requirement Document (PRD) from the
+Problem Statement, Questions_answer_pair and Pitch given in the user message.
 
 Instructions:
 - This is a TECHNICAL PRD intended for architects, AI engineers, and senior stakeholders.
@@ -165,19 +153,29 @@ PRD Structure:
     - Research risks
     - Scalability risks
     - Data risks
+""",
+    template="""
+Problem Statement:
+{ps}
+
+Questions_answer_pair:
+{qa_pairs}
+
+Pitch (Architecture + Technical + Vision):
+{pitch}
 """
+)
 
 
-PRD_EVALUATION_PROMPT = """
+PRD_EVALUATION_PROMPT = prompts.SplitPrompt(
+    system="""
 You are a Technical Product Review Board consisting of:
 - Principal Product Manager
 - Senior System Architect
 - AI Research Lead
 - Infrastructure Engineer
 
-Evaluate the following PRD:
-
-{prd}
+Evaluate the PRD given in the user message.
 
 Evaluate on:
 1. Technical depth and specificity
@@ -195,18 +193,21 @@ Output:
 - Missing Technical Sections
 - High-Risk Technical Assumptions
 - Concrete Recommendations
+""",
+    template="""
+Evaluate the following PRD:
+
+{prd}
 """
+)
 
 
 
-PRD_IMPROVEMENT_PROMPT = """
+PRD_IMPROVEMENT_PROMPT = prompts.SplitPrompt(
+    system="""
 You are a senior technical product consultant and systems architect.
 
-Original PRD:
-{prd}
-
-Evaluation Report:
-{evaluation}
+You are given an Original PRD and its Evaluation Report in the user message.
 
 TASK:
 Rewrite and significantly EXPAND the PRD to be highly detailed, technically rigorous, and architecturally precise.
@@ -307,51 +308,72 @@ STRUCTURE (MANDATORY):
 IMPORTANT:
 - Write with depth, precision, and clarity
 - This should read like a real, serious technical PRD
+""",
+    template="""
+Original PRD:
+{prd}
+
+Evaluation Report:
+{evaluation}
 """
+)
 
 
 
 def generate_questions(state: PRDState):
-    prompt = QUESTION_GENERATION_PROMPT.format(
+    prompt = prompts.build(
+        QUESTION_GENERATION_PROMPT, "generate_questions",
         ps=state["problem_statement"],
         pitch=state["pitch"]
     )
-    response = llm.invoke(prompt)
+    response = invoke_llm(prompt, node="generate_questions")
     return {"questions": response.content}
 
 
 def generate_prd(state: PRDState):
 
-    qa_formatted = ""
-    for pair in state.get("qa_pairs", []):
-        qa_formatted += f"Q: {pair['question']}\nA: {pair['answer']}\n\n"
+    qa_pairs = [
+        f"Q: {pair['question']}\nA: {pair['answer']}"
+        for pair in state.get("qa_pairs", [])
+    ]
 
-    prompt = PRD_GENERATION_PROMPT.format(
+    prompt = prompts.build(
+        PRD_GENERATION_PROMPT, "generate_prd",
         ps=state["problem_statement"],
-        qa_pairs=qa_formatted,
+        qa_pairs=qa_pairs,
         pitch=state["pitch"]
     )
 
-    response = llm.invoke(prompt)
+    response = invoke_llm(prompt, node="generate_prd")
     return {"prd": response.content}
 
 
 def evaluate_prd(state: PRDState):
-    prompt = PRD_EVALUATION_PROMPT.format(
+    # Review + rewrite are optional: skip them when the budget is short
+    if deadline.should_skip("evaluate_prd"):
+        return {"evaluation": None}
+
+    prompt = prompts.build(
+        PRD_EVALUATION_PROMPT, "evaluate_prd",
         prd=state["prd"]
     )
 
-    response = llm.invoke(prompt)
+    response = invoke_llm(prompt, node="evaluate_prd")
     return {"evaluation": response.content}
 
 
 def improve_prd(state: PRDState):
-    prompt = PRD_IMPROVEMENT_PROMPT.format(
+    # Without an evaluation (or time to use it) the draft PRD is the result
+    if not state.get("evaluation") or deadline.should_skip("improve_prd"):
+        return {"refined_prd": state["prd"]}
+
+    prompt = prompts.build(
+        PRD_IMPROVEMENT_PROMPT, "improve_prd",
         prd=state["prd"],
         evaluation=state["evaluation"]
     )
 
-    response = llm.invoke(prompt)
+    response = invoke_llm(prompt, node="improve_prd")
     return {"refined_prd": response.content}
 
 
@@ -435,23 +457,27 @@ def run_prd_agent(problem: str, pitch: str, qa_data: List[Dict[str, str]]):
         qa_data: A list of dicts: [{"question": "...", "answer": "..."}]
     Returns:
         The final refined PRD markdown.
+    Raises:
+        Any error from the graph (including deadline.DeadlineExceeded and
+        breaker.CircuitOpen), so that no error text is ever saved as a PRD.
     """
-    try:
-        # Construct the initial state
-        initial_state = {
-            "problem_statement": problem,
-            "pitch": pitch,
-            "qa_pairs": qa_data
-        }
-
-        # Invoke the compiled graph
+    # Construct the initial state
+    initial_state = {
+        "problem_statement": problem,
+        "pitch": pitch,
+        "qa_pairs": qa_data
+    }
+
+    # Invoke the compiled graph
+    with deadline.plan(["generate_prd", "evaluate_prd", "improve_prd"]), hedging():
         result = graph.invoke(initial_state)
 
-        # Return the final output key
-        return result.get("refined_prd", "Error: PRD generation failed.")
+    prd_text = result.get("refined_prd")
+    if not prd_text:
+        raise RuntimeError("PRD generation returned no document")
 
-    except Exception as e:
-        return f"System Error: {str(e)}"
+    # Return the final output key
+    return prd_text
 
 # Example Backend Usage:
 #
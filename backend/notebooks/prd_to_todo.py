@@ -12,7 +12,8 @@ Original file is located at
 from typing import TypedDict, List,Dict
 from langgraph.graph import StateGraph, END
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
+from core.llm import hedging, invoke as invoke_llm
+from core import deadline, prompts
 import re
 import json
 
@@ -20,10 +21,6 @@ import os
 from dotenv import load_dotenv, find_dotenv
 
 _ = load_dotenv(find_dotenv())
-llm = ChatGoogleGenerativeAI(
-    model="gemini-3-pro-preview",
-    temperature=0
-)
 
 class Role(TypedDict):
     title: str
@@ -77,7 +74,8 @@ PRD:
 Return in structured bullet points with clear headings.
 """)
 
-TASK_BREAKDOWN_PROMPT = ChatPromptTemplate.from_template("""
+TASK_BREAKDOWN_PROMPT = prompts.SplitPrompt(
+    system="""
 You are a Principal Engineer responsible for converting a PRD into
 ENGINEERING WORK PACKAGES (not feature checklists).
 
@@ -119,14 +117,18 @@ CATEGORIES TO USE:
 9. Deployment & Platform Readiness
 10. Documentation & Knowledge Transfer
 
-Extracted Requirements:
-{extracted_requirements}
+The Extracted Requirements are given in the user message.
 
 Return a structured TODO list.
 Each TODO must clearly state:
 - What system capability is being delivered
 - Which requirement cluster it satisfies
-""")
+""",
+    template="""
+Extracted Requirements:
+{extracted_requirements}
+"""
+)
 
 
 VERIFY_COMPLETENESS_PROMPT = ChatPromptTemplate.from_template("""
@@ -160,29 +162,39 @@ Return the FINAL, CLEAN, HIGH-LEVEL TODO list.
 # -----------------------------
 
 def extract_requirements(state: PRDState):
-    response = llm.invoke(
-        EXTRACT_REQUIREMENTS_PROMPT.format(
+    response = invoke_llm(
+        prompts.build(
+            EXTRACT_REQUIREMENTS_PROMPT, "extract_requirements",
             prd_text=state["prd_text"]
-        )
+        ),
+        node="extract_requirements"
     )
     return {"extracted_requirements": response.content}
 
 
 def generate_tasks(state: PRDState):
-    response = llm.invoke(
-        TASK_BREAKDOWN_PROMPT.format(
+    response = invoke_llm(
+        prompts.build(
+            TASK_BREAKDOWN_PROMPT, "generate_tasks",
             extracted_requirements=state["extracted_requirements"]
-        )
+        ),
+        node="generate_tasks"
     )
     return {"task_breakdown": response.content}
 
 
 def verify_tasks(state: PRDState):
-    response = llm.invoke(
-        VERIFY_COMPLETENESS_PROMPT.format(
+    # Optional clean-up pass: use the raw breakdown when the budget is short
+    if deadline.should_skip("verify_tasks"):
+        return {"verified_tasks": state["task_breakdown"]}
+
+    response = invoke_llm(
+        prompts.build(
+            VERIFY_COMPLETENESS_PROMPT, "verify_tasks",
             extracted_requirements=state["extracted_requirements"],
             task_breakdown=state["task_breakdown"]
-        )
+        ),
+        node="verify_tasks"
     )
     return {"verified_tasks": response.content}
 
@@ -247,11 +259,13 @@ Team Members (JSON):
 
 def assign_tasks(state: PRDState):
 
-    response = llm.invoke(
-        ASSIGN_TASKS_PROMPT.format(
+    response = invoke_llm(
+        prompts.build(
+            ASSIGN_TASKS_PROMPT, "assign_tasks",
             verified_tasks=state["verified_tasks"],
-            team_members=json.dumps(state["team_members"], indent=2)
-        )
+            team_members=state["team_members"]
+        ),
+        node="assign_tasks"
     )
 
     return {"assigned_tasks": response.content}
@@ -459,14 +473,15 @@ team_members = team = [
 
 def final_call_todo(prd_text, team_members):
 
-    result = prd_to_todo_graph.invoke({
-    "prd_text": prd_text,
-    "team_members": team_members,
-    "extracted_requirements": "",
-    "task_breakdown": "",
-    "verified_tasks": "",
-    "assigned_tasks": ""
-    })
+    with deadline.plan(["extract_requirements", "generate_tasks", "verify_tasks", "assign_tasks"]), hedging():
+        result = prd_to_todo_graph.invoke({
+            "prd_text": prd_text,
+            "team_members": team_members,
+            "extracted_requirements": "",
+            "task_breakdown": "",
+            "verified_tasks": "",
+            "assigned_tasks": ""
+        })
 
     raw_text = result['assigned_tasks']
     return markdown_to_json(result["assigned_tasks"])
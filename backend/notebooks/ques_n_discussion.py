@@ -15,7 +15,8 @@ import re
 import os
 
 from typing import TypedDict, List, Dict
-from langchain_google_genai import ChatGoogleGenerativeAI
+from core.llm import invoke as invoke_llm
+from core import deadline
 from langchain_core.prompts import ChatPromptTemplate
 from langgraph.graph import StateGraph, END
 
@@ -24,12 +25,6 @@ from dotenv import load_dotenv, find_dotenv
 
 # Make sure this is set in environment
 _ = load_dotenv(find_dotenv())
-api_key = os.getenv("GOOGLE_API_KEY")
-llm = ChatGoogleGenerativeAI(
-    model="gemini-3-pro-preview",
-    temperature=0,
-    google_api_key=api_key
-)
 
 def safe_json_parse(text: str):
     # Try object first
@@ -78,8 +73,9 @@ Team & Teammate Context:
         )
     ])
 
-    response = llm.invoke(
-        prompt.format_messages(ps=problem_statement, team=team_context)
+    response = invoke_llm(
+        prompt.format_messages(ps=problem_statement, team=team_context),
+        node="basic_ideation_questions"
     )
     return response.content
 
@@ -132,8 +128,9 @@ Team & Teammate Context:
         )
     ])
 
-    response = llm.invoke(
-        prompt.format_messages(ps=problem_statement, team=document)
+    response = invoke_llm(
+        prompt.format_messages(ps=problem_statement, team=document),
+        node="architecture_questions"
     )
     return response.content
 
@@ -186,8 +183,9 @@ Team & Teammate Context:
         )
     ])
 
-    response = llm.invoke(
-        prompt.format_messages(ps=problem_statement, team=document)
+    response = invoke_llm(
+        prompt.format_messages(ps=problem_statement, team=document),
+        node="final_ps_questions"
     )
     return response.content
 
@@ -203,23 +201,24 @@ import json
 def generate_combined_questions(problem_statement: str, team_context: str):
     all_questions = []
 
-    # Generate basic ideation questions
-    basic_ideation_raw = generate_basic_ideation_questions(problem_statement, team_context)
-    basic_ideation_dict = safe_json_parse(basic_ideation_raw)
-    for q in basic_ideation_dict.get("basic_ideation_questions", []):
-        all_questions.append({"answer": "", "question": q})
-
-    # Generate architecture questions
-    architecture_raw = generate_architecture_questions(problem_statement, team_context)
-    architecture_dict = safe_json_parse(architecture_raw)
-    for q in architecture_dict.get("architecture_questions", []):
-        all_questions.append({"answer": "", "question": q})
-
-    # Generate final PS questions
-    final_ps_raw = generate_final_ps_questions(problem_statement, team_context)
-    final_ps_dict = safe_json_parse(final_ps_raw)
-    for q in final_ps_dict.get("final_ps_questions", []):
-        all_questions.append({"answer": "", "question": q})
+    with deadline.plan(["basic_ideation_questions", "architecture_questions", "final_ps_questions"]):
+        # Generate basic ideation questions
+        basic_ideation_raw = generate_basic_ideation_questions(problem_statement, team_context)
+        basic_ideation_dict = safe_json_parse(basic_ideation_raw)
+        for q in basic_ideation_dict.get("basic_ideation_questions", []):
+            all_questions.append({"answer": "", "question": q})
+
+        # Generate architecture questions
+        architecture_raw = generate_architecture_questions(problem_statement, team_context)
+        architecture_dict = safe_json_parse(architecture_raw)
+        for q in architecture_dict.get("architecture_questions", []):
+            all_questions.append({"answer": "", "question": q})
+
+        # Generate final PS questions
+        final_ps_raw = generate_final_ps_questions(problem_statement, team_context)
+        final_ps_dict = safe_json_parse(final_ps_raw)
+        for q in final_ps_dict.get("final_ps_questions", []):
+            all_questions.append({"answer": "", "question": q})
 
     return all_questions
 
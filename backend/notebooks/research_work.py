@@ -8,28 +8,21 @@ Original file is located at
 """
 
 
-import time
 from typing import TypedDict, List,Dict
 from langgraph.graph import StateGraph, END
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
+from core.llm import hedging, invoke as invoke_llm
+from core import deadline, prompts
 from dotenv import load_dotenv, find_dotenv
 
 import os
 _ = load_dotenv(find_dotenv())
-api_key = os.getenv("GOOGLE_API_KEY")
-llm = ChatGoogleGenerativeAI(
-    model="gemini-3-pro-preview",
-    temperature=0,
-    google_api_key=api_key
-)
 
 from typing import List, Dict, TypedDict
 import json
 import re
 
 from langgraph.graph import StateGraph, END
-from langchain_google_genai import ChatGoogleGenerativeAI
 
 class Role(TypedDict):
     title: str
@@ -52,18 +45,6 @@ class ProjectState(TypedDict):
     refined_topics: List[str]
     assignments: List[ResearchAssignment]
 
-def safe_llm_invoke(prompt, retries=3, wait=25):
-    for attempt in range(retries):
-        try:
-            return llm.invoke(prompt)
-        except Exception as e:
-            if "RESOURCE_EXHAUSTED" in str(e):
-                print(f"[WARN] Quota hit. Retrying in {wait}s...")
-                time.sleep(wait)
-            else:
-                raise e
-    raise RuntimeError("LLM quota exhausted")
-
 def extract_json(text: str):
     match = re.search(r"\[.*\]", text, re.DOTALL)
     if not match:
@@ -83,7 +64,7 @@ Generate exactly {num_topics} distinct research topics.
 
 Return ONLY a bullet list of {num_topics} topics.
 """
-    response = llm.invoke(prompt)
+    response = invoke_llm(prompt, node="generate_topics")
     topics = [
         line.strip("- ").strip()
         for line in response.content.split("\n")
@@ -94,6 +75,11 @@ Return ONLY a bullet list of {num_topics} topics.
     return state
 
 def refine_topics(state: ProjectState) -> ProjectState:
+    # Optional polish step: keep the raw topics when the budget is short
+    if deadline.should_skip("refine_topics"):
+        state["refined_topics"] = state["raw_topics"]
+        return state
+
     prompt = f"""
 Refine these research topics to be actionable in 2–4 hours:
 
@@ -102,7 +88,7 @@ Refine these research topics to be actionable in 2–4 hours:
 Return ONLY a bullet list.
 """
 
-    response = llm.invoke(prompt)
+    response = invoke_llm(prompt, node="refine_topics")
 
     refined = [
         line.strip("- ").strip()
@@ -113,30 +99,40 @@ Return ONLY a bullet list.
     state["refined_topics"] = refined
     return state
 
-def assign_topics_with_llm(state: ProjectState) -> ProjectState:
-    # Calculate team size to ensure 1:1 mapping
-    num_members = len(state["team"])
-
-    prompt = f"""
+ASSIGN_TOPICS_PROMPT = prompts.SplitPrompt(
+    system="""
 You are a senior technical lead.
 
-We have a team of {num_members} people. You MUST assign exactly ONE research topic to EACH team member.
+You MUST assign exactly ONE research topic to EACH team member.
 
 Rules:
 1. Every single person in the team list must have an assignment.
 2. Use their 'role' weights and 'skills' list to give them the MOST relevant topic for their expertise.
 3. If a topic doesn't perfectly match a role, assign it to the person whose general skills are the best fit.
 4. Output ONLY a JSON array of objects with keys: "topic", "assigned_to", and "justification".
+""",
+    template="""
+We have a team of {num_members} people.
 
 Team:
-{state["team"]}
+{team}
 
 Topics:
-{state["refined_topics"]}
+{topics}
 
 Return JSON ONLY.
 """
-    response = llm.invoke(prompt)
+)
+
+def assign_topics_with_llm(state: ProjectState) -> ProjectState:
+    prompt = prompts.build(
+        ASSIGN_TOPICS_PROMPT, "assign_topics",
+        # Team size, so the model makes a 1:1 mapping
+        num_members=str(len(state["team"])),
+        team=state["team"],
+        topics=state["refined_topics"]
+    )
+    response = invoke_llm(prompt, node="assign_topics")
     state["assignments"] = extract_json(response.content)
     return state
 
@@ -193,10 +189,11 @@ def final_call(team_members,ps):
     "assignments": []
   }
 
-    result = app.invoke(initial_state)
+    with deadline.plan(["generate_topics", "refine_topics", "assign_topics"]), hedging():
+        result = app.invoke(initial_state)
     return result
 
 # result = final_call(team,ps)
 
 # for a in result["assignments"]:
-#     print(a)
\ No newline at end of file
+#     print(a)
@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel, EmailStr
 import hashlib
 from core.database import supabase
+from core.breaker import CircuitOpen
 
 router = APIRouter()
 
@@ -46,6 +47,9 @@ def signup(payload: SignupRequest):
             "user_id": user_id
         }
 
+    except CircuitOpen:
+        raise
+
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
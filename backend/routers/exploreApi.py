@@ -1,7 +1,24 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional
-import math
+from fastapi import APIRouter, Header, HTTPException, Query
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Union
+from datetime import datetime
+import base64
+import binascii
+import json
+import os
+
+from uuid import UUID
+from dotenv import load_dotenv
+from core.breaker import CircuitOpen
+from core.catalog import Catalog, source_from_env
+from core.hackathon_index import RELEVANCE, SORT_COLUMNS, range_bound, tokenize
+from core.profile_index import profile_index
+from core.recommendations import HackathonRecommender
+from core.response_cache import ResponseCache
+
+load_dotenv()
+
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "1024"))
 
 router = APIRouter(prefix="/exploreApi", tags=["exploreApi"])
 
@@ -11,13 +28,20 @@ class SearchFilters(BaseModel):
     query: str
     filters: str  # Comma-separated string as requested
 
+class RangeFilter(BaseModel):
+    # Inclusive bounds; deadline takes "2026-02-15" or "Feb 15, 2026", prize takes 10000 or "$10k"
+    min: Optional[Union[float, str]] = None
+    max: Optional[Union[float, str]] = None
+
 class SearchRequest(BaseModel):
     query: str
     filters: Optional[str] = ""
-    page: int = 1
-    limit: int = 10
+    limit: int = Field(10, ge=1, le=100)
+    sort: str = RELEVANCE  # or deadline / daysLeft / participants / prize, "-" prefix for descending
+    ranges: Optional[Dict[str, RangeFilter]] = None
+    cursor: Optional[str] = None  # pagination.nextCursor of the previous page
 
-# Mock Data (Matches the structure in Explore.tsx)
+# Mock Data (Matches the structure in Explore.tsx); served unless CATALOG_SOURCE is set
 HACKATHONS = [
     {
         "id": 1,
@@ -48,51 +72,120 @@ HACKATHONS = [
     # ... more hackathon objects
 ]
 
+catalog = Catalog(source_from_env(HACKATHONS))
+recommender = HackathonRecommender(catalog, profile_index)
+search_cache = ResponseCache("search", SEARCH_CACHE_SIZE)
+catalog.subscribe(search_cache.clear)
+
+def warm_up():
+    """
+    Load the catalog and the profile index ahead of the first request. Both
+    read their whole table through the sync client in pages, so this runs on
+    a thread started by the app's lifespan; a failure only leaves the load
+    to the first request that needs it.
+    """
+    for name, load in (("catalog", catalog.load), ("profile index", profile_index.ensure_loaded)):
+        try:
+            load()
+        except Exception as e:
+            print(f"[WARN] Could not preload the {name}, it loads on first use: {e}")
+
+def find_hackathon_deadline(name: Optional[str]) -> Optional[datetime]:
+    """Deadline of the hackathon with the given name, if it is in the catalog."""
+    if not name:
+        return None
+    h = catalog.current().find(name)
+    if h is None:
+        return None
+    try:
+        return datetime.strptime(h["deadline"], "%b %d, %Y")
+    except ValueError:
+        return None
+
+def encode_cursor(sort: str, keyset) -> str:
+    value, doc = keyset
+    raw = json.dumps({"sort": sort, "value": value, "doc": doc}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(sort: str, cursor: str):
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if raw["sort"] != sort:
+            raise ValueError("cursor belongs to another sort order")
+        value = raw["value"]
+        return (float(value) if value is not None else None), int(raw["doc"])
+    except (ValueError, KeyError, TypeError, binascii.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
 @router.post("/api/hackathons/search")
-async def search_hackathons(request: SearchRequest):
-    filtered_data = HACKATHONS
-    
-    # 1. Logic for Keyword Search
-    if request.query:
-        query_lower = request.query.lower()
-        filtered_data = [
-            h for h in filtered_data 
-            if query_lower in h["name"].lower() or query_lower in h["description"].lower()
-        ]
+async def search_hackathons(request: SearchRequest, if_none_match: Optional[str] = Header(None)):
+    filter_list = [f.strip() for f in (request.filters or "").split(",") if f.strip()]
 
-    # 2. Logic for Filters (Comma separated list)
-    if request.filters:
-        filter_list = [f.strip().lower() for f in request.filters.split(",") if f.strip()]
-        if filter_list:
-            final_filtered = []
-            for h in filtered_data:
-                # Check if any filter matches platform, mode, or tags
-                match_platform = h["platform"].lower() in filter_list
-                match_mode = h["mode"].lower() in filter_list
-                match_tags = any(tag.lower() in filter_list for tag in h["tags"])
-                
-                if match_platform or match_mode or match_tags:
-                    final_filtered.append(h)
-            filtered_data = final_filtered
-
-    # 3. Pagination Logic
-    total_count = len(filtered_data)
-    start_idx = (request.page - 1) * request.limit
-    end_idx = start_idx + request.limit
-    paginated_data = filtered_data[start_idx:end_idx]
-    
-    total_pages = math.ceil(total_count / request.limit)
+    if request.sort.lstrip("-") not in (RELEVANCE, *SORT_COLUMNS):
+        raise HTTPException(status_code=400, detail=f"Unknown sort: {request.sort}")
+    unknown = set(request.ranges or {}) - set(SORT_COLUMNS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown range fields: {', '.join(sorted(unknown))}")
+    ranges = {column: (r.min, r.max) for column, r in (request.ranges or {}).items()}
+    for column, bounds in ranges.items():
+        try:
+            for bound in bounds:
+                range_bound(column, bound)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid range: {e}")
+    after = decode_cursor(request.sort, request.cursor) if request.cursor else None
 
-    return {
-        "data": paginated_data,
-        "pagination": {
-            "total": total_count,
-            "page": request.page,
-            "limit": request.limit,
-            "totalPages": total_pages,
-            "hasMore": request.page < total_pages
+    # Requests that search the same way share a cache entry: case, spacing and
+    # filter order do not matter, a trailing space does (it ends prefix matching)
+    tokens = tokenize(request.query)
+    key = (
+        tuple(tokens),
+        bool(tokens) and request.query[-1:].isspace(),
+        tuple(sorted({f.lower() for f in filter_list})),
+        tuple(sorted(ranges.items())),
+        request.limit,
+        request.sort,
+        after,
+    )
+    # Version read first: a reload in between files newer results under the old version, never the reverse
+    version = catalog.version
+    index = catalog.current()
+
+    def compute():
+        # 1 & 2. Keyword search, range filters and facet filters (OR within platform/mode/tags, AND across)
+        matches, facets = index.search(request.query, filter_list, ranges)
+
+        # 3. Ordering and keyset pagination
+        docs, last = index.page(request.query, matches, request.limit, request.sort, after)
+
+        return {
+            "data": [index.docs[doc] for doc in docs],
+            "pagination": {
+                "total": matches.bit_count(),
+                "limit": request.limit,
+                "hasMore": last is not None,
+                "nextCursor": encode_cursor(request.sort, last) if last is not None else None
+            },
+            "facets": facets
         }
-    }
 
+    return search_cache.respond(version, key, if_none_match, compute)
 
+@router.get("/api/hackathons/recommended/{user_id}")
+def recommended_hackathons(user_id: UUID, limit: int = Query(10, ge=1, le=50)):
+    try:
+        found = recommender.recommend(str(user_id))
+    except CircuitOpen:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if found is None:
+        raise HTTPException(status_code=404, detail="User profile not found")
 
+    index, picks = found
+    return {
+        "data": [
+            {**index.docs[doc], "score": round(score, 4)}
+            for doc, score in picks[:limit]
+        ]
+    }
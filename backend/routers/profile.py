@@ -4,6 +4,8 @@ from typing import Optional, List, Dict
 from uuid import UUID
 
 from core.database import supabase
+from core.breaker import CircuitOpen
+from core.profile_index import profile_index
 
 router = APIRouter()
 
@@ -30,7 +32,7 @@ class UserProfileCreate(BaseModel):
 @router.post("/", status_code=status.HTTP_201_CREATED)
 def create_user_profile(payload: UserProfileCreate):
     try:
-        supabase.table("user_profiles").insert({
+        profile = {
             "user_id": str(payload.user_id),
             "full_name": payload.full_name,
             "username": payload.username,
@@ -42,12 +44,16 @@ def create_user_profile(payload: UserProfileCreate):
             "availability": payload.availability,
             "role": payload.role,
             "skills": payload.skills,
-        }).execute()
+        }
+        supabase.table("user_profiles").insert(profile).execute()
+        profile_index.upsert(profile)
 
         return {
             "message": "User profile created successfully"
         }
 
+    except CircuitOpen:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
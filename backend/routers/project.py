@@ -2,6 +2,7 @@
 from fastapi import APIRouter, HTTPException , Query , Body
 from uuid import UUID
 from core.database import supabase
+from core import artifacts, llm_queue
 
 
 from pydantic import BaseModel
@@ -24,6 +25,15 @@ STAGE_LABELS = {
     ProjectStage.PRD: "PRD",
     ProjectStage.IMPLEMENTATION: "Implementation",
 }
+STAGE_NUMBERS = {label: int(stage) for stage, label in STAGE_LABELS.items()}
+
+# Artifact warmed in the background when a project enters a stage
+STAGE_PREFETCH = {
+    ProjectStage.IDEATION: "qna",
+    ProjectStage.PRD: "prd",
+    ProjectStage.IMPLEMENTATION: "implementation_todo",
+}
+
 router = APIRouter(prefix="/project", tags=["project"])
 
 @router.get("/user-projects")
@@ -69,11 +79,28 @@ class UpdateStageRequest(BaseModel):
 def update_project_stage(data: UpdateStageRequest):
     stage_label = STAGE_LABELS[data.stage]  # number → string
 
+    previous = 0
+    if llm_queue.STAGE_PREFETCH and data.stage in STAGE_PREFETCH:
+        current = supabase.table("user_projects") \
+            .select("current_status") \
+            .eq("project_id", data.project_id) \
+            .limit(1) \
+            .execute()
+        status = current.data[0].get("current_status") if current.data else None
+        previous = status if isinstance(status, int) else STAGE_NUMBERS.get(status, 0)
+
     supabase.table("user_projects") \
         .update({"current_status": stage_label}) \
         .eq("project_id", data.project_id) \
         .execute()
 
+    # Only when the stage advances; the stage change stands even if queueing fails
+    if llm_queue.STAGE_PREFETCH and data.stage in STAGE_PREFETCH and data.stage > previous:
+        try:
+            artifacts.prefetch(STAGE_PREFETCH[data.stage], data.project_id)
+        except Exception as e:
+            print(f"[WARN] Could not queue {STAGE_PREFETCH[data.stage]} prefetch for project {data.project_id}: {e}")
+
     return {
         "message": "Stage updated",
         "project_id": data.project_id,
@@ -1,9 +1,13 @@
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from uuid import UUID
 import os
-from core.database import supabase
+from core import repository
+from core.breaker import CircuitOpen
+from core.profile_index import profile_index
+from core.skills import taxonomy
+from notebooks.NLP_Search_keyword_generator import get_normalized_keywords
 
 # Define the schema with UUID types
 class CreateTeam(BaseModel):
@@ -13,6 +17,14 @@ class CreateTeam(BaseModel):
     team_leader: UUID
     team_members: List[UUID]
 
+
+class RecommendTeammates(BaseModel):
+    query: str = Field(..., min_length=1, max_length=500)
+    k: int = Field(10, ge=1, le=50)
+    availability: Optional[List[str]] = None
+    location: Optional[str] = Field(None, max_length=100)
+    exclude_user_ids: List[UUID] = []
+
 router = APIRouter(prefix="/team", tags=["team"])
 
 @router.post("/createTeam")
@@ -22,20 +34,60 @@ async def create(request: CreateTeam):
         team_name=request.team_name
     
     try:
-        response = supabase.table("team_db").insert({
+        rows = await repository.insert("team_db", {
             "team_name": team_name,
             "project_id": str(request.project_id),
             "team_leader": str(request.user_id),
             "team_members": [str(member_id) for member_id in request.team_members]
-        }).execute()
+        })
 
-        if not response.data:
+        if not rows:
             raise HTTPException(status_code=400, detail="Failed to create team")
 
         return {
             "message": "Team created successfully",
-            "team": response.data[0]
+            "team": rows[0]
         }
+    except CircuitOpen:
+        raise
     except Exception as e:
        
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/recommend")
+def recommend_teammates(request: RecommendTeammates):
+    try:
+        keywords = get_normalized_keywords(request.query)
+    except CircuitOpen:
+        # Gemini unavailable: match on the skills the local taxonomy recognises
+        known, _ = taxonomy.parse(request.query)
+        keywords = taxonomy.expand(known)
+
+    try:
+        profile_index.ensure_loaded()
+    except CircuitOpen:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    matches = profile_index.recommend(
+        keywords,
+        request.k,
+        availability=request.availability,
+        location=request.location,
+        exclude=[str(user_id) for user_id in request.exclude_user_ids]
+    )
+
+    return {
+        "keywords": keywords,
+        "results": [
+            {
+                **{field: profile_index.profiles[row][field] for field in
+                   ("user_id", "full_name", "username", "avatar_url", "availability", "location", "role")},
+                "score": round(score, 4),
+                "matched_skills": profile_index.matched_skills(row, keywords)
+            }
+            for row, score in matches
+        ]
+    }
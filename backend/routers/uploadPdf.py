@@ -1,7 +1,9 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
+from starlette.concurrency import run_in_threadpool
 import cloudinary.uploader
 import core.cloudinary
-from core.database import supabase
+from core import repository
+from core.breaker import BREAKERS, CircuitOpen
 
 router = APIRouter(prefix="/uploadPdf", tags=["uploadPdf"])
 
@@ -14,9 +16,11 @@ async def upload_pdf(project_id: str, user_id: str, file: UploadFile = File(...)
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Only PDF files allowed")
 
-    # 2️⃣ Upload to Cloudinary
+    # 2️⃣ Upload to Cloudinary (blocking SDK, so off the event loop)
     try:
-        result = cloudinary.uploader.upload(
+        result = await run_in_threadpool(
+            BREAKERS["cloudinary"].call,
+            cloudinary.uploader.upload,
             file.file,
             resource_type="raw",
             format="pdf",
@@ -24,21 +28,25 @@ async def upload_pdf(project_id: str, user_id: str, file: UploadFile = File(...)
             overwrite=True,
             access_mode="public"
         )
+    except CircuitOpen:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
     pdf_url = result.get("secure_url")
 
-    # 3️⃣ Store URL in research_stage table
+    # 3️⃣ Store URL in research_stage table (replayed later if Supabase is down)
     try:
-        response = supabase.table("research_stage").upsert(
+        response = await repository.upsert_or_defer(
+            f"research_stage.pdf_url {project_id}/{user_id}",
+            "research_stage",
             {
                 "project_id": project_id,
                 "user_id": user_id,
                 "pdf_url": pdf_url
             },
-            on_conflict="project_id,user_id"  # because it's a composite PK
-        ).execute()
+            on_conflict=repository.RESEARCH_STAGE_KEY  # because it's a composite PK
+        )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"DB update failed: {str(e)}")
@@ -52,15 +60,7 @@ async def upload_pdf(project_id: str, user_id: str, file: UploadFile = File(...)
 async def view_pdf(project_id: str, user_id: str):
 
     try:
-        response = (
-            supabase.table("research_stage")
-            .select("pdf_url")
-            .eq("project_id", project_id)
-            .eq("user_id", user_id)
-            .execute()
-        )
-
-        data = response.data
+        data = await repository.fetch_all("research_stage", "pdf_url", project_id=project_id, user_id=user_id)
 
         if not data or data[0].get("pdf_url") is None:
             return {
@@ -73,5 +73,7 @@ async def view_pdf(project_id: str, user_id: str):
             "pdf_url": data[0]["pdf_url"]
         }
 
+    except CircuitOpen:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"DB fetch failed: {str(e)}")
\ No newline at end of file
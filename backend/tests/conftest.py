@@ -0,0 +1,17 @@
+"""
+Shared setup for the backend tests: run from backend/ with `python -m pytest`.
+
+Settings are fixed before any core module is imported, so the Supabase
+clients are created against a dummy URL (no test talks to it) and every LLM
+tier is the offline stand-in.
+"""
+
+import os
+import sys
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "test-key")
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+os.environ["LLM_OFFLINE"] = "true"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from core import admission, deadline
+from core.admission import AdmissionController
+from core.llm import RateLimiter
+from core.scheduler import Priority, Scheduler
+
+ROUTE = "test_route"
+TIMEOUT = 5
+
+
+@pytest.fixture(autouse=True)
+def route(monkeypatch):
+    scheduler = Scheduler(workers=1, interactive_workers=0)
+    controller = AdmissionController(ROUTE, ["test_admission_node"], limit=1)
+    monkeypatch.setattr(admission, "scheduler", scheduler)
+    monkeypatch.setattr(admission, "rate_limiter", RateLimiter(rate_per_minute=60000, burst=1000))
+    monkeypatch.setitem(admission.CONTROLLERS, ROUTE, controller)
+    return scheduler, controller
+
+
+def blocking_job():
+    """A stub job that runs until the returned event is set."""
+    started, release = threading.Event(), threading.Event()
+
+    def job():
+        started.set()
+        release.wait(TIMEOUT)
+        return "fresh"
+
+    return job, started, release
+
+
+def wait_released(controller: AdmissionController):
+    """The slot is released from the job's done callback, just after the handler resumes."""
+    for _ in range(100):
+        if controller.in_flight == 0:
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"{controller.in_flight} slots still held")
+
+
+def test_admitted_request_runs_and_releases_its_slot(route):
+    _, controller = route
+
+    assert asyncio.run(admission.run(ROUTE, lambda: "fresh")) == "fresh"
+    wait_released(controller)
+
+
+def test_sheds_with_retry_after_at_the_concurrency_limit(route):
+    job, started, release = blocking_job()
+
+    async def scenario():
+        first = asyncio.create_task(admission.run(ROUTE, job))
+        assert await asyncio.to_thread(started.wait, TIMEOUT)
+        try:
+            with pytest.raises(HTTPException) as shed:
+                await admission.run(ROUTE, lambda: "fresh")
+            served = await admission.run(ROUTE, lambda: "fresh", stale=lambda: "stale")
+        finally:
+            release.set()
+        return shed.value, served, await first
+
+    shed, served, first = asyncio.run(scenario())
+
+    assert shed.status_code == 429
+    # No latency samples for the node: half the default per-node estimate
+    assert shed.headers["Retry-After"] == str(int(admission.DEFAULT_NODE_SECONDS / 2))
+    assert served == "stale"
+    assert first == "fresh"
+
+
+def test_sheds_when_the_queue_wait_exceeds_the_budget(route, monkeypatch):
+    scheduler, controller = route
+    controller.limit = 10
+    monkeypatch.setattr(admission, "ADMISSION_WAIT_BUDGET_SECONDS", 0.0)
+    job, started, release = blocking_job()
+    running = scheduler.submit(job, priority=Priority.INTERACTIVE)
+    assert started.wait(TIMEOUT)
+    queued = scheduler.submit(lambda: None, priority=Priority.INTERACTIVE)
+
+    try:
+        with pytest.raises(HTTPException) as shed:
+            asyncio.run(admission.run(ROUTE, lambda: "fresh"))
+    finally:
+        release.set()
+    running.result(TIMEOUT)
+    queued.result(TIMEOUT)
+
+    assert shed.value.status_code == 429
+    assert int(shed.value.headers["Retry-After"]) >= 1
+    assert controller.in_flight == 0
+
+
+def test_deadline_serves_stale_or_504_and_keeps_the_slot_until_the_job_ends(route, monkeypatch):
+    _, controller = route
+    monkeypatch.setitem(deadline.ROUTE_DEADLINES, ROUTE, 0.05)
+    monkeypatch.setattr(admission, "DEADLINE_GRACE_SECONDS", 0.05)
+    job, started, release = blocking_job()
+
+    assert asyncio.run(admission.run(ROUTE, job, stale=lambda: "stale")) == "stale"
+    assert started.is_set()
+    # The job outlived its handler and still holds the route's only slot
+    assert controller.in_flight == 1
+
+    release.set()
+    wait_released(controller)
+
+    job, started, release = blocking_job()
+    try:
+        with pytest.raises(HTTPException) as timed_out:
+            asyncio.run(admission.run(ROUTE, job, stale=lambda: None))
+    finally:
+        release.set()
+    assert timed_out.value.status_code == 504
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from core.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+
+RESET_SECONDS = 0.05
+
+
+@pytest.fixture
+def breaker():
+    return CircuitBreaker("test", failure_threshold=2, reset_seconds=RESET_SECONDS)
+
+
+def test_opens_after_consecutive_failures(breaker):
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.available()
+    with pytest.raises(CircuitOpen) as raised:
+        breaker.check()
+    assert raised.value.status_code == 503
+    assert raised.value.headers["Retry-After"] == "1"
+
+
+def test_half_open_probe_closes_on_success(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(RESET_SECONDS)
+
+    assert breaker.available()
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_opens_again(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(RESET_SECONDS)
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_released_probe_frees_the_slot_without_a_verdict(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(RESET_SECONDS)
+    assert breaker.allow()
+
+    breaker.release()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_guard_records_the_outcome(breaker):
+    with breaker.guard():
+        pass
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            with breaker.guard():
+                raise RuntimeError("dependency down")
+    assert breaker.state == OPEN
@@ -0,0 +1,115 @@
+import io
+import json
+import threading
+
+import pytest
+
+from core import catalog as catalog_module
+from core.catalog import Catalog, StaticSource, iter_json_array
+from core.hackathon_index import HackathonIndex
+
+
+class CountingSource(StaticSource):
+    """A static list with no change marker, read in full on every refresh like a Supabase table."""
+
+    def __init__(self, hackathons):
+        super().__init__(hackathons)
+        self.reads = 0
+
+    def signature(self):
+        return None
+
+    def read(self):
+        self.reads += 1
+        return super().read()
+
+
+def hackathon(i, **fields):
+    return {"id": i, "name": f"Hackathon {i}", "tags": [], **fields}
+
+
+def test_first_load_happens_once_under_concurrent_requests():
+    source = CountingSource([hackathon(i) for i in range(50)])
+    catalog = Catalog(source)
+    start = threading.Barrier(8)
+    indexes = []
+
+    def request():
+        start.wait()
+        indexes.append(catalog.current())
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert source.reads == 1
+    assert catalog.version == 1
+    assert all(index is indexes[0] for index in indexes)
+
+
+def parse(text, monkeypatch=None, chunk=None):
+    if chunk is not None:
+        monkeypatch.setattr(catalog_module, "READ_CHUNK", chunk)
+    return list(iter_json_array(io.StringIO(text)))
+
+
+@pytest.mark.parametrize("chunk", [1, 3, 7, 64])
+def test_items_split_across_read_chunks(monkeypatch, chunk):
+    items = [hackathon(i, tags=["ai", "web"], description="x" * i) for i in range(10)]
+    text = " [\n" + ",\n".join(json.dumps(item) for item in items) + "\n] "
+
+    assert parse(text, monkeypatch, chunk) == items
+
+
+def test_empty_array():
+    assert parse("[]") == []
+    assert parse("  [ \n ]\n") == []
+
+
+@pytest.mark.parametrize("text", ['{"id": 1}', "1", '"[]"'])
+def test_top_level_must_be_an_array(text):
+    with pytest.raises(ValueError, match="JSON array"):
+        parse(text)
+
+
+@pytest.mark.parametrize("text", ["[", '[{"id": 1},', '[{"id": 1}, {"id": 2', '[{"id": 1}, "name'])
+def test_truncated_file(monkeypatch, text):
+    # json.JSONDecodeError is a ValueError too
+    with pytest.raises(ValueError):
+        parse(text, monkeypatch, 4)
+
+
+def test_refresh_applies_only_the_changes(monkeypatch):
+    source = CountingSource([hackathon(i) for i in range(50)])
+    catalog = Catalog(source)
+    first = catalog.current()
+
+    applied = []
+    apply = HackathonIndex.apply
+
+    def spy(index, upserts, deletes=()):
+        upserts, deletes = list(upserts), list(deletes)
+        applied.append(({h["id"] for h in upserts}, set(deletes)))
+        return apply(index, upserts, deletes)
+
+    monkeypatch.setattr(HackathonIndex, "apply", spy)
+
+    # Nothing changed: no new index
+    assert not catalog.refresh()
+    assert catalog.index is first and applied == []
+
+    source.hackathons = [h for h in source.hackathons if h["id"] != 3]
+    source.hackathons[0] = hackathon(0, tags=["changed"])
+    source.hackathons.append(hackathon(99))
+
+    assert catalog.refresh()
+    assert applied == [({0, 99}, {3})]
+    assert catalog.version == 2
+    assert catalog.index is not first
+    assert catalog.index.find("Hackathon 3") is None
+    assert catalog.index.find("Hackathon 0")["tags"] == ["changed"]
+    assert catalog.index.find("Hackathon 99") is not None
+    # The searches still holding the old index keep their view
+    assert first.find("Hackathon 3") is not None
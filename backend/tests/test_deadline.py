@@ -0,0 +1,42 @@
+import time
+
+import pytest
+
+from core import deadline
+
+
+def test_no_scope_means_no_budget():
+    assert deadline.remaining() is None
+    assert deadline.budget_for("test_unscoped") is None
+    assert not deadline.should_skip("test_unscoped")
+    deadline.check("nothing")
+
+
+def test_budget_is_split_across_the_nodes_ahead():
+    # No latency samples for these nodes: each is assumed to cost the same
+    with deadline.scope(12), deadline.plan(["test_first", "test_second", "test_third"]):
+        assert deadline.budget_for("test_first") == pytest.approx(4, abs=0.1)
+        assert deadline.budget_for("test_third") == pytest.approx(12, abs=0.1)
+        assert deadline.budget_for("test_not_planned") == pytest.approx(12, abs=0.1)
+
+
+def test_nested_scopes_keep_the_earlier_expiry():
+    with deadline.scope(1):
+        with deadline.scope(60):
+            assert deadline.remaining() <= 1
+        with deadline.scope(None):
+            assert deadline.remaining() <= 1
+    assert deadline.remaining() is None
+
+
+def test_optional_node_is_skipped_when_its_share_is_too_small():
+    with deadline.scope(deadline.DEADLINE_MIN_NODE_SECONDS / 2):
+        assert deadline.should_skip("test_optional")
+    with deadline.scope(deadline.DEADLINE_MIN_NODE_SECONDS * 2):
+        assert not deadline.should_skip("test_optional")
+
+
+def test_check_raises_once_expired():
+    with deadline.scope_until(time.monotonic() - 1):
+        with pytest.raises(deadline.DeadlineExceeded):
+            deadline.check("test")
@@ -0,0 +1,164 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from core.hackathon_index import RELEVANCE, SORT_COLUMNS, HackathonIndex, catalog_key, column_value, members
+
+WORDS = ["ai", "health", "climate", "web3", "fintech", "robotics", "vision", "data", "open", "global"]
+PLATFORMS = ["Devpost", "MLH", "Unstop"]
+MODES = ["Online", "Hybrid", "In-person"]
+
+
+def make_hackathon(rng: random.Random, hackathon_id: int) -> dict:
+    def maybe(value):
+        # Some hackathons lack a value, and values repeat, to exercise ties and the missing tail
+        return value if rng.random() > 0.15 else None
+
+    deadline = date(2026, 1, 1) + timedelta(days=rng.randrange(20))
+    return {
+        "id": hackathon_id,
+        "name": " ".join(rng.sample(WORDS, 2)) + f" challenge {hackathon_id}",
+        "description": " ".join(rng.choices(WORDS, k=rng.randrange(3, 12))),
+        "tags": rng.sample(WORDS, rng.randrange(1, 4)),
+        "platform": rng.choice(PLATFORMS),
+        "mode": rng.choice(MODES),
+        "deadline": maybe(deadline.strftime("%b %d, %Y")),
+        "daysLeft": maybe(rng.randrange(10)),
+        "participants": maybe(rng.randrange(5) * 100),
+        "prize": maybe(f"${rng.randrange(1, 6) * 5},000"),
+    }
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    rng = random.Random(7)
+    return [make_hackathon(rng, i) for i in range(80)]
+
+
+def brute_force_order(index: HackathonIndex, query: str, docs, sort: str):
+    column = sort.lstrip("-")
+    if column == RELEVANCE:
+        scores = index.scores(query)
+        return sorted(docs, key=lambda doc: (-scores[doc], doc))
+
+    valued = sorted(
+        (doc for doc in docs if index._value_of(column, doc) is not None),
+        key=lambda doc: (index._value_of(column, doc), doc)
+    )
+    if sort.startswith("-"):
+        valued.reverse()
+    return valued + sorted(doc for doc in docs if index._value_of(column, doc) is None)
+
+
+def paginate(index: HackathonIndex, query: str, bits: int, sort: str, limit: int):
+    served, after = [], None
+    while True:
+        docs, after = index.page(query, bits, limit, sort, after)
+        served.extend(docs)
+        if after is None:
+            return served
+
+
+@pytest.mark.parametrize("sort", [RELEVANCE] + [f"{sign}{column}" for column in SORT_COLUMNS for sign in ("", "-")])
+@pytest.mark.parametrize("query", ["", "health ", "climate data"])
+@pytest.mark.parametrize("limit", [1, 7, 100])
+def test_cursor_pagination_matches_brute_force_sort(catalog, sort, query, limit):
+    index = HackathonIndex(catalog)
+    bits, _ = index.search(query)
+
+    assert paginate(index, query, bits, sort, limit) == brute_force_order(index, query, members(bits), sort)
+
+
+def test_pagination_respects_filters(catalog):
+    index = HackathonIndex(catalog)
+    bits, _ = index.search("", ["Online", "Hybrid", "MLH"], {"prize": ("$10k", None)})
+
+    served = paginate(index, "", bits, "-prize", 5)
+    assert served == brute_force_order(index, "", members(bits), "-prize")
+    for doc in served:
+        hackathon = catalog[doc]
+        assert hackathon["mode"] in ("Online", "Hybrid") and hackathon["platform"] == "MLH"
+        assert column_value("prize", hackathon["prize"]) >= 10000
+
+
+def test_apply_matches_full_rebuild(catalog):
+    rng = random.Random(11)
+    changed = [dict(catalog[i], name=f"renamed open {i}", participants=999) for i in range(0, 80, 9)]
+    added = [make_hackathon(rng, i) for i in range(100, 110)]
+    deleted = [catalog[i]["id"] for i in range(4, 80, 13)]
+
+    applied = HackathonIndex(catalog).apply(changed + added, deleted)
+    # A rebuild over the same live hackathons in the same order (what core.catalog does)
+    rebuilt = HackathonIndex(applied.docs[doc] for doc in sorted(applied.by_key.values()))
+
+    def keys(index, docs):
+        return [catalog_key(index.docs[doc]) for doc in docs]
+
+    assert len(applied) == len(rebuilt) == 80 - len(deleted) + len(added)
+    # A trailing space ends prefix matching, whose candidates depend on document frequencies
+    for query, filters in [("", []), ("open ", []), ("health data ", ["Online"]), ("renamed ", ["Devpost", "ai"])]:
+        applied_bits, applied_facets = applied.search(query, filters)
+        rebuilt_bits, rebuilt_facets = rebuilt.search(query, filters)
+        assert sorted(keys(applied, members(applied_bits))) == sorted(keys(rebuilt, members(rebuilt_bits)))
+        assert applied_facets == rebuilt_facets
+
+        for sort in [f"{sign}{column}" for column in SORT_COLUMNS for sign in ("", "-")]:
+            assert keys(applied, paginate(applied, query, applied_bits, sort, 6)) == \
+                keys(rebuilt, paginate(rebuilt, query, rebuilt_bits, sort, 6))
+
+
+def test_apply_leaves_the_previous_index_untouched(catalog):
+    index = HackathonIndex(catalog)
+    before = members(index.search("open ")[0])
+
+    index.apply([dict(catalog[0], name="something else")], [catalog[1]["id"]])
+
+    assert members(index.search("open ")[0]) == before
+    assert index.find(catalog[1]["name"]) is not None
+
+
+def test_bm25f_prefers_name_matches_and_exact_words():
+    index = HackathonIndex([
+        {"id": 1, "name": "Generic event", "description": "robotics robotics", "tags": []},
+        {"id": 2, "name": "Robotics cup", "description": "a competition", "tags": []},
+        {"id": 3, "name": "Robot race", "description": "", "tags": []},
+    ])
+    bits, _ = index.search("robotics ")
+
+    assert index.page("robotics ", bits, 10)[0] == [1, 0]
+    # Still being typed: "robot" also matches "robotics", below the exact match
+    bits, _ = index.search("robot")
+    assert index.page("robot", bits, 10)[0][0] == 2
+
+
+def test_facet_counts_ignore_their_own_group(catalog):
+    index = HackathonIndex(catalog)
+    _, facets = index.search("", ["Online"])
+
+    assert facets["mode"] == {
+        mode: count for mode, count in
+        sorted(((m, sum(h["mode"] == m for h in catalog)) for m in MODES), key=lambda item: (-item[1], item[0]))
+        if count
+    }
+
+
+def test_unparsable_range_bound_is_rejected(catalog):
+    index = HackathonIndex(catalog)
+    with pytest.raises(ValueError):
+        index.in_range("deadline", "next week")
+
+
+def test_apply_merges_into_the_sorted_columns_and_vocabulary(catalog):
+    rng = random.Random(3)
+    index = HackathonIndex(catalog)
+    for step in range(5):
+        index = index.apply([make_hackathon(rng, 200 + step), dict(catalog[step], prize="$25,000")])
+
+    for column in SORT_COLUMNS:
+        sorted_column = index.columns[column]
+        valued = [doc for doc in range(len(index.docs)) if index._value_of(column, doc) is not None]
+        expected = sorted(valued, key=lambda doc: (index._value_of(column, doc), doc))
+        assert sorted_column.docs.tolist() == expected
+        assert sorted_column.values.tolist() == [index._value_of(column, doc) for doc in expected]
+    assert index.vocabulary == sorted(set(index.vocabulary))
@@ -0,0 +1,88 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core import deadline, llm, metrics
+from core.llm import RateLimiter, hedging
+
+NODE = "test_hedged_node"
+HEDGE_AFTER = 0.05
+MODEL = llm.llm_routing.route(NODE).model
+
+
+def counter(key):
+    return metrics.snapshot()["counters"].get(key, 0)
+
+
+@pytest.fixture(autouse=True)
+def hedge_enabled(monkeypatch):
+    monkeypatch.setattr(llm, "LLM_HEDGE", True)
+    monkeypatch.setattr(llm, "LLM_HEDGE_BUDGET", 1.0)
+    monkeypatch.setattr(llm, "_calls_seen", 0)
+    monkeypatch.setattr(llm, "_hedges_sent", 0)
+    monkeypatch.setattr(llm, "rate_limiter", RateLimiter(rate_per_minute=60000, burst=1000))
+    # Enough recent latencies for the node's percentile to be trusted as the hedge delay
+    for _ in range(llm.HEDGE_MIN_SAMPLES):
+        metrics.observe("llm.call", NODE, HEDGE_AFTER)
+    client = llm.client_for(MODEL)
+    yield client
+    client.delays.clear()
+    client.errors.clear()
+
+
+def test_hedge_fires_after_the_delay_and_wins(hedge_enabled):
+    client = hedge_enabled
+    client.delays.extend([1.0, 0.0])
+    calls, won = len(client.calls), counter(f"llm.hedge_won[{NODE}]")
+
+    started = time.monotonic()
+    with hedging():
+        llm.invoke("prompt", node=NODE)
+    elapsed = time.monotonic() - started
+
+    assert HEDGE_AFTER <= elapsed < 0.5
+    assert len(client.calls) == calls + 2
+    assert counter(f"llm.hedge_won[{NODE}]") == won + 1
+    assert llm._hedges_sent == 1
+
+
+def test_losing_call_ends_at_its_request_timeout(hedge_enabled, monkeypatch):
+    client = hedge_enabled
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(llm, "_bounded_calls", pool)
+    client.delays.extend([5.0, 0.0])
+
+    with deadline.scope(0.4), hedging():
+        llm.invoke("prompt", node=NODE)
+
+    # The slow primary lost; its request timeout frees the thread well before its 5s
+    started = time.monotonic()
+    pool.shutdown(wait=True)
+    assert time.monotonic() - started < 1.0
+    assert llm._hedges_sent == 1
+
+
+def test_no_hedge_without_budget(hedge_enabled, monkeypatch):
+    client = hedge_enabled
+    monkeypatch.setattr(llm, "LLM_HEDGE_BUDGET", 0.0)
+    client.delays.extend([0.15])
+    calls, denied = len(client.calls), counter(f"llm.hedge_denied[{NODE}]")
+
+    with hedging():
+        llm.invoke("prompt", node=NODE)
+
+    assert len(client.calls) == calls + 1
+    assert counter(f"llm.hedge_denied[{NODE}]") == denied + 1
+    assert llm._hedges_sent == 0
+
+
+def test_no_hedge_outside_a_hedging_block(hedge_enabled):
+    client = hedge_enabled
+    client.delays.extend([0.1])
+    calls = len(client.calls)
+
+    llm.invoke("prompt", node=NODE)
+
+    assert len(client.calls) == calls + 1
+    assert llm._calls_seen == 0
@@ -0,0 +1,89 @@
+import json
+from collections import OrderedDict
+
+import pytest
+
+from core import llm, llm_routing
+from core.llm import RateLimiter
+from core.skills import taxonomy
+from notebooks import NLP_Search_keyword_generator as keywords
+
+
+@pytest.fixture(autouse=True)
+def client(monkeypatch):
+    monkeypatch.setattr(llm, "rate_limiter", RateLimiter(rate_per_minute=60000, burst=1000))
+    monkeypatch.setattr(keywords, "_unknown_terms", OrderedDict())
+    client = llm.client_for(llm_routing.route("extract_skills").model)
+    yield client
+    client.replies.clear()
+
+
+def reply(skills):
+    return json.dumps(skills)
+
+
+def test_batch_resolves_unknown_terms_in_one_call(client):
+    client.replies.append(reply({"0": ["quantum computing"], "1": ["cryptography"]}))
+    calls = len(client.calls)
+
+    results = keywords.get_normalized_keywords_batch([
+        "python and quantum annealing",
+        "Python and  Quantum annealing",
+        "rust, zk proofs",
+        "web dev",
+    ])
+
+    assert len(client.calls) == calls + 1
+    assert results[0] == taxonomy.expand(["python", "quantum computing"])
+    assert results[1] == results[0]
+    assert results[2] == taxonomy.expand(["rust", "cryptography"])
+    assert results[3] == taxonomy.expand(["web development"])
+
+
+def test_known_skills_need_no_llm_call(client):
+    calls = len(client.calls)
+
+    assert keywords.get_normalized_keywords("web dev") == taxonomy.expand(["web development"])
+    assert len(client.calls) == calls
+
+
+def test_unknown_terms_are_remembered(client):
+    client.replies.append(reply({"0": ["quantum computing"]}))
+    first = keywords.get_normalized_keywords("quantum annealing")
+    calls = len(client.calls)
+
+    assert keywords.get_normalized_keywords("python, quantum annealing") == taxonomy.expand(["python", *first])
+    assert len(client.calls) == calls
+
+
+def test_least_recently_used_term_is_evicted(client, monkeypatch):
+    monkeypatch.setattr(keywords, "UNKNOWN_TERMS_CACHE_SIZE", 1)
+    client.replies.extend([reply({"0": ["quantum computing"]}), reply({"0": ["cryptography"]})])
+    keywords.get_normalized_keywords("quantum annealing")
+    keywords.get_normalized_keywords("zk proofs")
+    calls = len(client.calls)
+
+    keywords.get_normalized_keywords("zk proofs")
+    assert len(client.calls) == calls
+    keywords.get_normalized_keywords("quantum annealing")
+    assert len(client.calls) == calls + 1
+
+
+def test_unknown_terms_are_split_into_batches(client, monkeypatch):
+    monkeypatch.setattr(keywords, "KEYWORD_BATCH_SIZE", 1)
+    client.replies.extend([reply({"0": ["quantum computing"]}), reply({"0": ["cryptography"]})])
+    calls = len(client.calls)
+
+    result = keywords.get_normalized_keywords("quantum annealing, zk proofs")
+
+    assert len(client.calls) == calls + 2
+    assert result == taxonomy.expand(["quantum computing", "cryptography"])
+
+
+def test_unusable_reply_is_not_remembered(client):
+    # The default offline reply has no entry for the term
+    assert keywords.get_normalized_keywords("quantum annealing") == []
+    calls = len(client.calls)
+
+    keywords.get_normalized_keywords("quantum annealing")
+    assert len(client.calls) == calls + 1
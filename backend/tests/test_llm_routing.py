@@ -0,0 +1,108 @@
+import json
+
+import pytest
+from google.genai.errors import ClientError
+
+from core import llm, llm_routing, metrics
+from core.llm import RateLimiter, gemini_breaker
+
+PRO = llm_routing.TIERS["pro"]
+FAST = llm_routing.TIERS["fast"]
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(llm, "rate_limiter", RateLimiter(rate_per_minute=60000, burst=1000))
+    llm_routing._degraded_until.clear()
+    for samples in llm_routing._samples.values():
+        samples.clear()
+    yield
+    llm_routing._degraded_until.clear()
+    gemini_breaker.record_success()
+    for model in (PRO.model, FAST.model):
+        llm.client_for(model).delays.clear()
+        llm.client_for(model).errors.clear()
+
+
+def counter(key):
+    return metrics.snapshot()["counters"].get(key, 0)
+
+
+def quota_error():
+    return ClientError(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED", "message": "Quota exceeded"}})
+
+
+def test_nodes_resolve_to_their_tiers():
+    assert llm_routing.route("evaluate_prd") is FAST
+    assert llm_routing.route("generate_prd") is PRO
+    assert llm_routing.route("node_nobody_configured").name == llm_routing.DEFAULT_TIER
+
+
+def test_routing_overrides_from_file_env_and_model_variables(monkeypatch, tmp_path):
+    routing_file = tmp_path / "routing.json"
+    routing_file.write_text(json.dumps({
+        "tiers": {"cheap": {"model": "cheap-model", "downgrade_to": None}},
+        "nodes": {"generate_prd": "cheap"},
+    }))
+    monkeypatch.setattr(llm_routing, "LLM_ROUTING_FILE", str(routing_file))
+    monkeypatch.setenv("LLM_ROUTING", json.dumps({
+        "default_tier": "fast",
+        "nodes": {"improve_prd": {"tier": "pro", "allow_downgrade": False}},
+    }))
+    monkeypatch.setenv("LLM_TIER_PRO_MODEL", "pro-override")
+
+    config = llm_routing._load_config()
+
+    assert config["default_tier"] == "fast"
+    assert config["nodes"]["generate_prd"] == "cheap"
+    assert config["nodes"]["improve_prd"] == {"tier": "pro", "allow_downgrade": False}
+    assert config["nodes"]["evaluate_prd"] == "fast"
+    assert config["tiers"]["pro"]["model"] == "pro-override"
+    assert config["tiers"]["cheap"]["model"] == "cheap-model"
+
+
+def test_slo_breach_degrades_the_tier(monkeypatch):
+    for _ in range(llm_routing.MIN_SLO_SAMPLES):
+        llm_routing.record_latency("pro", PRO.latency_slo_p95_seconds + 1)
+
+    assert llm_routing.is_degraded("pro")
+    assert llm_routing.route("generate_prd") is FAST
+    monkeypatch.setitem(llm_routing.NODES, "improve_prd", llm_routing.NodeRoute("pro", allow_downgrade=False))
+    assert llm_routing.route("improve_prd") is PRO
+
+
+def test_exhausted_call_is_retried_on_the_downgrade_tier():
+    llm.client_for(PRO.model).errors.append(quota_error())
+    fast_calls = len(llm.client_for(FAST.model).calls)
+
+    response = llm.invoke("prompt", node="generate_prd")
+
+    assert response.response_metadata["model_name"] == FAST.model
+    assert len(llm.client_for(FAST.model).calls) == fast_calls + 1
+    assert llm_routing.is_degraded("pro")
+    # Later calls skip the degraded tier until the cooldown ends
+    assert llm.invoke("prompt", node="generate_prd").response_metadata["model_name"] == FAST.model
+
+
+def test_other_errors_do_not_downgrade():
+    failures = counter("breaker.failures[gemini]")
+    llm.client_for(PRO.model).errors.append(RuntimeError("request 429 of batch failed: quota file missing"))
+
+    with pytest.raises(RuntimeError):
+        llm.invoke("prompt", node="generate_prd")
+
+    assert not llm_routing.is_degraded("pro")
+    assert counter("breaker.failures[gemini]") == failures + 1
+
+
+@pytest.mark.parametrize("error, exhausted", [
+    (quota_error(), True),
+    (ClientError(400, {"error": {"code": 400, "status": "INVALID_ARGUMENT", "message": "429 tokens"}}), False),
+    (ValueError("RESOURCE_EXHAUSTED in the message only"), False),
+])
+def test_exhaustion_is_read_from_the_error_type_and_code(error, exhausted):
+    assert llm._is_exhausted(error) is exhausted
+    try:
+        raise RuntimeError("wrapped") from error
+    except RuntimeError as wrapped:
+        assert llm._is_exhausted(wrapped) is exhausted
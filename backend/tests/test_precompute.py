@@ -0,0 +1,29 @@
+from collections import OrderedDict
+
+import pytest
+
+from core import artifacts, llm_queue
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    jobs = []
+    monkeypatch.setattr(artifacts, "_precomputed", OrderedDict())
+    monkeypatch.setattr(artifacts, "scheduling_info", lambda project_id: (None, None))
+    monkeypatch.setattr(llm_queue, "submit", lambda key, fn, *args, **kwargs: jobs.append(key))
+    return jobs
+
+
+def test_unchanged_statement_is_not_precomputed_again(submitted):
+    artifacts.precompute_for_problem_statement("p1", "Crop disease detection")
+    artifacts.precompute_for_problem_statement("p1", "Crop disease detection")
+
+    assert submitted == ["qna:p1", "research_todo:p1"]
+
+
+def test_changed_statement_supersedes_the_last_one(submitted):
+    artifacts.precompute_for_problem_statement("p1", "Crop disease detection")
+    artifacts.precompute_for_problem_statement("p1", "Flood alerts")
+    artifacts.precompute_for_problem_statement("p2", "Flood alerts")
+
+    assert submitted == ["qna:p1", "research_todo:p1"] * 2 + ["qna:p2", "research_todo:p2"]
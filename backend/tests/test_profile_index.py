@@ -0,0 +1,50 @@
+import pytest
+
+from core.profile_index import INITIAL_COLUMNS, ProfileIndex
+from core.skills import SkillRegistry
+
+PROFILES = [
+    {"user_id": "u1", "skills": ["python", "react"], "role": {"ML Engineer": 0.5}, "availability": "Weekends", "location": "Pune, India"},
+    {"user_id": "u2", "skills": ["web dev"], "role": None, "availability": "Full-time", "location": "Berlin"},
+    {"user_id": "u3", "skills": ["figma"], "role": {"Designer": 1.0}, "availability": "weekends", "location": "Mumbai, India"},
+]
+
+
+@pytest.fixture
+def index():
+    index = ProfileIndex(SkillRegistry())
+    index.load(PROFILES)
+    return index
+
+
+def rows_to_users(index, matches):
+    return [index.profiles[row]["user_id"] for row, _ in matches]
+
+
+def test_recommend_ranks_by_role_weighted_share(index):
+    matches = index.recommend(["python", "react"], 10)
+
+    assert rows_to_users(index, matches) == ["u1", "u2"]
+    assert matches[0][1] == pytest.approx(1.0)
+    assert index.matched_skills(matches[1][0], ["python", "react"]) == ["react"]
+
+
+def test_recommend_filters(index):
+    assert rows_to_users(index, index.recommend(["react", "figma"], 10, availability=["WEEKENDS"])) == ["u1", "u3"]
+    assert rows_to_users(index, index.recommend(["react", "figma"], 10, location="india", exclude=["u1"])) == ["u3"]
+
+
+def test_skill_interned_elsewhere_after_the_matrix_was_sized(index):
+    # Another user of the shared registry interns more skills than the matrix has columns
+    for i in range(INITIAL_COLUMNS * 2):
+        index.registry.intern(f"skill interned elsewhere {i}")
+
+    assert index.recommend(["skill interned elsewhere 300", "python"], 10)[0][0] == index.row_of("u1")
+    assert index.matched_skills(0, ["skill interned elsewhere 300"]) == []
+
+
+def test_upsert_replaces_a_profile(index):
+    index.upsert({"user_id": "u2", "skills": ["rust"]})
+
+    assert rows_to_users(index, index.recommend(["react"], 10)) == ["u1"]
+    assert rows_to_users(index, index.recommend(["rust"], 10)) == ["u2"]
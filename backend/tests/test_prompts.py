@@ -0,0 +1,66 @@
+import json
+
+from core import prompts
+
+TEAM = [
+    {"name": f"Member {i}", "role": {"backend": 0.9, "ml": 0.3}, "skills": [f"skill {i}.{j}" for j in range(40)]}
+    for i in range(12)
+]
+
+
+def test_structured_field_keeps_every_member_as_valid_json():
+    for budget in (2000, 300, 50):
+        text = prompts.fit_json(TEAM, budget)
+        team = json.loads(text)
+
+        assert [member["name"] for member in team] == [member["name"] for member in TEAM]
+        for member, original in zip(team, TEAM):
+            assert member["skills"] == original["skills"][:len(member["skills"])]
+
+
+def test_structured_field_shrinks_skill_lists_to_the_budget():
+    text = prompts.fit_json(TEAM, 300)
+
+    assert prompts.count_tokens(text) <= 300
+    assert all(member["skills"] for member in json.loads(text))
+
+
+def test_field_within_budget_is_unchanged():
+    assert prompts.fit_json(TEAM[:1], None) == prompts.compact_json(TEAM[:1])
+    assert prompts.fit_json({"a": [1, 2]}, 100) == '{"a":[1,2]}'
+
+
+def test_text_is_trimmed_at_line_boundaries():
+    text = "\n".join(f"line {i}" for i in range(200))
+    trimmed = prompts.trim(text, 50)
+
+    assert prompts.TRIM_MARKER in trimmed
+    assert trimmed.startswith("line 0\n")
+    assert trimmed.endswith("line 199")
+    assert all(line.startswith("line ") for line in trimmed.replace(prompts.TRIM_MARKER, "\n").split("\n") if line)
+
+
+def test_items_share_the_budget():
+    items = ["short", "x" * 400, "y" * 400]
+    joined = prompts.fit_items(items, 50)
+
+    assert prompts.count_tokens(joined) <= 50
+    assert joined.split("\n")[0] == "short"
+
+
+def test_research_assignment_prompt_is_built_within_budget():
+    from notebooks.research_work import ASSIGN_TOPICS_PROMPT
+
+    system, human = prompts.build(
+        ASSIGN_TOPICS_PROMPT, "assign_topics",
+        num_members=str(len(TEAM)),
+        team=TEAM,
+        topics=[f"Topic {i}" for i in range(len(TEAM))]
+    )
+
+    assert "{" not in system.content
+    assert f"team of {len(TEAM)} people" in human.content
+    team = json.loads(human.content.split("Team:\n", 1)[1].split("\n\nTopics:", 1)[0])
+    assert [member["name"] for member in team] == [member["name"] for member in TEAM]
+    assert prompts.count_tokens(json.dumps(team, separators=(",", ":"))) <= prompts.field_budget("assign_topics", "team")
+    assert "Topic 11" in human.content
@@ -0,0 +1,35 @@
+import time
+
+import pytest
+
+from core.llm import RateLimiter
+
+
+def test_burst_then_refill():
+    limiter = RateLimiter(rate_per_minute=600, burst=2)  # one token every 0.1s
+
+    assert limiter.acquire(timeout=0)
+    assert limiter.acquire(timeout=0)
+    assert not limiter.acquire(timeout=0.01)
+
+    started = time.monotonic()
+    assert limiter.acquire(timeout=1)
+    assert time.monotonic() - started == pytest.approx(0.1, abs=0.05)
+
+
+def test_reserve_is_left_for_other_callers():
+    limiter = RateLimiter(rate_per_minute=6, burst=3)
+
+    assert limiter.acquire(reserve=2, timeout=0)
+    assert not limiter.acquire(reserve=2, timeout=0.01)
+    # Callers without a reserve may still use it
+    assert limiter.acquire(timeout=0)
+    assert limiter.acquire(timeout=0)
+
+
+def test_wait_estimate():
+    limiter = RateLimiter(rate_per_minute=60, burst=1)
+
+    assert limiter.wait_estimate() == 0
+    limiter.acquire()
+    assert limiter.wait_estimate(3) == pytest.approx(3, abs=0.05)
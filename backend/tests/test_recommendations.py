@@ -0,0 +1,50 @@
+from core.catalog import Catalog, StaticSource
+from core.hackathon_index import HackathonIndex
+from core.profile_index import ProfileIndex
+from core.recommendations import HackathonRecommender
+from core.skills import SkillRegistry
+
+HACKATHONS = [
+    {"id": 1, "name": "Pixel jam", "description": "game art", "tags": ["figma"]},
+    {"id": 2, "name": "Model cup", "description": "train models", "tags": ["machine learning", "python"]},
+    {"id": 3, "name": "Web sprint", "description": "ship a site", "tags": ["react"]},
+]
+
+
+def recommender_for(hackathons):
+    profiles = ProfileIndex(SkillRegistry())
+    profiles.load([{"user_id": "u1", "skills": ["python"], "role": {"Frontend developer": 0.5}}])
+    return HackathonRecommender(Catalog(StaticSource(hackathons)), profiles)
+
+
+def names(index, picks):
+    return [index.docs[doc]["name"] for doc, _ in picks]
+
+
+def test_recommends_by_skill_similarity():
+    recommender = recommender_for(HACKATHONS)
+    index, picks = recommender.recommend("u1")
+
+    assert names(index, picks) == ["Web sprint", "Model cup"]
+    assert recommender.recommend("nobody") is None
+
+
+def test_cached_picks_are_served_with_the_index_they_refer_to():
+    recommender = recommender_for(HACKATHONS)
+    index, picks = recommender.recommend("u1")
+
+    # A reload landing between the version read and current(): new positions, same version
+    recommender.catalog.index = HackathonIndex(list(reversed(HACKATHONS)))
+    served_index, served = recommender.recommend("u1")
+
+    assert served_index is index
+    assert names(served_index, served) == ["Web sprint", "Model cup"]
+
+
+def test_profile_change_drops_the_cached_entry():
+    recommender = recommender_for(HACKATHONS)
+    recommender.recommend("u1")
+
+    recommender.profiles.upsert({"user_id": "u1", "skills": ["figma"]})
+    index, picks = recommender.recommend("u1")
+    assert names(index, picks) == ["Pixel jam"]
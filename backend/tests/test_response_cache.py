@@ -0,0 +1,51 @@
+import json
+
+from core.response_cache import ResponseCache, matches
+
+
+def test_repeated_request_is_served_from_the_cache():
+    cache = ResponseCache("test", size=2)
+    computed = []
+
+    def compute():
+        computed.append(1)
+        return {"results": [1, 2]}
+
+    first = cache.respond(1, "key", None, compute)
+    second = cache.respond(1, "key", None, compute)
+
+    assert json.loads(first.body) == {"results": [1, 2]}
+    assert second.body == first.body
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert len(computed) == 1
+
+
+def test_matching_etag_gets_304():
+    cache = ResponseCache("test", size=2)
+    etag = cache.respond(1, "key", None, lambda: {"a": 1}).headers["ETag"]
+
+    response = cache.respond(1, "key", f'"other", W/{etag}', lambda: {"a": 1})
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_new_version_is_recomputed_and_old_entries_evicted():
+    cache = ResponseCache("test", size=2)
+    etag = cache.respond(1, "key", None, lambda: {"a": 1}).headers["ETag"]
+
+    changed = cache.respond(2, "key", etag, lambda: {"a": 2})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+    cache.respond(3, "key", None, lambda: {"a": 3})
+    recomputed = []
+    cache.respond(1, "key", None, lambda: recomputed.append(1) or {"a": 1})
+    assert recomputed == [1]
+
+
+def test_if_none_match_parsing():
+    assert matches('"x", "y"', '"y"')
+    assert matches("*", '"y"')
+    assert not matches(None, '"y"')
+    assert not matches('"x"', '"y"')
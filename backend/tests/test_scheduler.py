@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from core.deadline import DeadlineExceeded
+from core.scheduler import Priority, Scheduler
+
+TIMEOUT = 5
+
+
+def block(scheduler: Scheduler, priority: Priority) -> threading.Event:
+    """Occupy a worker with a job of the given class until the returned event is set."""
+    started, release = threading.Event(), threading.Event()
+
+    def job():
+        started.set()
+        release.wait(TIMEOUT)
+
+    scheduler.submit(job, priority=priority)
+    assert started.wait(TIMEOUT)
+    return release
+
+
+def test_fair_share_interleaves_teams():
+    scheduler = Scheduler(workers=1, interactive_workers=0)
+    release = block(scheduler, Priority.INTERACTIVE)
+
+    order = []
+    futures = [scheduler.submit(order.append, f"a{i}", team_id="a") for i in range(3)]
+    futures.append(scheduler.submit(order.append, "b0", team_id="b"))
+    release.set()
+    for future in futures:
+        future.result(TIMEOUT)
+
+    # Team a queued first, but b's only job does not wait behind all of a's
+    assert order == ["a0", "b0", "a1", "a2"]
+
+
+def test_interactive_jobs_come_first():
+    scheduler = Scheduler(workers=1, interactive_workers=0)
+    release = block(scheduler, Priority.INTERACTIVE)
+
+    order = []
+    futures = [
+        scheduler.submit(order.append, "batch", priority=Priority.BATCH),
+        scheduler.submit(order.append, "prefetch", priority=Priority.PREFETCH),
+        scheduler.submit(order.append, "interactive", priority=Priority.INTERACTIVE),
+    ]
+    release.set()
+    for future in futures:
+        future.result(TIMEOUT)
+
+    assert order == ["interactive", "prefetch", "batch"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_background_jobs_never_take_the_interactive_worker(workers):
+    scheduler = Scheduler(workers=workers, interactive_workers=2)
+    assert scheduler.workers == 3 and scheduler.background_limit == 1
+
+    release = block(scheduler, Priority.BATCH)
+    queued = scheduler.submit(time.sleep, 0, priority=Priority.BATCH)
+    interactive = scheduler.submit(lambda: "done", priority=Priority.INTERACTIVE)
+
+    assert interactive.result(TIMEOUT) == "done"
+    assert not queued.done()
+    release.set()
+    queued.result(TIMEOUT)
+
+
+def test_idle_teams_are_forgotten():
+    scheduler = Scheduler(workers=1, interactive_workers=0)
+    futures = [scheduler.submit(time.sleep, 0, team_id=f"team-{i}") for i in range(50)]
+    for future in futures:
+        future.result(TIMEOUT)
+
+    assert scheduler._last_tag[Priority.BATCH] == {}
+
+
+def test_job_whose_budget_ran_out_in_the_queue_is_not_run():
+    scheduler = Scheduler(workers=1, interactive_workers=0)
+    release = block(scheduler, Priority.INTERACTIVE)
+
+    ran = []
+    future = scheduler.submit(ran.append, 1, priority=Priority.INTERACTIVE, timeout=0.01)
+    time.sleep(0.05)
+    release.set()
+
+    with pytest.raises(DeadlineExceeded):
+        future.result(TIMEOUT)
+    assert ran == []
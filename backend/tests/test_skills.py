@@ -0,0 +1,48 @@
+import pytest
+
+from core.skills import SkillRegistry, coverage, jaccard, overlap, taxonomy
+
+
+@pytest.mark.parametrize("text, known, unknown", [
+    ("Looking for a React and Postgres developer", ["react", "postgresql"], []),
+    ("someone with web dev and k8s experience", ["web development", "kubernetes"], []),
+    ("machine learning, quantum annealing", ["machine learning"], ["quantum annealing"]),
+    ("full stack development", ["web development"], []),
+    ("information security and python", ["cyber security", "python"], []),
+    # Security alone is too broad to mean cyber security
+    ("food security and python", ["python"], ["food security"]),
+])
+def test_parse_matches_the_longest_known_phrase(text, known, unknown):
+    assert taxonomy.parse(text) == (known, unknown)
+
+
+@pytest.mark.parametrize("text, known", [
+    ("someone who can go build a c compiler", []),
+    ("r and python", ["python"]),
+    ("python, go, rust", ["python", "go", "rust"]),
+    ("Skills: C, R", ["c", "r"]),
+    ("go", ["go"]),
+    ("golang backend", ["go", "backend development"]),
+])
+def test_ambiguous_names_only_match_as_list_items(text, known):
+    assert taxonomy.parse(text)[0] == known
+
+
+def test_expand_adds_implications_transitively():
+    expanded = taxonomy.expand(["Web Dev"])
+
+    assert expanded[0] == "web development"
+    assert {"html", "react", "node.js", "api development"} <= set(expanded)
+    assert len(expanded) == len(set(expanded))
+
+
+def test_registry_bitsets():
+    registry = SkillRegistry(["python", "react"])
+    required = registry.mask(["python", "react"])
+    have = registry.mask(["py", "docker"])
+
+    assert registry.names(have) == ["python", "docker"]
+    assert overlap(required, have) == 1
+    assert coverage(required, have) == 0.5
+    assert jaccard(required, have) == pytest.approx(1 / 3)
+    assert registry.mask(["unheard of"], intern=False) == 0